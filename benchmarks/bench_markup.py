@@ -0,0 +1,131 @@
+"""Benchmark month parsing against the previous two-pass implementation.
+
+Run from the repository root:
+
+    python benchmarks/bench_markup.py [--tasks N] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from orgplan import markup  # noqa: E402
+
+
+def legacy_parse_month_notes(text):
+    """The two-scan parser that ``parse_month_notes`` replaced, for comparison."""
+    lines = text.splitlines()
+    in_todo = False
+    tasks = []
+    for i, line in enumerate(lines, 1):
+        stripped = line.strip()
+        if markup._TODO_HEADER_PATTERN.match(stripped):
+            in_todo = True
+            continue
+        if in_todo and stripped.startswith("#"):
+            break
+        if not in_todo or not stripped.startswith("-"):
+            continue
+        task = markup._parse_task_line(stripped, line_number=i)
+        if task is not None:
+            tasks.append(task)
+
+    task_map = {task.title: task for task in tasks}
+    if not task_map:
+        return tasks
+
+    current_title = None
+    current_lines = []
+
+    def flush():
+        if current_title is None:
+            return
+        task = task_map.get(current_title)
+        if task is not None:
+            notes_lines = "\n".join(current_lines).splitlines()
+            while notes_lines and not notes_lines[0].strip():
+                notes_lines.pop(0)
+            while notes_lines and not notes_lines[-1].strip():
+                notes_lines.pop()
+            task.notes = "\n".join(notes_lines)
+            if task.notes and not (task.deadline or task.scheduled or task.timestamp):
+                task.deadline, task.scheduled, task.timestamp = (
+                    markup._parse_timestamps(task.notes)
+                )
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        header_match = markup._HEADER_PATTERN.match(stripped)
+        if header_match:
+            flush()
+            if markup._TODO_HEADER_PATTERN.match(stripped):
+                current_title = None
+            else:
+                current_title = markup._normalize_header_title(header_match.group(1))
+            current_lines = []
+            continue
+        if current_title is not None:
+            current_lines.append(line)
+    flush()
+    return tasks
+
+
+def build_month(task_count, notes_lines=40):
+    """Build a synthetic month file with one notes section per task."""
+    lines = ["# TODO List"]
+    for i in range(task_count):
+        state = "[DONE] " if i % 3 == 0 else ""
+        due = f" DEADLINE: <2025-06-{i % 28 + 1:02d}>" if i % 4 == 0 else ""
+        lines.append(f"- {state}#p{i % 3} #2h Task number {i}{due}")
+    lines.append("")
+    for i in range(task_count):
+        lines.append(f"# Task number {i}")
+        lines.append("")
+        lines.append("SCHEDULED: <2025-07-01 Tue>")
+        for j in range(notes_lines):
+            lines.append(f"Line {j} of the notes for task {i}.")
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def _fingerprint(tasks):
+    return [
+        (t.title, t.state, t.tags, t.notes, t.line_number, t.deadline, t.scheduled, t.timestamp)
+        for t in tasks
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench_markup")
+    parser.add_argument("--tasks", type=int, default=500, help="Tasks in the synthetic month")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions")
+    opts = parser.parse_args(argv)
+
+    text = build_month(opts.tasks)
+    if _fingerprint(markup.parse_month_notes(text)) != _fingerprint(legacy_parse_month_notes(text)):
+        print("Parsers disagree on the synthetic month", file=sys.stderr)
+        return 1
+
+    data = text.encode("utf-8")
+    print(f"Synthetic month: {opts.tasks} tasks, {len(text) / 1024:.0f} KiB")
+    results = {}
+    candidates = (
+        ("legacy", legacy_parse_month_notes),
+        ("current", markup.parse_month_notes),
+        ("lazy", lambda value: markup.parse_month_notes(value, lazy=True)),
+        ("buffer", lambda value: markup.parse_month_buffer(data)),
+    )
+    for name, func in candidates:
+        best = min(timeit.repeat(lambda: func(text), number=1, repeat=opts.repeat))
+        results[name] = best
+        print(f"{name:>8}: {best * 1000:8.2f} ms")
+    for name in ("current", "lazy", "buffer"):
+        print(f"{name:>8} speedup: {results['legacy'] / results[name]:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
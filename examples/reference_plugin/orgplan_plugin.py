@@ -3,11 +3,26 @@
 import argparse
 import os
 
+from orgplan.query import Query
+from orgplan.tags import has_tag
+from orgplan.tasks import STATES
+
 
 def _parse_args(parser, args):
     return parser.parse_args(args)
 
 
+def _month_range(api, year, month):
+    """Return the ``(first, last)`` months a command covers.
+
+    Commands cover one month: ``year`` and ``month`` when both are given,
+    otherwise the current month, as ``FileTaskStore.list`` does.
+    """
+    if year is None or month is None:
+        year, month = api.dates.current_year_month()
+    return (year, month), (year, month)
+
+
 def register(registry):
     api = registry.api
 
@@ -17,7 +32,9 @@ def register(registry):
         opts = _parse_args(parser, args)
 
         year, month = api.dates.current_year_month()
-        tasks = api.tasks.list(year=year, month=month, state=opts.state)
+        tasks = list(api.tasks.query(Query(
+            states=opts.state, months=((year, month), (year, month))
+        )))
 
         label = f"{year:04d}-{month:02d}"
         if not tasks:
@@ -36,7 +53,8 @@ def register(registry):
         parser.add_argument("--month", type=int, help="Month to filter tasks")
         opts = _parse_args(parser, args)
 
-        tasks = api.tasks.list(year=opts.year, month=opts.month)
+        (year, month), _ = _month_range(api, opts.year, opts.month)
+        tasks = api.tasks.iter_tasks(year=year, month=month, notes=False)
         counts = {}
         for task in tasks:
             counts[task.state] = counts.get(task.state, 0) + 1
@@ -55,7 +73,9 @@ def register(registry):
         parser.add_argument("--month", type=int, help="Month to filter tasks")
         opts = _parse_args(parser, args)
 
-        tasks = api.tasks.list(year=opts.year, month=opts.month, state="open")
+        tasks = list(api.tasks.query(Query(
+            states="open", months=_month_range(api, opts.year, opts.month)
+        )))
 
         if not tasks:
             print("No open tasks found.")
@@ -74,7 +94,9 @@ def register(registry):
         parser.add_argument("--month", type=int, help="Month to filter tasks")
         opts = _parse_args(parser, args)
 
-        tasks = api.tasks.list(year=opts.year, month=opts.month, state="done")
+        tasks = list(api.tasks.query(Query(
+            states="done", months=_month_range(api, opts.year, opts.month)
+        )))
 
         if not tasks:
             print("No done tasks found.")
@@ -93,7 +115,9 @@ def register(registry):
         parser.add_argument("--month", type=int, help="Month to filter tasks")
         opts = _parse_args(parser, args)
 
-        tasks = api.tasks.list(year=opts.year, month=opts.month, state="canceled")
+        tasks = list(api.tasks.query(Query(
+            states="canceled", months=_month_range(api, opts.year, opts.month)
+        )))
 
         if not tasks:
             print("No canceled tasks found.")
@@ -112,8 +136,10 @@ def register(registry):
         parser.add_argument("--month", type=int, help="Month to filter tasks")
         opts = _parse_args(parser, args)
 
-        all_tasks = api.tasks.list(year=opts.year, month=opts.month)
-        tasks = [task for task in all_tasks if task.state != "open"]
+        non_open = [state for state in STATES if state != "open"]
+        tasks = list(api.tasks.query(Query(
+            states=non_open, months=_month_range(api, opts.year, opts.month),
+        )))
 
         if not tasks:
             print("No non-open tasks found.")
@@ -133,8 +159,11 @@ def register(registry):
         parser.add_argument("--state", help="Filter by task state (e.g., open, done)")
         opts = _parse_args(parser, args)
 
-        all_tasks = api.tasks.list(year=opts.year, month=opts.month, state=opts.state)
-        tasks = [task for task in all_tasks if "p0" in task.tags]
+        tasks = list(api.tasks.query(Query(
+            states=opts.state,
+            months=_month_range(api, opts.year, opts.month),
+            tags=("p0",),
+        )))
 
         if not tasks:
             print("No P0 tasks found.")
@@ -154,8 +183,11 @@ def register(registry):
         parser.add_argument("--state", help="Filter by task state (e.g., open, done)")
         opts = _parse_args(parser, args)
 
-        all_tasks = api.tasks.list(year=opts.year, month=opts.month, state=opts.state)
-        tasks = [task for task in all_tasks if "p1" in task.tags]
+        tasks = list(api.tasks.query(Query(
+            states=opts.state,
+            months=_month_range(api, opts.year, opts.month),
+            tags=("p1",),
+        )))
 
         if not tasks:
             print("No P1 tasks found.")
@@ -175,8 +207,11 @@ def register(registry):
         parser.add_argument("--state", help="Filter by task state (e.g., open, done)")
         opts = _parse_args(parser, args)
 
-        all_tasks = api.tasks.list(year=opts.year, month=opts.month, state=opts.state)
-        tasks = [task for task in all_tasks if "p0" in task.tags or "p1" in task.tags]
+        tasks = list(api.tasks.query(Query(
+            states=opts.state,
+            months=_month_range(api, opts.year, opts.month),
+            any_tags=("p0", "p1"),
+        )))
 
         if not tasks:
             print("No P0/P1 tasks found.")
@@ -185,11 +220,34 @@ def register(registry):
         print(f"P0/P1 priority tasks ({len(tasks)}):")
         for task in tasks:
             due = task.due_date.isoformat() if task.due_date else "no-date"
-            priority = "P0" if "p0" in task.tags else "P1"
+            priority = "P0" if has_tag(task, "p0") else "P1"
             state_str = f"[{task.state.upper()}]" if task.state != "open" else ""
             print(f"- [{priority}] {state_str} {task.title} ({due})".strip())
         return 0
 
+    def search(args):
+        parser = argparse.ArgumentParser(prog="search")
+        parser.add_argument("words", nargs="+", help="Words every match must contain")
+        parser.add_argument("--state", help="Filter by task state (e.g., open, done)")
+        parser.add_argument("--since", help="Skip tasks due before YYYY-MM")
+        parser.add_argument("--limit", type=int, default=20, help="Maximum number of results")
+        opts = _parse_args(parser, args)
+
+        since = api.dates.parse_year_month(opts.since) if opts.since else None
+        query = " ".join(opts.words)
+        tasks = api.tasks.search(query, state=opts.state, since=since, limit=opts.limit)
+
+        if not tasks:
+            print(f"No tasks matching '{query}'.")
+            return 0
+
+        print(f"Tasks matching '{query}' ({len(tasks)}):")
+        for task in tasks:
+            due = task.due_date.isoformat() if task.due_date else "no-date"
+            state_str = f"[{task.state.upper()}] " if task.state != "open" else ""
+            print(f"- {state_str}{task.title} ({due})")
+        return 0
+
     def healthcheck(args):
         parser = argparse.ArgumentParser(prog="healthcheck")
         _parse_args(parser, args)
@@ -214,4 +272,5 @@ def register(registry):
     registry.add_command("tasks-p0", tasks_p0)
     registry.add_command("tasks-p1", tasks_p1)
     registry.add_command("tasks-priority", tasks_priority)
+    registry.add_command("search", search)
     registry.add_command("healthcheck", healthcheck)
@@ -3,21 +3,61 @@
 from orgplan.api import OrgplanAPI, API_VERSION
 from orgplan.config import load_config
 from orgplan.dates import DateService
-from orgplan.markup import parse_month_notes, parse_todo_list
-from orgplan.tasks import FileTaskStore, InMemoryTaskStore, Task
+from orgplan.markup import (
+    IncrementalMonthParser,
+    LazyTask,
+    ParserExtensions,
+    iter_month_notes,
+    parse_month_buffer,
+    parse_month_notes,
+    parse_todo_list,
+)
+from orgplan.query import Query
+from orgplan.tasks import FileTaskStore, InMemoryTaskStore, StaleFileError, Task
 from orgplan.registry import Registry
 from orgplan.plugins import load_plugins
 
+# Optional front ends, imported on first access so that the CLI does not pay
+# for asyncio, sqlite3 or the watcher on every start.
+_LAZY_EXPORTS = {
+    "AsyncFileTaskStore": "orgplan.async_store",
+    "SqliteTaskStore": "orgplan.sqlite_store",
+    "TaskTable": "orgplan.table",
+    "Watcher": "orgplan.watch",
+}
+
 __all__ = [
     "API_VERSION",
+    "AsyncFileTaskStore",
     "DateService",
     "FileTaskStore",
     "InMemoryTaskStore",
+    "IncrementalMonthParser",
+    "LazyTask",
+    "ParserExtensions",
     "OrgplanAPI",
+    "Query",
     "Registry",
+    "SqliteTaskStore",
+    "StaleFileError",
     "Task",
+    "TaskTable",
+    "Watcher",
+    "iter_month_notes",
+    "parse_month_buffer",
     "parse_month_notes",
     "parse_todo_list",
     "load_config",
     "load_plugins",
 ]
+
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'orgplan' has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,138 @@
+"""Asyncio front end for reading month files without blocking the event loop."""
+
+import asyncio
+import concurrent.futures
+import os
+
+from orgplan.dates import iter_months
+from orgplan.tasks import (
+    FileTaskStore,
+    _parse_month_records,
+    _select,
+    task_from_record,
+)
+
+
+class AsyncFileTaskStore(FileTaskStore):
+    """``FileTaskStore`` with ``async`` counterparts of its read methods.
+
+    File access and parsing run on a thread pool of ``io_workers`` threads,
+    so coroutines such as :meth:`alist` never block the event loop. With
+    ``process_workers`` set, uncached months are parsed on a process pool
+    of that size instead; the worker sends back task records (see
+    ``task_to_record``). Stores with a custom ``parser`` always parse in a
+    thread.
+
+    Concurrent requests for the same month and projection share one
+    in-flight load; each caller still receives its own copies of the tasks.
+    Loads go through the same parse caches as the synchronous methods,
+    which stay available. Call :meth:`close`, or use the store as an
+    ``async with`` context manager, to shut the pools down.
+    """
+
+    def __init__(self, data_root, io_workers=4, process_workers=None, **kwargs):
+        super().__init__(data_root, **kwargs)
+        self._io_workers = io_workers
+        self._process_workers = process_workers
+        self._io_executor = None
+        self._process_executor = None
+        self._inflight = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Shut down the thread and process pools; pending loads still finish."""
+        for executor in (self._io_executor, self._process_executor):
+            if executor is not None:
+                executor.shutdown(wait=False)
+        self._io_executor = self._process_executor = None
+
+    async def alist(self, year=None, month=None, state=None, fields=None, tags=None,
+                    any_tags=None):
+        """Return a month's tasks like :meth:`list`, without blocking the event loop."""
+        year, month = self._resolve_year_month(year, month)
+        tasks = await self._load(year, month, fields)
+        return _select(tasks, state, tags, any_tags)
+
+    async def alist_range(self, start, end, state=None, fields=None, tags=None,
+                          any_tags=None):
+        """Return the tasks of the ``start`` through ``end`` months like :meth:`list_range`.
+
+        The months load concurrently, bounded by the store's pools, and the
+        results come back in month order.
+        """
+        available = set(await self._run_io(self.available_months))
+        months = [year_month for year_month in iter_months(start, end) if year_month in available]
+        results = await asyncio.gather(
+            *(self._load(year, month, fields) for year, month in months)
+        )
+        tasks = []
+        for month_tasks in results:
+            tasks.extend(_select(month_tasks, state, tags, any_tags))
+        return tasks
+
+    async def aquery(self, query):
+        """Return the list of tasks :meth:`query` yields, evaluated on the thread pool."""
+        return await self._run_io(lambda: list(self.query(query)))
+
+    async def _load(self, year, month, fields):
+        """Return a month's cached tasks (not copies), sharing in-flight loads."""
+        path = self.get_month_path(year, month)
+        needs = self._cache_needs(fields)
+        key = (path, needs)
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._read_month(path, fields, needs))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # One caller giving up must not cancel the load for the others.
+        return await asyncio.shield(future)
+
+    async def _read_month(self, path, fields, needs):
+        stat, tasks = await self._run_io(self._probe_month, path, needs)
+        if stat is None:
+            return []
+        if tasks is not None:
+            return tasks
+        pool = self._get_process_executor()
+        if pool is None:
+            return await self._run_io(self._load_month, path, stat, fields, needs)
+        extensions = self.extensions if self.extensions else None
+        records = await asyncio.get_running_loop().run_in_executor(
+            pool, _parse_month_records, path, fields, extensions, needs[0]
+        )
+        return await self._run_io(self._remember_records, path, stat, records, needs)
+
+    def _probe_month(self, path, needs):
+        """Return ``(stat, cached tasks or None)``, or ``(None, None)`` if the file is gone."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._cache.invalidate(path)
+            return None, None
+        return stat, self._cached_month(path, stat, needs)
+
+    def _remember_records(self, path, stat, records, needs):
+        tasks = [task_from_record(record) for record in records]
+        self._remember_month(path, stat, tasks, needs, records)
+        return tasks
+
+    def _run_io(self, func, *args):
+        if self._io_executor is None:
+            self._io_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self._io_workers, thread_name_prefix="orgplan-io"
+            )
+        return asyncio.get_running_loop().run_in_executor(self._io_executor, func, *args)
+
+    def _get_process_executor(self):
+        if not self._process_workers or self._custom_parser:
+            return None
+        if self._process_executor is None:
+            self._process_executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self._process_workers
+            )
+        return self._process_executor
@@ -0,0 +1,213 @@
+"""In-process and on-disk caches of parsed month files."""
+
+import collections
+import marshal
+import os
+import sys
+import threading
+
+
+CacheInfo = collections.namedtuple(
+    "CacheInfo", ["hits", "misses", "maxsize", "currsize", "maxbytes", "currbytes"]
+)
+
+# Rough per-task memory cost added to the file size when sizing an entry.
+TASK_OVERHEAD = 512
+
+# Bump whenever parsing results or the record layout change, so entries
+# written by older versions are ignored.
+DISK_FORMAT_VERSION = 2
+
+DEFAULT_CACHE_DIR = ".orgplan-cache"
+
+
+class ParseCache:
+    """LRU cache of parsed tasks keyed by path and file fingerprint.
+
+    A fingerprint is ``(st_mtime_ns, st_size)``; an entry is only returned
+    while the file still has the fingerprint it was parsed from. Each entry
+    also records which optional fields were filled in as a ``(notes,
+    timestamps)`` pair, and serves any request that needs no more than that.
+
+    Entries are evicted least recently used first once there are more than
+    ``maxsize`` of them or their approximate sizes add up to more than
+    ``maxbytes``. An entry larger than ``maxbytes`` on its own is not kept.
+    The cache is safe to share between threads.
+    """
+
+    def __init__(self, maxsize=64, maxbytes=64 * 1024 * 1024):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, path, fingerprint, needs=(True, True)):
+        """Return the cached tasks for ``path``, or None on a miss.
+
+        The returned list is the cached one; callers must copy tasks before
+        handing them out.
+        """
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                cached_fingerprint, parsed, tasks, _ = entry
+                if cached_fingerprint != fingerprint:
+                    self._discard(path)
+                elif all(have or not need for have, need in zip(parsed, needs)):
+                    self._entries.move_to_end(path)
+                    self.hits += 1
+                    return tasks
+            self.misses += 1
+            return None
+
+    def put(self, path, fingerprint, tasks, parsed=(True, True)):
+        """Store ``tasks`` parsed from ``path`` at ``fingerprint``."""
+        size = fingerprint[1] + TASK_OVERHEAD * len(tasks)
+        with self._lock:
+            self._discard(path)
+            if self.maxsize <= 0 or size > self.maxbytes:
+                return
+            self._entries[path] = (fingerprint, tuple(parsed), tasks, size)
+            self._bytes += size
+            while len(self._entries) > self.maxsize or self._bytes > self.maxbytes:
+                _, (_, _, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def invalidate(self, path):
+        """Drop the entry for ``path`` if there is one."""
+        with self._lock:
+            self._discard(path)
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """Return hit/miss counters and current usage as a ``CacheInfo``."""
+        with self._lock:
+            return CacheInfo(
+                self.hits, self.misses, self.maxsize, len(self._entries),
+                self.maxbytes, self._bytes,
+            )
+
+    def _discard(self, path):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._bytes -= entry[3]
+
+
+class DiskCache:
+    """Parse results stored as files so separate processes can reuse them.
+
+    Each month file gets one entry holding its task records (see
+    ``orgplan.tasks.task_to_record``), written with ``marshal``. An entry is
+    used only if the format version, Python's marshal format, the parser
+    extensions signature, the file's ``(st_mtime_ns, st_size)`` and the
+    BLAKE2 hash of its content all match. Entries that are missing,
+    unreadable or stale count as misses, and failures to write are ignored.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, path, stat, needs=(True, True), signature=()):
+        """Return the cached records for ``path``, or None on a miss."""
+        try:
+            with open(self._entry_path(path), "rb") as handle:
+                entry = marshal.load(handle)
+            header, records = entry
+            (version, marshal_version, cached_path, mtime_ns, size, digest,
+             parsed, cached_signature) = header
+        except (OSError, EOFError, ValueError, TypeError):
+            self.misses += 1
+            return None
+
+        fresh = (
+            version == DISK_FORMAT_VERSION
+            and marshal_version == marshal.version
+            and cached_path == os.path.abspath(path)
+            and (mtime_ns, size) == (stat.st_mtime_ns, stat.st_size)
+            and cached_signature == signature
+            and all(have or not need for have, need in zip(parsed, needs))
+        )
+        if not fresh or digest != _file_digest(path):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return records
+
+    def store(self, path, stat, records, parsed=(True, True), signature=()):
+        """Write ``records`` parsed from ``path`` when it had ``stat``."""
+        try:
+            digest = _file_digest(path)
+            current = os.stat(path)
+            if (current.st_mtime_ns, current.st_size) != (stat.st_mtime_ns, stat.st_size):
+                return
+            header = (
+                DISK_FORMAT_VERSION,
+                marshal.version,
+                os.path.abspath(path),
+                stat.st_mtime_ns,
+                stat.st_size,
+                digest,
+                tuple(parsed),
+                signature,
+            )
+            write_atomic(self._entry_path(path), marshal.dumps((header, tuple(records))))
+        except (OSError, ValueError):
+            pass
+
+    def _entry_path(self, path):
+        import hashlib
+
+        name = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{name}.{sys.implementation.cache_tag}.cache")
+
+
+def write_atomic(path, data, mode=None, check=None):
+    """Write ``data`` to ``path`` through a temporary file and ``os.replace``.
+
+    ``mode`` sets the new file's permission bits. ``check`` is called with
+    no arguments once the data is written, just before the replace; if it
+    raises, ``path`` is left untouched.
+    """
+    import tempfile
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    handle, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as output:
+            output.write(data)
+        if mode is not None:
+            os.chmod(temp_path, mode)
+        if check is not None:
+            check()
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def content_digest(data):
+    """Return the BLAKE2 digest used to tell file contents apart."""
+    import hashlib
+
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _file_digest(path):
+    with open(path, "rb") as handle:
+        return content_digest(handle.read())
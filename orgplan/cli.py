@@ -12,7 +12,12 @@ from orgplan.tasks import FileTaskStore
 
 
 def _build_registry(config):
-    task_store = FileTaskStore(data_root=config.data_root, date_service=DateService())
+    task_store = FileTaskStore(
+        data_root=config.data_root,
+        date_service=DateService(),
+        lazy=True,
+        cache_dir=config.cache_dir,
+    )
     api = OrgplanAPI(task_store=task_store, date_service=DateService())
     registry = Registry(api, config=config)
     load_plugins(config, registry)
@@ -3,12 +3,15 @@
 import json
 import os
 
+from orgplan.cache import DEFAULT_CACHE_DIR
+
 
 class Config:
-    def __init__(self, data_root=None, plugins=None, plugin_opts=None):
+    def __init__(self, data_root=None, plugins=None, plugin_opts=None, cache_dir=None):
         self.data_root = data_root
         self.plugins = plugins or []
         self.plugin_opts = plugin_opts or {}
+        self.cache_dir = cache_dir
 
 
 def _normalize_path(value):
@@ -29,11 +32,14 @@ def load_config(path=None):
     data_root = _normalize_path(data.get("data_root"))
     plugins = data.get("plugins", [])
     plugin_opts = data.get("plugin_opts", {})
+    cache_dir = data.get("cache_dir")
 
     if not isinstance(plugins, list):
         raise ValueError("plugins must be a list")
     if not isinstance(plugin_opts, dict):
         raise ValueError("plugin_opts must be a dict")
+    if cache_dir is not None and not isinstance(cache_dir, (bool, str)):
+        raise ValueError("cache_dir must be a path or a boolean")
 
     plugins = [_normalize_path(path) for path in plugins]
 
@@ -42,4 +48,13 @@ def load_config(path=None):
     if not os.path.isdir(data_root):
         raise ValueError(f"data_root does not exist or is not a directory: {data_root}")
 
-    return Config(data_root=data_root, plugins=plugins, plugin_opts=plugin_opts)
+    if cache_dir is True:
+        cache_dir = os.path.join(data_root, DEFAULT_CACHE_DIR)
+    elif cache_dir:
+        cache_dir = _normalize_path(cache_dir)
+    else:
+        cache_dir = None
+
+    return Config(
+        data_root=data_root, plugins=plugins, plugin_opts=plugin_opts, cache_dir=cache_dir
+    )
@@ -3,6 +3,19 @@
 import datetime
 
 
+def iter_months(start, end):
+    """Yield ``(year, month)`` pairs from ``start`` through ``end`` inclusive."""
+    year, month = start
+    end_year, end_month = end
+    if not 1 <= month <= 12 or not 1 <= end_month <= 12:
+        raise ValueError("Month must be between 1 and 12")
+    while (year, month) <= (end_year, end_month):
+        yield year, month
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+
+
 class DateService:
     def current_year_month(self, today=None):
         if today is None:
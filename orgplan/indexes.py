@@ -0,0 +1,169 @@
+"""In-memory indexes over task dates and tags."""
+
+import bisect
+import datetime
+
+# Task fields a DueIndex covers, in the order entries of equal date are kept.
+DUE_KINDS = ("deadline", "scheduled")
+
+_MINUTES_PER_DAY = 24 * 60
+
+
+def date_key(value):
+    """Return a sortable integer for a date or datetime, at minute precision."""
+    key = value.toordinal() * _MINUTES_PER_DAY
+    if isinstance(value, datetime.datetime):
+        key += value.hour * 60 + value.minute
+    return key
+
+
+def end_key(value):
+    """Return the last :func:`date_key` covered by ``value`` as an upper bound.
+
+    A plain date covers its whole day.
+    """
+    if isinstance(value, datetime.datetime):
+        return date_key(value)
+    return date_key(value) + _MINUTES_PER_DAY - 1
+
+
+class DueIndex:
+    """Deadline and scheduled dates of tasks, sorted for bisect range lookups.
+
+    Tasks are added in groups, one per source such as a month file, each
+    with an optional fingerprint of the data it was built from; replacing
+    or discarding a group only marks the merged index stale, and the next
+    lookup rebuilds it once. Lookups then cost ``O(log n + k)``.
+    """
+
+    def __init__(self):
+        self._groups = {}
+        self._keys = None
+        self._entries = None
+
+    def __len__(self):
+        return sum(len(group[1]) for group in self._groups.values())
+
+    def sources(self):
+        return list(self._groups)
+
+    def fingerprint(self, source):
+        """Return the fingerprint ``source`` was indexed with, or None."""
+        group = self._groups.get(source)
+        return group[0] if group is not None else None
+
+    def replace(self, source, tasks, fingerprint=None):
+        """Index ``tasks`` as the whole content of ``source``."""
+        entries = []
+        for task in tasks:
+            for kind in DUE_KINDS:
+                for value in getattr(task, kind):
+                    if isinstance(value, datetime.date):
+                        entries.append((date_key(value), value, kind, task))
+        entries.sort(key=lambda entry: entry[0])
+        self._groups[source] = (fingerprint, entries, [entry[0] for entry in entries])
+        self._keys = None
+
+    def discard(self, source):
+        if self._groups.pop(source, None) is not None:
+            self._keys = None
+
+    def between(self, start=None, end=None):
+        """Return ``(date, kind, task)`` entries dated from ``start`` through ``end``.
+
+        Either bound may be None. A plain date as ``end`` includes that whole
+        day. Entries come in date order; a task appears once per matching
+        date.
+        """
+        keys, entries = self._merged()
+        low = 0 if start is None else bisect.bisect_left(keys, date_key(start))
+        high = len(keys) if end is None else bisect.bisect_right(keys, end_key(end))
+        return [entry[1:] for entry in entries[low:high]]
+
+    def sources_between(self, start=None, end=None):
+        """Return the sources with at least one entry dated ``start`` through ``end``."""
+        low = None if start is None else date_key(start)
+        high = None if end is None else end_key(end)
+        found = []
+        for source, (_, _, keys) in self._groups.items():
+            index = 0 if low is None else bisect.bisect_left(keys, low)
+            if index < len(keys) and (high is None or keys[index] <= high):
+                found.append(source)
+        return found
+
+    def iter_from(self, start=None):
+        """Yield ``(date, kind, task)`` entries dated ``start`` or later, in date order."""
+        keys, entries = self._merged()
+        low = 0 if start is None else bisect.bisect_left(keys, date_key(start))
+        for index in range(low, len(entries)):
+            yield entries[index][1:]
+
+    def _merged(self):
+        if self._keys is None:
+            entries = []
+            for source in sorted(self._groups, key=str):
+                entries.extend(self._groups[source][1])
+            entries.sort(key=lambda entry: entry[0])
+            self._entries = entries
+            self._keys = [entry[0] for entry in entries]
+        return self._keys, self._entries
+
+
+class TagIndex:
+    """Postings from each tag to the positions of the tasks carrying it.
+
+    Like :class:`DueIndex`, tasks are added in groups, one per source such
+    as a month file, with an optional fingerprint. :meth:`match` answers
+    all-of and any-of tag queries for a group with set intersections and
+    unions, without looking at the tasks themselves.
+    """
+
+    def __init__(self):
+        self._groups = {}
+
+    def sources(self):
+        return list(self._groups)
+
+    def fingerprint(self, source):
+        """Return the fingerprint ``source`` was indexed with, or None."""
+        group = self._groups.get(source)
+        return group[0] if group is not None else None
+
+    def replace(self, source, tasks, fingerprint=None):
+        """Index ``tasks`` as the whole content of ``source``."""
+        postings = {}
+        count = 0
+        for position, task in enumerate(tasks):
+            for tag in task.tags:
+                postings.setdefault(tag, []).append(position)
+            count += 1
+        postings = {tag: frozenset(positions) for tag, positions in postings.items()}
+        self._groups[source] = (fingerprint, count, postings)
+
+    def discard(self, source):
+        self._groups.pop(source, None)
+
+    def match(self, source, tags=None, any_tags=None):
+        """Return the sorted positions in ``source`` of tasks with all ``tags`` and any of ``any_tags``.
+
+        Without either filter every position matches. An unknown source has
+        no positions.
+        """
+        group = self._groups.get(source)
+        if group is None:
+            return []
+        _, count, postings = group
+        selected = None
+        for tag in dict.fromkeys(tags or ()):
+            positions = postings.get(tag)
+            if not positions:
+                return []
+            selected = positions if selected is None else selected & positions
+            if not selected:
+                return []
+        if any_tags:
+            union = frozenset().union(*(postings.get(tag, ()) for tag in any_tags))
+            selected = union if selected is None else selected & union
+        if selected is None:
+            return list(range(count))
+        return sorted(selected)
@@ -0,0 +1,146 @@
+"""Directory manifest of the month files under a data root."""
+
+import collections
+import os
+import re
+import threading
+import time
+
+# ``(st_mtime_ns, st_size)`` of a month's notes and meta files, each None
+# when the file is absent.
+MonthFiles = collections.namedtuple("MonthFiles", ["notes", "meta"])
+
+_YEAR_DIR_PATTERN = re.compile(r"^\d{4}$")
+_MONTH_FILE_PATTERN = re.compile(r"^(\d{2})-(notes|meta)\.md$")
+
+# A directory modified this recently may change again within the same
+# mtime tick, so its mtime is not trusted to detect the next change.
+_RACY_WINDOW_NS = 2 * 1000 * 1000 * 1000
+
+
+class Manifest:
+    """The ``YYYY/MM-notes.md`` and ``YYYY/MM-meta.md`` files under ``data_root``.
+
+    Each year directory is listed with one ``os.scandir`` pass that records
+    every month file's mtime and size. :meth:`refresh` stats ``data_root``
+    and each year directory and rescans only those whose mtime changed, so
+    when nothing was added, removed or renamed it costs one ``stat`` per
+    year directory. Editing a file in place does not change its
+    directory's mtime: the recorded file stats are as of the last scan, and
+    callers that validate content must still stat the file itself.
+
+    The manifest is safe to share between threads.
+    """
+
+    def __init__(self, data_root):
+        self.data_root = data_root
+        self._root_mtime = None
+        self._years = {}
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Rescan the directories that changed since the last refresh."""
+        with self._lock:
+            try:
+                root_mtime = os.stat(self.data_root).st_mtime_ns
+            except FileNotFoundError:
+                self._root_mtime = None
+                self._years = {}
+                return
+            if root_mtime != self._root_mtime:
+                self._years = {
+                    name: self._years.get(name) for name in _scan_year_dirs(self.data_root)
+                }
+                self._root_mtime = _trusted(root_mtime)
+
+            for name, scanned in list(self._years.items()):
+                path = os.path.join(self.data_root, name)
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                except FileNotFoundError:
+                    del self._years[name]
+                    continue
+                if scanned is None or scanned[0] != mtime:
+                    self._years[name] = (_trusted(mtime), _scan_month_files(path))
+
+    def months(self):
+        """Return the sorted ``(year, month)`` pairs that have a notes file."""
+        return [
+            year_month for year_month, files in self.entries() if files.notes is not None
+        ]
+
+    def files(self, year, month):
+        """Return the ``MonthFiles`` recorded for a month, or None."""
+        scanned = self._years.get(f"{year:04d}")
+        if scanned is None:
+            return None
+        return scanned[1].get(month)
+
+    def entries(self):
+        """Return sorted ``((year, month), MonthFiles)`` pairs for every recorded month."""
+        entries = []
+        for name, scanned in list(self._years.items()):
+            if scanned is not None:
+                year = int(name)
+                entries.extend(((year, month), files) for month, files in scanned[1].items())
+        entries.sort()
+        return entries
+
+
+def split_month_path(data_root, path):
+    """Return ``(year, month, kind)`` for a month file path under ``data_root``, or None.
+
+    ``kind`` is ``"notes"`` or ``"meta"``.
+    """
+    relative = os.path.relpath(path, data_root)
+    parts = relative.split(os.sep)
+    if len(parts) != 2 or not _YEAR_DIR_PATTERN.match(parts[0]):
+        return None
+    match = _MONTH_FILE_PATTERN.match(parts[1])
+    if not match or not 1 <= int(match.group(1)) <= 12:
+        return None
+    return int(parts[0]), int(match.group(1)), match.group(2)
+
+
+def _trusted(mtime):
+    # None forces a rescan on the next refresh.
+    if time.time_ns() - mtime < _RACY_WINDOW_NS:
+        return None
+    return mtime
+
+
+def _scan_year_dirs(data_root):
+    names = []
+    with os.scandir(data_root) as entries:
+        for entry in entries:
+            if _YEAR_DIR_PATTERN.match(entry.name) and entry.is_dir():
+                names.append(entry.name)
+    return names
+
+
+def _scan_month_files(path):
+    found = {}
+    try:
+        entries = os.scandir(path)
+    except FileNotFoundError:
+        return {}
+    with entries:
+        for entry in entries:
+            match = _MONTH_FILE_PATTERN.match(entry.name)
+            if not match or not 1 <= int(match.group(1)) <= 12:
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            month = int(match.group(1))
+            notes, meta = found.get(month, (None, None))
+            fingerprint = (stat.st_mtime_ns, stat.st_size)
+            if match.group(2) == "notes":
+                notes = fingerprint
+            else:
+                meta = fingerprint
+            found[month] = MonthFiles(notes, meta)
+    return found
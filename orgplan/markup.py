@@ -1,14 +1,40 @@
 """Parsing helpers for orgplan markdown files."""
 
+import bisect
 import datetime
+import functools
+import itertools
 import re
+import sys
 
-from orgplan.tasks import Task
+from orgplan.tags import TAGS
+from orgplan.tasks import TASK_FIELDS, Task
 
 
 _TODO_HEADER_PATTERN = re.compile(r"^#\s*TODO List\s*$")
 _HEADER_PATTERN = re.compile(r"^#\s+(.+)$")
 
+# Header and list-item lines; everything else is notes body text. Anchoring on
+# "\n" rather than "^" lets the regex engine skip body text with a fast search.
+_LINE_TOKEN_PATTERN = re.compile(r"\n([^\S\n]*[#-][^\n]*)")
+_FIRST_LINE_TOKEN_PATTERN = re.compile(r"([^\S\n]*[#-][^\n]*)")
+_BYTES_LINE_TOKEN_PATTERN = re.compile(rb"\n([^\S\n]*[#-][^\n]*)")
+_BYTES_FIRST_LINE_TOKEN_PATTERN = re.compile(rb"([^\S\n]*[#-][^\n]*)")
+# Line boundaries recognized by str.splitlines() other than "\n".
+_OTHER_LINE_BREAKS = re.compile("[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+# The same boundaries as UTF-8 byte sequences, except "\r" which is handled
+# separately because "\r\n" is safe to scan as bytes.
+_OTHER_BYTE_LINE_BREAKS = (
+    b"\x0b", b"\x0c", b"\x1c", b"\x1d", b"\x1e", b"\xc2\x85", b"\xe2\x80\xa8", b"\xe2\x80\xa9",
+)
+_LONE_CARRIAGE_RETURN = re.compile(rb"\r(?!\n)")
+
+# Lines compared per list slice when looking for the edited part of a file.
+_COMPARE_BLOCK = 256
+
+# Task fields whose values come from timestamps in the task line or notes.
+_TIMESTAMP_FIELDS = frozenset(("deadline", "scheduled", "timestamp", "due_date"))
+
 _STATUS_MAP = {
     "DONE": "done",
     "CANCELED": "canceled",
@@ -16,42 +42,54 @@ _STATUS_MAP = {
     "PENDING": "pending",
 }
 
-_TAG_SET = {
-    "p0",
-    "p1",
-    "p2",
-    "1h",
-    "2h",
-    "4h",
-    "1d",
-    "blocked",
-    "weekly",
-    "monthly",
-}
+_STATUS_MARKERS = {state: f"[{status}]" for status, state in _STATUS_MAP.items()}
+
+_TAG_SET = frozenset(TAGS)
+
+# A task line split into its list bullet, content and trailing whitespace,
+# the same way _parse_task_line strips it.
+_TASK_LINE_PARTS = re.compile(r"^(\s*[- ]*\s*)(.*?)(\s*)$", re.DOTALL)
+_STATUS_PREFIX = re.compile(r"^\[([A-Z]+)\](\s+)(?=\S)")
+_WORD_SEPARATOR = re.compile(r"(\s+)")
+
+# Regex flags kept per pattern when extension line patterns are combined.
+_SCOPED_FLAGS = ((re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"), (re.VERBOSE, "x"))
+# Leading global flags such as "(?i)", which are only valid at the start of a
+# pattern; they are re-applied as scoped flags instead.
+_INLINE_FLAGS_PATTERN = re.compile(r"^\(\?[aiLmsux]+\)")
 
 # Timestamp pattern: <YYYY-MM-DD> or <YYYY-MM-DD Day> or <YYYY-MM-DD Day HH:MM>
+# Group 1 is the YYYY-MM-DD date and group 2 the optional HH:MM time. The
+# leading "<" literal lets the regex engine skip plain text quickly;
+# DEADLINE:/SCHEDULED: prefixes are classified by looking back from each match.
 _TIMESTAMP_PATTERN = re.compile(
-    r"<(?P<year>\d{4})-(?P<month>\d{2})-(?P<day>\d{2})"
+    r"<(\d{4}-\d{2}-\d{2})"
     r"(?:\s+\w+)?"  # Optional day name (Mon, Tue, Wednesday, etc)
-    r"(?:\s+(?P<hour>\d{2}):(?P<minute>\d{2}))?"  # Optional time HH:MM
+    r"(?:\s+(\d{2}:\d{2}))?"  # Optional time HH:MM
     r">"
 )
 
 
-def _extract_datetime(match):
-    """Extract datetime.date or datetime.datetime from a regex match."""
+@functools.lru_cache(maxsize=4096)
+def _decode_timestamp(date_text, time_text):
+    """Decode ``YYYY-MM-DD`` and optional ``HH:MM`` text by slicing.
+
+    Month files repeat the same handful of dates many times, so results are
+    memoized. Returns None for impossible dates such as ``2025-02-30``.
+    """
     try:
-        year = int(match.group("year"))
-        month = int(match.group("month"))
-        day = int(match.group("day"))
-        hour = match.group("hour")
-        minute = match.group("minute")
-
-        if hour and minute:
-            return datetime.datetime(year, month, day, int(hour), int(minute))
-        else:
-            return datetime.date(year, month, day)
-    except (ValueError, AttributeError):
+        if time_text is None:
+            return datetime.date(
+                int(date_text[:4]), int(date_text[5:7]), int(date_text[8:10])
+            )
+        return datetime.datetime(
+            int(date_text[:4]),
+            int(date_text[5:7]),
+            int(date_text[8:10]),
+            int(time_text[:2]),
+            int(time_text[3:5]),
+        )
+    except ValueError:
         return None
 
 
@@ -64,133 +102,798 @@ def _parse_timestamps(text):
     deadlines = []
     scheduled_list = []
     plain_timestamps = []
+    if "<" not in text:
+        return deadlines, scheduled_list, plain_timestamps
 
-    # Track which character positions contain prefixed timestamps
-    prefixed_timestamp_starts = set()
-
-    # Parse DEADLINE: timestamps - track where the <timestamp> portion starts
-    for match in re.finditer(r"DEADLINE:\s*(<\d{4}-\d{2}-\d{2}[^>]*>)", text):
-        # Find the actual timestamp within this match
-        ts_match = _TIMESTAMP_PATTERN.search(match.group(0))
-        if ts_match:
-            dt = _extract_datetime(ts_match)
-            if dt:
-                deadlines.append(dt)
-                # Record the absolute position of the timestamp
-                prefixed_timestamp_starts.add(match.start() + ts_match.start())
-
-    # Parse SCHEDULED: timestamps
-    for match in re.finditer(r"SCHEDULED:\s*(<\d{4}-\d{2}-\d{2}[^>]*>)", text):
-        ts_match = _TIMESTAMP_PATTERN.search(match.group(0))
-        if ts_match:
-            dt = _extract_datetime(ts_match)
-            if dt:
-                scheduled_list.append(dt)
-                prefixed_timestamp_starts.add(match.start() + ts_match.start())
-
-    # Parse plain timestamps (exclude those already found as prefixed)
     for match in _TIMESTAMP_PATTERN.finditer(text):
-        if match.start() in prefixed_timestamp_starts:
+        dt = _decode_timestamp(*match.groups())
+        if dt is None:
             continue
 
-        dt = _extract_datetime(match)
-        if dt:
+        # Walk back over whitespace to find a DEADLINE:/SCHEDULED: prefix.
+        prefix_end = match.start()
+        while prefix_end and text[prefix_end - 1].isspace():
+            prefix_end -= 1
+        if text.endswith("DEADLINE:", 0, prefix_end):
+            deadlines.append(dt)
+        elif text.endswith("SCHEDULED:", 0, prefix_end):
+            scheduled_list.append(dt)
+        else:
             plain_timestamps.append(dt)
 
     return deadlines, scheduled_list, plain_timestamps
 
 
-def parse_todo_list(text):
+def parse_todo_list(text, extensions=None):
     """Parse tasks from the TODO list section of a monthly notes file."""
-    lines = text.splitlines()
-    in_todo = False
-    tasks = []
+    tasks, _ = _scan_month(_normalize_newlines(text), notes=False, extensions=extensions)
+    return tasks
 
-    for i, line in enumerate(lines, 1):
-        stripped = line.strip()
-        if _TODO_HEADER_PATTERN.match(stripped):
-            in_todo = True
-            continue
 
-        if in_todo and stripped.startswith("#"):
-            break
+def parse_month_notes(text, lazy=False, fields=None, extensions=None):
+    """Parse tasks from the TODO list and attach matching notes sections.
 
-        if not in_todo:
-            continue
+    With ``lazy=True`` the tasks are :class:`LazyTask` objects that keep the
+    offsets of their notes sections and only build ``notes`` and the
+    timestamp lists when one of them is first accessed.
 
-        if not stripped.startswith("-"):
-            continue
+    ``fields`` optionally names the task fields the caller needs (see
+    ``orgplan.tasks.TASK_FIELDS``). Notes binding and timestamp extraction
+    are skipped when none of the fields depend on them; skipped fields keep
+    their defaults.
 
-        task = _parse_task_line(stripped, line_number=i)
-        if task is not None:
-            tasks.append(task)
+    ``extensions`` is an optional :class:`ParserExtensions` whose tokens are
+    recognized on task lines and notes headers during the same scan.
+    """
+    notes, timestamps = projection_needs(fields)
+    text = _normalize_newlines(text)
+    tasks, sections = _scan_month(
+        text, notes=notes, lazy=lazy, timestamps=timestamps, extensions=extensions
+    )
+    if not tasks or not notes:
+        return tasks
+
+    task_map = {task.title: task for task in tasks}
+    for title, start, end in sections:
+        task = task_map.get(title)
+        if task is None:
+            continue
+        if lazy:
+            task._source = text
+            task._sections.append((start, end))
+        else:
+            _attach_notes(task, _trim_notes(text[start:end]), timestamps)
 
     return tasks
 
 
-def parse_month_notes(text):
-    """Parse tasks from the TODO list and attach matching notes sections."""
-    tasks = parse_todo_list(text)
+class LazyTask(Task):
+    """A parsed task whose notes and timestamps are built on first access.
+
+    Behaves like :class:`orgplan.tasks.Task`; ``notes``, ``deadline``,
+    ``scheduled`` and ``timestamp`` are materialized together from the task
+    line and the recorded notes section offsets the first time any of them
+    is read. Assigning one of them directly is kept as-is.
+    """
+
+    __slots__ = ("_content", "_source", "_sections")
+
+    _LAZY_FIELDS = frozenset(("notes", "deadline", "scheduled", "timestamp"))
+
+    def __init__(self, title, state, tags, line_number, content, extras=None):
+        self.title = title
+        self.state = state
+        self._legacy_due_date = None
+        self.tags = tags
+        self.line_number = line_number
+        self.extras = extras
+        self._content = content
+        self._source = None
+        self._sections = []
+
+    def __getattr__(self, name):
+        if name not in LazyTask._LAZY_FIELDS:
+            raise AttributeError(name)
+        self._materialize()
+        return object.__getattribute__(self, name)
+
+    def _unbuilt_parts(self):
+        """Return ``(content, source, sections)`` to record this task unbuilt.
+
+        ``source`` holds only the task's notes sections and ``sections`` the
+        offsets into it. Returns None once the lazy fields were built.
+        """
+        try:
+            object.__getattribute__(self, "notes")
+            return None
+        except AttributeError:
+            pass
+        bodies = []
+        sections = []
+        offset = 0
+        for start, end in self._sections:
+            body = self._source[start:end]
+            bodies.append(body)
+            sections.append((offset, offset + len(body)))
+            offset += len(body)
+        return self._content, "".join(bodies), tuple(sections)
+
+    @classmethod
+    def _from_record(cls, record):
+        title, state, tags, line_number, extras, content, source, sections = record
+        if extras:
+            extras = {key: list(value) if isinstance(value, tuple) else value
+                      for key, value in extras.items()}
+        task = cls(title, sys.intern(state), tags, line_number, content, extras=extras)
+        if sections:
+            task._source = source
+            task._sections = list(sections)
+        return task
+
+    def _materialize(self):
+        deadlines, scheduled_list, timestamps = _parse_timestamps(self._content)
+        notes = None
+        for start, end in self._sections:
+            notes = _trim_notes(self._source[start:end])
+            if notes and not (deadlines or scheduled_list or timestamps):
+                deadlines, scheduled_list, timestamps = _parse_timestamps(notes)
+
+        values = {
+            "notes": notes,
+            "deadline": deadlines,
+            "scheduled": scheduled_list,
+            "timestamp": timestamps,
+        }
+        for name, value in values.items():
+            try:
+                object.__getattribute__(self, name)
+            except AttributeError:
+                setattr(self, name, value)
+        self._source = None
+        self._sections = []
+
+
+class ParserExtensions:
+    """Extra tokens recognized on task lines during the normal parsing pass.
+
+    Plugins register them through ``Registry``:
+
+    - ``add_tags`` accepts ``#tag`` words, so they are taken out of titles
+      like the built-in tags. They are kept in ``extra_tags``, outside the
+      bit mask, which stays the same for every store.
+    - ``add_tag_prefix`` accepts every ``#tag`` starting with a prefix, such
+      as ``project-``; those tags are kept in ``extra_tags`` too.
+    - ``add_key`` takes ``key:value`` words out of titles into
+      ``task.extras[key]``.
+    - ``add_line_pattern`` stores the matches of a regex on the task line in
+      ``task.extras[name]`` as a list. A pattern with one group contributes
+      that group, otherwise the whole match. All patterns are combined into
+      one regex, so each line is scanned once and a span matched by one
+      pattern is not matched again by another.
+
+    Register extensions before parsing: tasks already parsed, and section
+    index caches built with other extensions, are not updated.
+    """
+
+    def __init__(self):
+        self.tags = set()
+        self.tag_prefixes = ()
+        self.keys = set()
+        self.version = 0
+        self._patterns = {}
+        self._line_pattern = None
+        self._pattern_groups = ()
+
+    def __bool__(self):
+        return bool(self.tags or self.tag_prefixes or self.keys or self._patterns)
+
+    def add_tags(self, *tags):
+        for tag in tags:
+            if not tag or tag.startswith("#") or any(char.isspace() for char in tag):
+                raise ValueError(f"Invalid tag: {tag!r}")
+            self.tags.add(tag)
+        self.version += 1
+
+    def add_tag_prefix(self, prefix):
+        if not prefix or prefix.startswith("#"):
+            raise ValueError(f"Invalid tag prefix: {prefix!r}")
+        if prefix not in self.tag_prefixes:
+            self.tag_prefixes += (prefix,)
+        self.version += 1
+
+    def add_key(self, key):
+        if not key or ":" in key or any(char.isspace() for char in key):
+            raise ValueError(f"Invalid key: {key!r}")
+        self._check_name(key)
+        self.keys.add(key)
+        self.version += 1
+
+    def add_line_pattern(self, name, pattern):
+        self._check_name(name)
+        pattern = re.compile(pattern)
+        if pattern.groups > 1:
+            raise ValueError(f"Line pattern {name!r} has more than one group")
+        patterns = dict(self._patterns)
+        patterns[name] = pattern
+        self._compile(patterns)
+        self._patterns = patterns
+        self.version += 1
+
+    def signature(self):
+        """Return a plain, comparable description of the registered tokens."""
+        return (
+            tuple(sorted(self.tags)),
+            self.tag_prefixes,
+            tuple(sorted(self.keys)),
+            tuple((name, pattern.pattern, pattern.flags)
+                  for name, pattern in self._patterns.items()),
+        )
+
+    def is_tag(self, tag):
+        return tag in self.tags or (bool(self.tag_prefixes) and tag.startswith(self.tag_prefixes))
+
+    def match_line(self, content, extras):
+        """Add the line pattern matches in ``content`` to ``extras``."""
+        if self._line_pattern is None:
+            return extras
+        for match in self._line_pattern.finditer(content):
+            name, group = self._pattern_groups[match.lastindex]
+            if extras is None:
+                extras = {}
+            extras.setdefault(name, []).append(match.group(group))
+        return extras
+
+    def _check_name(self, name):
+        if name in self.keys or name in self._patterns:
+            raise ValueError(f"Extension already registered: {name}")
+
+    def _compile(self, patterns):
+        parts = []
+        groups = {}
+        index = 1
+        for name, pattern in patterns.items():
+            flags = "".join(
+                letter for flag, letter in _SCOPED_FLAGS if pattern.flags & flag
+            )
+            if flags:
+                source = _INLINE_FLAGS_PATTERN.sub("", pattern.pattern, count=1)
+                parts.append(f"((?{flags}:{source}))")
+            else:
+                parts.append(f"({pattern.pattern})")
+            groups[index] = (name, index + pattern.groups)
+            index += pattern.groups + 1
+        try:
+            self._line_pattern = re.compile("|".join(parts))
+        except re.error as error:
+            raise ValueError(f"Line patterns cannot be combined: {error}") from error
+        self._pattern_groups = groups
+
+
+def iter_month_notes(handle, notes=True, fields=None, extensions=None):
+    """Yield tasks from an open month file without reading it into memory.
+
+    ``handle`` is any iterable of text lines, such as a file opened in text
+    mode. With ``notes=False`` tasks are yielded as soon as their TODO line is
+    read and iteration stops at the end of the TODO list, so the rest of the
+    file is never read. With ``notes=True`` the whole file is consumed and
+    tasks are yielded once their notes are bound; only the bodies of sections
+    that can match a task are kept in memory. ``fields`` narrows the work
+    further and ``extensions`` adds tokens, as in :func:`parse_month_notes`.
+    """
+    needs_notes, timestamps = projection_needs(fields)
+    notes = notes and needs_notes
+    tasks = []
+    sections = []
+    in_todo = False
+    todo_done = False
+    wanted = None
+    body = None
+
+    for line_number, line in enumerate(_iter_lines(handle), 1):
+        head = line[:1]
+        if head.isspace():
+            head = line.lstrip()[:1]
+        if head == "#":
+            stripped = line.strip()
+            is_todo_header = _TODO_HEADER_PATTERN.match(stripped) is not None
+            if is_todo_header:
+                in_todo = in_todo or not todo_done
+            elif in_todo:
+                in_todo = False
+                todo_done = True
+                if not notes:
+                    return
+                wanted = {task.title for task in tasks}
+
+            header_match = _HEADER_PATTERN.match(stripped) if notes else None
+            if header_match:
+                body = None
+                if not is_todo_header:
+                    title = _normalize_header_title(header_match.group(1), extensions)
+                    if wanted is None or title in wanted:
+                        body = []
+                        sections.append((title, body))
+                continue
+        elif head == "-" and in_todo:
+            task = _parse_task_line(
+                line.strip(),
+                line_number=line_number,
+                timestamps=timestamps,
+                extensions=extensions,
+            )
+            if task is not None:
+                if not notes:
+                    yield task
+                else:
+                    tasks.append(task)
+
+        if body is not None:
+            body.append(line)
+
     task_map = {task.title: task for task in tasks}
-    if not task_map:
+    for title, body in sections:
+        task = task_map.get(title)
+        if task is not None:
+            _attach_notes(task, _trim_notes("\n".join(body)), timestamps)
+
+    yield from tasks
+
+
+def projection_needs(fields):
+    """Return ``(notes, timestamps)`` flags for the parsing a projection needs.
+
+    Notes sections must be bound when ``notes`` is requested, and also for
+    any timestamp field because timestamps fall back to the notes body.
+    """
+    if fields is None:
+        return True, True
+    fields = set(fields)
+    unknown = fields.difference(TASK_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown task fields: {', '.join(sorted(unknown))}")
+    timestamps = not fields.isdisjoint(_TIMESTAMP_FIELDS)
+    return timestamps or "notes" in fields, timestamps
+
+
+def _iter_lines(handle):
+    """Yield lines from ``handle`` split the same way as ``str.splitlines``."""
+    for chunk in handle:
+        yield from chunk.splitlines()
+
+
+def parse_month_buffer(buffer, fields=None, extensions=None):
+    """Parse UTF-8 month file bytes, such as an ``mmap``, like ``parse_month_notes``.
+
+    Header and list-item lines are found by scanning the bytes; only those
+    lines and the notes sections bound to a task are decoded, and the buffer
+    is not read past the TODO list when ``fields`` needs no notes.
+    """
+    notes, timestamps = projection_needs(fields)
+    scanned = _scan_month(buffer, notes=notes, timestamps=timestamps, extensions=extensions)
+    if scanned is None:
+        text = buffer[:].decode("utf-8")
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return parse_month_notes(text, fields=fields, extensions=extensions)
+
+    tasks, sections = scanned
+    if not tasks or not notes:
         return tasks
 
-    lines = text.splitlines()
+    task_map = {task.title: task for task in tasks}
+    for title, start, end in sections:
+        task = task_map.get(title)
+        if task is not None:
+            _attach_notes(task, decode_notes(buffer[start:end]), timestamps)
+
+    return tasks
+
+
+def build_section_index(buffer, extensions=None):
+    """Map each notes header title in UTF-8 ``buffer`` to its body byte ranges.
+
+    Returns a dict of normalized title to a list of ``(start, end)`` offsets,
+    one per section in file order, so duplicate titles keep every section.
+    Returns None if the buffer uses line breaks other than LF/CRLF, where
+    byte offsets would not line up with the parser's lines.
+    """
+    scanned = _scan_month(buffer, timestamps=False, extensions=extensions)
+    if scanned is None:
+        return None
+    _, sections = scanned
+    index = {}
+    for title, start, end in sections:
+        index.setdefault(title, []).append((start, end))
+    return index
+
+
+def find_section_notes(text, title, extensions=None):
+    """Return the notes of every section headed ``title`` in ``text``, in order."""
+    text = _normalize_newlines(text)
+    _, sections = _scan_month(text, timestamps=False, extensions=extensions)
+    return [_trim_notes(text[start:end]) for name, start, end in sections if name == title]
+
+
+class IncrementalMonthParser:
+    """Re-parse a month file after an edit, re-tokenizing only what changed.
+
+    The first :meth:`parse` runs a full parse and keeps the file's lines,
+    the positions of its header lines, the TODO list and notes section
+    boundaries, and the line each task came from. A later call with the
+    edited text compares it with the kept lines to find the changed line
+    range. When that range contains no header line, only the task lines in
+    it are parsed again and only the tasks whose title gained or lost a
+    task line or notes section are rebuilt; every other ``Task`` object is
+    reused, with its ``line_number`` shifted in place if lines were added or
+    removed above it. An edit touching a header line, or parsing with
+    changed ``extensions``, falls back to a full parse.
+
+    Results match :func:`parse_month_notes` with every field. The returned
+    tasks are shared with the parser's state, so callers that hand them
+    out should copy them. ``last_mode`` records how the last call was
+    served: ``"full"``, ``"incremental"`` or ``"unchanged"``.
+    """
+
+    def __init__(self, extensions=None):
+        self.extensions = extensions
+        self.last_mode = None
+        self._version = None
+        self._lines = None
+        self._headers = []
+        self._todo = None
+        # Parallel lists: a section's title, header line and end line (the
+        # next section's header line, or the line count).
+        self._section_titles = []
+        self._section_headers = []
+        self._section_ends = []
+        # Parallel lists: each task, its title and its line index.
+        self._tasks = []
+        self._titles = []
+        self._task_lines = []
+
+    def parse(self, text):
+        """Return the tasks of ``text``, reusing the previous parse where possible."""
+        # Split on the same boundaries _normalize_newlines turns into "\n".
+        lines = text.splitlines()
+        extensions = self.extensions if self.extensions else None
+        version = extensions.version if extensions is not None else None
+        if self._lines is not None and version == self._version:
+            if self._update(lines, extensions):
+                return list(self._tasks)
+        self._build(lines, extensions)
+        self._version = version
+        self.last_mode = "full"
+        return list(self._tasks)
+
+    def _build(self, lines, extensions):
+        headers = []
+        section_titles = []
+        section_headers = []
+        task_lines = []
+        tasks = []
+        todo_start = todo_end = None
+        in_todo = False
+        in_section = False
+        for index, line in enumerate(lines):
+            stripped = line.strip()
+            head = stripped[:1]
+            if head == "#":
+                headers.append(index)
+                is_todo_header = _TODO_HEADER_PATTERN.match(stripped) is not None
+                if is_todo_header:
+                    if todo_start is None:
+                        todo_start = index
+                        in_todo = True
+                elif in_todo:
+                    in_todo = False
+                    todo_end = index
+                header_match = _HEADER_PATTERN.match(stripped)
+                if header_match:
+                    if in_section:
+                        section_headers.append(index)
+                    in_section = not is_todo_header
+                    if in_section:
+                        section_titles.append(
+                            _normalize_header_title(header_match.group(1), extensions)
+                        )
+                        section_headers.append(index)
+            elif head == "-" and in_todo:
+                task = _parse_task_line(stripped, line_number=index + 1, extensions=extensions)
+                if task is not None:
+                    task_lines.append(index)
+                    tasks.append(task)
+        if in_section:
+            section_headers.append(len(lines))
+        if todo_start is not None and todo_end is None:
+            todo_end = len(lines)
+
+        self._lines = lines
+        self._headers = headers
+        self._todo = (todo_start, todo_end) if todo_start is not None else None
+        self._section_titles = section_titles
+        self._section_ends = section_headers[1::2]
+        self._section_headers = section_headers[::2]
+        self._tasks = tasks
+        self._titles = [task.title for task in tasks]
+        self._task_lines = task_lines
+        self._bind_notes(set(self._titles), range(len(tasks)))
+
+    def _update(self, lines, extensions):
+        """Apply the edit from the kept lines to ``lines``; False if it needs a full parse."""
+        start, old_end, new_end = _changed_lines(self._lines, lines)
+        if start == old_end == new_end:
+            self._lines = lines
+            self.last_mode = "unchanged"
+            return True
+        position = bisect.bisect_left(self._headers, start)
+        if position < len(self._headers) and self._headers[position] < old_end:
+            return False
+        for line in itertools.islice(lines, start, new_end):
+            if line.lstrip()[:1] == "#":
+                return False
+
+        # The edit lies between two header lines: inside the TODO list, a
+        # notes section body, or text that belongs to neither.
+        affected = set()
+        low = bisect.bisect_left(self._task_lines, start)
+        high = bisect.bisect_left(self._task_lines, old_end)
+        added_lines = []
+        added = []
+        if self._todo is not None and self._todo[0] < start <= self._todo[1]:
+            affected.update(self._titles[low:high])
+            for index in range(start, new_end):
+                stripped = lines[index].strip()
+                if stripped[:1] == "-":
+                    task = _parse_task_line(
+                        stripped, line_number=index + 1, extensions=extensions
+                    )
+                    if task is not None:
+                        added_lines.append(index)
+                        added.append(task)
+                        affected.add(task.title)
+        section = bisect.bisect_left(self._section_headers, start) - 1
+        if section >= 0 and start <= self._section_ends[section]:
+            affected.add(self._section_titles[section])
+
+        shift = new_end - old_end
+        if shift:
+            for task in itertools.islice(self._tasks, high, None):
+                task.line_number += shift
+            self._task_lines[high:] = [index + shift for index in self._task_lines[high:]]
+            self._headers[position:] = [index + shift for index in self._headers[position:]]
+            self._section_headers = _shift_from(self._section_headers, old_end, shift)
+            self._section_ends = _shift_from(self._section_ends, old_end, shift)
+            if self._todo is not None:
+                self._todo = tuple(_shift_from(list(self._todo), old_end, shift))
+        self._tasks[low:high] = added
+        self._titles[low:high] = [task.title for task in added]
+        self._task_lines[low:high] = added_lines
+        self._lines = lines
+        self._bind_notes(affected, range(low, low + len(added)))
+        self.last_mode = "incremental"
+        return True
+
+    def _bind_notes(self, titles, fresh):
+        """Rebuild the tasks titled ``titles`` and attach their notes sections.
+
+        As in :func:`parse_month_notes`, a title's sections bind to its last
+        task. Tasks at the ``fresh`` positions were just parsed and are kept.
+        """
+        extensions = self.extensions if self.extensions else None
+        for title in titles:
+            indexes = _positions(self._titles, title)
+            if not indexes:
+                continue
+            for index in indexes:
+                if index not in fresh:
+                    line_index = self._task_lines[index]
+                    self._tasks[index] = _parse_task_line(
+                        self._lines[line_index].strip(),
+                        line_number=line_index + 1,
+                        extensions=extensions,
+                    )
+            task = self._tasks[indexes[-1]]
+            for section in _positions(self._section_titles, title):
+                body = "\n".join(
+                    self._lines[self._section_headers[section] + 1:self._section_ends[section]]
+                )
+                _attach_notes(task, _trim_notes(body))
+
+
+def decode_notes(body):
+    """Decode a raw notes section body the way the parser binds it."""
+    return _trim_notes(body.decode("utf-8").replace("\r\n", "\n"))
+
+
+def _is_plain_byte_buffer(buffer, end):
+    """Return True if ``"\n"`` and ``"\r\n"`` are the only line breaks in ``buffer[:end]``."""
+    if buffer.find(b"\r", 0, end) != -1 and _LONE_CARRIAGE_RETURN.search(buffer, 0, end):
+        return False
+    return all(buffer.find(mark, 0, end) == -1 for mark in _OTHER_BYTE_LINE_BREAKS)
+
+
+def _normalize_newlines(text):
+    """Return ``text`` with every ``str.splitlines`` boundary turned into ``\\n``."""
+    if _OTHER_LINE_BREAKS.search(text) is None:
+        return text
+    return "\n".join(text.splitlines())
+
+
+def _scan_month(text, notes=True, lazy=False, timestamps=True, extensions=None):
+    """Tokenize a month file in one walk over the buffer.
+
+    Only header and list-item lines are visited; notes bodies are skipped by
+    the regex engine. Returns ``(tasks, sections)`` where each section is a
+    ``(title, start, end)`` tuple and ``text[start:end]`` is the section body.
+    With ``notes=False`` the walk stops at the end of the TODO list.
+
+    ``text`` may also be a UTF-8 bytes-like buffer, in which case offsets are
+    byte offsets and only the visited lines are decoded. Returns None for a
+    buffer whose scanned part has line breaks other than LF/CRLF, where its
+    lines would not match ``str.splitlines``.
+    """
+    if extensions is not None and not extensions:
+        extensions = None
+    tasks = []
+    sections = []
+    in_todo = False
+    todo_done = False
     current_title = None
-    current_lines = []
+    current_start = 0
+    line_number = 1
+    counted = 0
+
+    is_text = isinstance(text, str)
+    if is_text:
+        newline = "\n"
+        matches = _LINE_TOKEN_PATTERN.finditer(text)
+        first = _FIRST_LINE_TOKEN_PATTERN.match(text)
+    else:
+        newline = b"\n"
+        matches = _BYTES_LINE_TOKEN_PATTERN.finditer(text)
+        first = _BYTES_FIRST_LINE_TOKEN_PATTERN.match(text)
+    if first is not None:
+        matches = itertools.chain((first,), matches)
+
+    end = len(text)
+    for match in matches:
+        line_start = match.start(1)
+        if is_text:
+            stripped = match.group(1).strip()
+        else:
+            stripped = match.group(1).decode("utf-8").strip()
+        if stripped[0] == "#":
+            is_todo_header = _TODO_HEADER_PATTERN.match(stripped) is not None
+            if is_todo_header:
+                in_todo = in_todo or not todo_done
+            elif in_todo:
+                in_todo = False
+                todo_done = True
+                if not notes:
+                    end = line_start
+                    break
+
+            header_match = _HEADER_PATTERN.match(stripped)
+            if header_match:
+                if current_title is not None:
+                    sections.append((current_title, current_start, line_start))
+                if is_todo_header:
+                    current_title = None
+                else:
+                    current_title = _normalize_header_title(header_match.group(1), extensions)
+                    current_start = match.end(1) + 1
+        elif in_todo:
+            line_number += text[counted:line_start].count(newline)
+            counted = line_start
+            task = _parse_task_line(
+                stripped,
+                line_number=line_number,
+                lazy=lazy,
+                timestamps=timestamps,
+                extensions=extensions,
+            )
+            if task is not None:
+                tasks.append(task)
+
+    if not is_text and not _is_plain_byte_buffer(text, end):
+        return None
+    if notes and current_title is not None:
+        sections.append((current_title, current_start, len(text)))
 
-    def flush():
-        if current_title is None:
-            return
-        task = task_map.get(current_title)
-        if task is not None:
-            notes = "\n".join(current_lines)
-            notes_lines = notes.splitlines()
-            while notes_lines and not notes_lines[0].strip():
-                notes_lines.pop(0)
-            while notes_lines and not notes_lines[-1].strip():
-                notes_lines.pop()
-            task.notes = "\n".join(notes_lines)
-
-            # Extract timestamps from notes (only if not already set from task line)
-            if task.notes and not (task.deadline or task.scheduled or task.timestamp):
-                deadlines, scheduled_list, timestamps = _parse_timestamps(task.notes)
-                task.deadline = deadlines
-                task.scheduled = scheduled_list
-                task.timestamp = timestamps
-
-    for line in lines:
-        stripped = line.strip()
-        header_match = _HEADER_PATTERN.match(stripped)
-        if header_match:
-            flush()
-            title = _normalize_header_title(header_match.group(1))
-            if _TODO_HEADER_PATTERN.match(stripped):
-                current_title = None
-                current_lines = []
-            else:
-                current_title = title
-                current_lines = []
-            continue
+    return tasks, sections
 
-        if current_title is not None:
-            current_lines.append(line)
 
-    flush()
-    return tasks
+def _changed_lines(old, new):
+    """Return ``(start, old_end, new_end)`` bounding the lines that differ.
+
+    ``old[start:old_end]`` was replaced by ``new[start:new_end]``; the lines
+    before ``start`` and after the ends are equal. Runs of lines are
+    compared as list slices first so most of the work stays in C.
+    """
+    limit = min(len(old), len(new))
+    start = 0
+    step = _COMPARE_BLOCK
+    while step:
+        while start + step <= limit and old[start:start + step] == new[start:start + step]:
+            start += step
+        step //= 4
+    # Lines matched from the end, without overlapping the common prefix.
+    limit -= start
+    common = 0
+    step = _COMPARE_BLOCK
+    while step:
+        while common + step <= limit and (
+            old[len(old) - common - step:len(old) - common]
+            == new[len(new) - common - step:len(new) - common]
+        ):
+            common += step
+        step //= 4
+    return start, len(old) - common, len(new) - common
+
+
+def _shift_from(indexes, first, shift):
+    """Return sorted ``indexes`` with those at or after ``first`` moved by ``shift``."""
+    split = bisect.bisect_left(indexes, first)
+    return indexes[:split] + [index + shift for index in indexes[split:]]
+
+
+def _positions(values, value):
+    """Return every index of ``value`` in the list ``values``."""
+    found = []
+    index = -1
+    try:
+        while True:
+            index = values.index(value, index + 1)
+            found.append(index)
+    except ValueError:
+        return found
+
+
+def _trim_notes(body):
+    """Drop leading and trailing blank lines from a notes section body."""
+    content = body.strip()
+    if not content:
+        return ""
+    first = len(body) - len(body.lstrip())
+    last = len(body.rstrip())
+    start = body.rfind("\n", 0, first) + 1
+    end = body.find("\n", last)
+    if end == -1:
+        end = len(body)
+    return body[start:end]
+
 
+def _attach_notes(task, notes, timestamps=True):
+    task.notes = notes
 
-def _parse_task_line(line, line_number=None):
+    # Extract timestamps from notes (only if not already set from task line,
+    # and only if the task line's timestamps were parsed)
+    if timestamps and task.notes and not (task.deadline or task.scheduled or task.timestamp):
+        deadlines, scheduled_list, timestamps = _parse_timestamps(task.notes)
+        task.deadline = deadlines
+        task.scheduled = scheduled_list
+        task.timestamp = timestamps
+
+
+def _parse_task_line(line, line_number=None, lazy=False, timestamps=True, extensions=None):
     content = line.lstrip("- ").strip()
     if not content:
         return None
 
-    state, tags, title = parse_title_parts(content)
+    state, tags, title, extras = _split_title(content, extensions)
     if not title:
         return None
+    if extensions is not None:
+        extras = extensions.match_line(content, extras)
+
+    if lazy:
+        return LazyTask(title, state, tags, line_number, content, extras=extras)
+    if not timestamps:
+        return Task(
+            title=title, state=state, tags=tags, line_number=line_number, extras=extras
+        )
 
     # Extract timestamps from the task line
-    deadlines, scheduled_list, timestamps = _parse_timestamps(content)
+    deadlines, scheduled_list, plain_timestamps = _parse_timestamps(content)
 
     return Task(
         title=title,
@@ -199,11 +902,74 @@ def _parse_task_line(line, line_number=None):
         line_number=line_number,
         deadline=deadlines,
         scheduled=scheduled_list,
-        timestamp=timestamps,
+        timestamp=plain_timestamps,
+        extras=extras,
     )
 
 
-def parse_title_parts(content):
+def patch_task_line(line, state=None, add_tags=(), remove_tags=(), extensions=None):
+    """Return a task line with its status block and tags changed.
+
+    ``state`` replaces the status block ("open" drops it; None keeps it).
+    Tags in ``remove_tags`` are taken out of the line, and tags in
+    ``add_tags`` the line lacks are inserted after its leading tags. The
+    bullet, the title, other words and their spacing are kept as written.
+    Raises ValueError for an unknown state or a tag the parser would not
+    recognize, which would otherwise end up in the title.
+    """
+    prefix, content, trailing = _TASK_LINE_PARTS.match(line).groups()
+    marker = separator = ""
+    status = _STATUS_PREFIX.match(content)
+    if status and status.group(1) in _STATUS_MAP:
+        marker, separator = f"[{status.group(1)}]", status.group(2)
+        content = content[status.end():]
+    if state is not None:
+        if state != "open" and state not in _STATUS_MARKERS:
+            raise ValueError(f"Unknown state: {state}")
+        marker = _STATUS_MARKERS.get(state, "")
+        separator = separator or " "
+
+    def is_tag(word):
+        tag = word[1:]
+        return word.startswith("#") and (
+            tag in _TAG_SET or (extensions is not None and extensions.is_tag(tag))
+        )
+
+    tokens = _WORD_SEPARATOR.split(content)
+    words = [
+        [word, space] for word, space in zip(tokens[0::2], tokens[1::2] + [""])
+        if not (word[1:] in remove_tags and is_tag(word))
+    ]
+    present = {word for word, _ in words}
+    insert_at = 0
+    while insert_at < len(words) and is_tag(words[insert_at][0]):
+        insert_at += 1
+    for tag in add_tags:
+        word = f"#{tag}"
+        if word in present:
+            continue
+        if not is_tag(word):
+            raise ValueError(f"Unknown tag: {tag}")
+        words.insert(insert_at, [word, " "])
+        present.add(word)
+        insert_at += 1
+    for entry in words[:-1]:
+        entry[1] = entry[1] or " "
+    if words:
+        words[-1][1] = ""
+    content = "".join(word + space for word, space in words)
+    if marker:
+        content = marker + separator + content if content else marker
+    return prefix + content + trailing
+
+
+def parse_title_parts(content, extensions=None):
+    state, tags, title, _ = _split_title(content, extensions)
+    return state, tags, title
+
+
+def _split_title(content, extensions):
+    """Return ``(state, tags, title, extras)`` for a task line's content."""
     state = "open"
     match = re.match(r"^\[(?P<status>[A-Z]+)\]\s+(?P<body>.+)$", content)
     if match and match.group("status") in _STATUS_MAP:
@@ -213,21 +979,30 @@ def parse_title_parts(content):
     words = content.split()
     tags = []
     title_words = []
+    extras = None
+    keys = extensions.keys if extensions is not None else None
     for word in words:
         if word.startswith("#"):
             tag = word[1:]
-            if tag in _TAG_SET:
+            if tag in _TAG_SET or (extensions is not None and extensions.is_tag(tag)):
                 tags.append(tag)
                 continue
+        elif keys and ":" in word:
+            key, _, value = word.partition(":")
+            if value and key in keys:
+                if extras is None:
+                    extras = {}
+                extras[key] = value
+                continue
         title_words.append(word)
 
     title = " ".join(title_words).strip()
-    return state, tags, title
+    return state, tags, title, extras
 
 
-def _normalize_header_title(raw_title):
+def _normalize_header_title(raw_title, extensions=None):
     content = raw_title.strip()
     if not content:
         return ""
-    _, _, title = parse_title_parts(content)
+    _, _, title, _ = _split_title(content, extensions)
     return title
@@ -0,0 +1,137 @@
+"""Declarative task queries evaluated inside task stores."""
+
+import datetime
+
+from orgplan.indexes import date_key, end_key
+from orgplan.search import tokenize
+from orgplan.tags import tag_filter
+
+# Keys accepted by ``Query(sort=...)``; prefix one with "-" to reverse it.
+SORT_KEYS = ("due", "title", "state")
+
+
+class Query:
+    """Conditions a task must meet, plus the order and number of results.
+
+    Every given condition must hold:
+
+    - ``states``: a state name or an iterable of them.
+    - ``tags`` / ``any_tags``: tasks carrying all of ``tags`` and at least
+      one of ``any_tags``.
+    - ``due_from`` / ``due_to``: inclusive bounds on ``due_date``; tasks
+      without one are excluded. A plain date as ``due_to`` covers that day.
+    - ``months``: an inclusive ``((year, month), (year, month))`` range of
+      month files (the due month for ``InMemoryTaskStore``).
+    - ``text``: words that must all appear in the title or notes, matched
+      case-insensitively as whole words.
+
+    ``sort`` is a key or tuple of keys from ``SORT_KEYS``, each optionally
+    prefixed with "-" for descending order; without it tasks come in store
+    order. ``limit`` caps the number of results. ``fields`` is the
+    projection the caller needs, as for ``list``; stores add whatever the
+    conditions themselves need.
+    """
+
+    def __init__(self, states=None, tags=None, any_tags=None, due_from=None, due_to=None,
+                 months=None, text=None, sort=None, limit=None, fields=None):
+        if isinstance(states, str):
+            states = (states,)
+        if isinstance(sort, str):
+            sort = (sort,)
+        for key in sort or ():
+            if key.lstrip("-") not in SORT_KEYS:
+                raise ValueError(f"Unknown sort key: {key}")
+        self.states = frozenset(states) if states is not None else None
+        self.tags = tuple(tags or ())
+        self.any_tags = tuple(any_tags or ())
+        self.due_from = due_from
+        self.due_to = due_to
+        self.months = months
+        self.text = text
+        self.words = frozenset(tokenize(text)) if text else frozenset()
+        self.sort = tuple(sort or ())
+        self.limit = limit
+        self.fields = fields
+        self._tags_match = tag_filter(self.tags, self.any_tags)
+
+    def __repr__(self):
+        parts = [
+            f"{name}={value!r}" for name, value in vars(self).items()
+            if not name.startswith("_") and name != "words" and value not in (None, ())
+        ]
+        return f"Query({', '.join(parts)})"
+
+    @property
+    def has_due_range(self):
+        return self.due_from is not None or self.due_to is not None
+
+    def load_fields(self):
+        """Return the projection to load: ``fields`` plus what the conditions read."""
+        if self.fields is None:
+            return None
+        fields = set(self.fields)
+        fields.update(("state", "tags"))
+        if self.has_due_range or "due" in self._sort_names():
+            fields.add("due_date")
+        if self.words:
+            fields.update(("title", "notes"))
+        return tuple(sorted(fields))
+
+    def matches(self, task):
+        """Return True if ``task`` meets every condition except ``months``."""
+        if self.states is not None and task.state not in self.states:
+            return False
+        if self._tags_match is not None and not self._tags_match(task):
+            return False
+        if self.has_due_range:
+            due_date = task.due_date
+            if not isinstance(due_date, datetime.date):
+                return False
+            key = date_key(due_date)
+            if self.due_from is not None and key < date_key(self.due_from):
+                return False
+            if self.due_to is not None and key > end_key(self.due_to):
+                return False
+        if self.words:
+            found = set(tokenize(task.title))
+            if task.notes:
+                found.update(tokenize(task.notes))
+            if not self.words.issubset(found):
+                return False
+        return True
+
+    def finish(self, tasks):
+        """Yield matching ``tasks`` in the requested order, up to ``limit``.
+
+        ``tasks`` must already meet the conditions. Without sort keys they
+        are streamed as they come.
+        """
+        if self.sort:
+            tasks = self.sorted(list(tasks))
+        if self.limit is None:
+            yield from tasks
+            return
+        if self.limit <= 0:
+            return
+        for count, task in enumerate(tasks, 1):
+            yield task
+            if count >= self.limit:
+                return
+
+    def sorted(self, tasks):
+        """Return ``tasks`` ordered by the sort keys; ties keep their order."""
+        for key in reversed(self.sort):
+            name = key.lstrip("-")
+            descending = key.startswith("-")
+            if name == "due":
+                # Tasks without a due date go last either way.
+                dated = [task for task in tasks if isinstance(task.due_date, datetime.date)]
+                undated = [task for task in tasks if not isinstance(task.due_date, datetime.date)]
+                dated.sort(key=lambda task: date_key(task.due_date), reverse=descending)
+                tasks = dated + undated
+            else:
+                tasks.sort(key=lambda task: getattr(task, name), reverse=descending)
+        return tasks
+
+    def _sort_names(self):
+        return [key.lstrip("-") for key in self.sort]
@@ -2,9 +2,16 @@
 
 
 class Registry:
-    def __init__(self, api, config=None):
+    def __init__(self, api, config=None, extensions=None):
         self.api = api
         self.config = config
+        if extensions is None:
+            extensions = getattr(getattr(api, "tasks", None), "extensions", None)
+        if extensions is None:
+            from orgplan.markup import ParserExtensions
+
+            extensions = ParserExtensions()
+        self.extensions = extensions
         self._commands = {}
 
     def add_command(self, name, func):
@@ -19,3 +26,19 @@ class Registry:
 
     def list_commands(self):
         return sorted(self._commands.keys())
+
+    def add_tags(self, *tags):
+        """Recognize ``#tag`` words for ``tags`` on task lines."""
+        self.extensions.add_tags(*tags)
+
+    def add_tag_prefix(self, prefix):
+        """Recognize every ``#tag`` word starting with ``prefix``."""
+        self.extensions.add_tag_prefix(prefix)
+
+    def add_key(self, key):
+        """Collect ``key:value`` words on task lines into ``task.extras[key]``."""
+        self.extensions.add_key(key)
+
+    def add_line_pattern(self, name, pattern):
+        """Collect matches of ``pattern`` on task lines into ``task.extras[name]``."""
+        self.extensions.add_line_pattern(name, pattern)
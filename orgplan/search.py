@@ -0,0 +1,161 @@
+"""Full-text search over task titles and notes."""
+
+import collections
+import datetime
+import marshal
+import math
+import re
+
+from orgplan.cache import write_atomic
+
+# Bump when tokenization, weighting or the file layout change; a saved
+# index from another version is discarded and rebuilt.
+SEARCH_FORMAT_VERSION = 2
+
+# Each title word counts as this many notes words.
+TITLE_WEIGHT = 2
+
+# Months after which a match's recency boost halves.
+RECENCY_HALF_LIFE = 12
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Return the lowercase words of ``text``."""
+    return _WORD_PATTERN.findall(text.lower())
+
+
+class SearchIndex:
+    """Inverted index of the words in task titles and notes.
+
+    The index is sharded by source, one shard per month file, so a changed
+    file only re-tokenizes its own tasks. Each shard keeps the month key,
+    the states and due-date ordinals of its tasks, and maps every word to
+    ``(position, frequency)`` postings, where ``position`` is the task's
+    index in the file.
+    """
+
+    def __init__(self, signature=()):
+        self.signature = signature
+        self.dirty = False
+        self._shards = {}
+
+    def sources(self):
+        return list(self._shards)
+
+    def fingerprint(self, source):
+        """Return the fingerprint ``source`` was indexed with, or None."""
+        shard = self._shards.get(source)
+        return shard[0] if shard is not None else None
+
+    def replace(self, source, tasks, month_key=None, fingerprint=None):
+        """Index ``tasks`` as the whole content of ``source``."""
+        postings = {}
+        for position, task in enumerate(tasks):
+            counts = collections.Counter()
+            for word in tokenize(task.title):
+                counts[word] += TITLE_WEIGHT
+            if task.notes:
+                counts.update(tokenize(task.notes))
+            for word, count in counts.items():
+                postings.setdefault(word, []).append((position, count))
+        postings = {word: tuple(entries) for word, entries in postings.items()}
+        states = tuple(task.state for task in tasks)
+        dues = tuple(_due_ordinal(task) for task in tasks)
+        self._shards[source] = (fingerprint, month_key, states, postings, dues)
+        self.dirty = True
+
+    def discard(self, source):
+        if self._shards.pop(source, None) is not None:
+            self.dirty = True
+
+    def search(self, query, state=None, due_from=None, limit=None):
+        """Return ``(source, position, score)`` for tasks containing every query word.
+
+        Scores add up TF-IDF weights of the query words and are boosted by
+        up to 2x for recent months, halving every ``RECENCY_HALF_LIFE``
+        months before the newest indexed month. ``due_from`` drops tasks
+        due before that date or without a due date. Results are best first.
+        """
+        words = list(dict.fromkeys(tokenize(query)))
+        if not words:
+            return []
+
+        total = sum(len(shard[2]) for shard in self._shards.values())
+        weights = {}
+        for word in words:
+            frequency = sum(len(shard[3].get(word, ())) for shard in self._shards.values())
+            if not frequency:
+                return []
+            weights[word] = math.log(1 + total / frequency)
+        month_keys = [shard[1] for shard in self._shards.values() if shard[1] is not None]
+        newest = max(month_keys) if month_keys else None
+
+        hits = []
+        since = due_from.toordinal() if due_from is not None else None
+        for source, (_, month_key, states, postings, dues) in self._shards.items():
+            lists = [postings.get(word) for word in words]
+            if not all(lists):
+                continue
+            order = sorted(range(len(words)), key=lambda index: len(lists[index]))
+            first = order[0]
+            scores = {
+                position: (1 + math.log(count)) * weights[words[first]]
+                for position, count in lists[first]
+            }
+            for index in order[1:]:
+                counts = dict(lists[index])
+                weight = weights[words[index]]
+                scores = {
+                    position: score + (1 + math.log(counts[position])) * weight
+                    for position, score in scores.items()
+                    if position in counts
+                }
+            boost = 1.0
+            if month_key is not None and newest is not None:
+                boost += 0.5 ** ((newest - month_key) / RECENCY_HALF_LIFE)
+            for position, score in scores.items():
+                if state is not None and states[position] != state:
+                    continue
+                if since is not None and (dues[position] is None or dues[position] < since):
+                    continue
+                hits.append((-score * boost, -(month_key or 0), str(source), position, source))
+
+        hits.sort()
+        if limit is not None:
+            hits = hits[:limit]
+        return [(source, position, -score) for score, _, _, position, source in hits]
+
+    def save(self, path):
+        """Write the index to ``path``; failures are ignored."""
+        data = (SEARCH_FORMAT_VERSION, marshal.version, self.signature, self._shards)
+        try:
+            write_atomic(path, marshal.dumps(data))
+        except (OSError, ValueError):
+            return
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path, signature=()):
+        """Read an index saved by :meth:`save`, or return an empty one.
+
+        A missing, unreadable or outdated file, or one built with another
+        parser extensions ``signature``, gives an empty index.
+        """
+        index = cls(signature)
+        try:
+            with open(path, "rb") as handle:
+                version, marshal_version, saved_signature, shards = marshal.load(handle)
+        except (OSError, EOFError, ValueError, TypeError):
+            return index
+        if (version, marshal_version, saved_signature) == (
+            SEARCH_FORMAT_VERSION, marshal.version, signature
+        ):
+            index._shards = shards
+        return index
+
+
+def _due_ordinal(task):
+    due = task.due_date
+    return due.toordinal() if isinstance(due, datetime.date) else None
@@ -0,0 +1,326 @@
+"""Task store answering queries from a SQLite index of the month files."""
+
+import datetime
+import marshal
+import os
+import sqlite3
+
+from orgplan.cache import DEFAULT_CACHE_DIR
+from orgplan.dates import iter_months
+from orgplan.table import month_key
+from orgplan.manifest import Manifest
+from orgplan.tasks import task_from_record, task_to_record
+
+# Bump when the schema, the record layout or parsing results change; an
+# index written by another version is rebuilt from scratch.
+INDEX_FORMAT_VERSION = "1"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    month_key INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    month_key INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    due INTEGER,
+    record BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_month ON tasks (month_key, position);
+CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, month_key);
+CREATE INDEX IF NOT EXISTS tasks_due ON tasks (due);
+CREATE TABLE IF NOT EXISTS task_tags (
+    tag TEXT NOT NULL,
+    task_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS task_tags_tag ON task_tags (tag, task_id);
+CREATE INDEX IF NOT EXISTS task_tags_task ON task_tags (task_id);
+"""
+
+
+class SqliteTaskStore:
+    """Task store backed by a local SQLite index of all month files.
+
+    The markdown files stay the source of truth. :meth:`reindex` re-parses
+    only the files whose ``(st_mtime_ns, st_size)`` changed since they were
+    indexed and drops rows for deleted files. Each task is kept as a
+    serialized record with its state, due date, month and tags in indexed
+    columns, so :meth:`list`, :meth:`list_range` and :meth:`find` are
+    answered with SQL instead of parsing.
+
+    With ``auto_reindex=True`` (the default) ``list`` refreshes the month it
+    reads and ``list_range``/``find`` refresh the whole index first, which
+    costs one ``stat`` per month file when nothing changed.
+    """
+
+    def __init__(self, data_root, db_path=None, date_service=None, extensions=None,
+                 auto_reindex=True):
+        from orgplan.markup import ParserExtensions
+
+        self._data_root = data_root
+        self._db_path = db_path or os.path.join(data_root, DEFAULT_CACHE_DIR, "index.sqlite")
+        self._date_service = date_service
+        self._auto_reindex = auto_reindex
+        self.extensions = extensions if extensions is not None else ParserExtensions()
+        self._connection = None
+        self._extensions_version = None
+        self._manifest = Manifest(data_root)
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def get_month_path(self, year, month):
+        return os.path.join(self._data_root, f"{year:04d}", f"{month:02d}-notes.md")
+
+    def month_exists(self, year, month):
+        return os.path.exists(self.get_month_path(year, month))
+
+    def reindex(self, months=None):
+        """Bring the index up to date and return the number of files parsed.
+
+        ``months`` limits the refresh to those ``(year, month)`` pairs;
+        by default every month file under ``data_root`` is checked and rows
+        of deleted files are removed.
+        """
+        connection = self._connect()
+        indexed = {
+            path: (key, mtime_ns, size)
+            for path, key, mtime_ns, size in connection.execute(
+                "SELECT path, month_key, mtime_ns, size FROM files"
+            )
+        }
+        if months is None:
+            self._manifest.refresh()
+            months = self._manifest.months()
+            stale = set(indexed)
+        else:
+            stale = set()
+
+        parsed = 0
+        with connection:
+            for year, month in months:
+                path = self.get_month_path(year, month)
+                stale.discard(path)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    if path in indexed:
+                        self._drop_file(connection, path, indexed[path][0])
+                    continue
+                key = month_key(year, month)
+                if indexed.get(path) == (key, stat.st_mtime_ns, stat.st_size):
+                    continue
+                self._index_file(connection, path, key, stat)
+                parsed += 1
+            for path in stale:
+                self._drop_file(connection, path, indexed[path][0])
+        return parsed
+
+    def list(self, year=None, month=None, state=None, fields=None, tags=None, any_tags=None):
+        """Return a month's tasks in file order, filtered like ``FileTaskStore.list``.
+
+        ``fields`` is validated for parity; indexed tasks are always complete.
+        """
+        from orgplan.markup import projection_needs
+
+        projection_needs(fields)
+        year, month = self._resolve_year_month(year, month)
+        if self._auto_reindex:
+            self.reindex(months=[(year, month)])
+        return self._select(
+            states=None if state is None else [state],
+            tags=tags,
+            any_tags=any_tags,
+            months=((year, month), (year, month)),
+        )
+
+    def list_range(self, start, end, state=None, fields=None, tags=None, any_tags=None,
+                   workers=None):
+        """Return the tasks of the ``start`` through ``end`` months, in month order.
+
+        ``workers`` is accepted for parity with ``FileTaskStore``.
+        """
+        from orgplan.markup import projection_needs
+
+        projection_needs(fields)
+        if self._auto_reindex:
+            self.reindex(months=list(iter_months(start, end)))
+        return self._select(
+            states=None if state is None else [state],
+            tags=tags,
+            any_tags=any_tags,
+            months=(start, end),
+        )
+
+    def find(self, state=None, states=None, tags=None, any_tags=None, due_from=None,
+             due_to=None, months=None):
+        """Return tasks across all indexed months matching every given condition.
+
+        ``due_from``/``due_to`` are inclusive dates compared with each task's
+        ``due_date`` and exclude tasks without one. ``months`` is an inclusive
+        ``((year, month), (year, month))`` range. Results are in month order,
+        then file order.
+        """
+        if self._auto_reindex:
+            self.reindex()
+        state_set = set(states or ())
+        if state is not None:
+            state_set.add(state)
+        return self._select(
+            states=state_set or None,
+            tags=tags,
+            any_tags=any_tags,
+            due_from=due_from,
+            due_to=due_to,
+            months=months,
+        )
+
+    def query(self, query):
+        """Yield the tasks matching ``query``, an ``orgplan.query.Query``.
+
+        States, tags, due dates and months become SQL conditions; text and
+        time-of-day bounds are checked on the returned tasks.
+        """
+        from orgplan.markup import projection_needs
+
+        projection_needs(query.fields)
+        if self._auto_reindex:
+            self.reindex(months=None if query.months is None else list(iter_months(*query.months)))
+        tasks = self._select(
+            states=query.states,
+            tags=query.tags,
+            any_tags=query.any_tags,
+            due_from=query.due_from,
+            due_to=query.due_to,
+            months=query.months,
+        )
+        return query.finish(task for task in tasks if query.matches(task))
+
+    def _select(self, states=None, tags=None, any_tags=None, due_from=None, due_to=None,
+                months=None):
+        clauses = []
+        params = []
+        if months is not None:
+            clauses.append("month_key BETWEEN ? AND ?")
+            params.extend((month_key(*months[0]), month_key(*months[1])))
+        if states is not None:
+            states = list(states)
+            clauses.append(f"state IN ({_placeholders(states)})")
+            params.extend(states)
+        if due_from is not None or due_to is not None:
+            clauses.append("due BETWEEN ? AND ?")
+            params.append(due_from.toordinal() if due_from is not None else 1)
+            params.append(
+                due_to.toordinal() if due_to is not None else datetime.date.max.toordinal()
+            )
+        if tags:
+            tags = list(dict.fromkeys(tags))
+            clauses.append(
+                "id IN (SELECT task_id FROM task_tags"
+                f" WHERE tag IN ({_placeholders(tags)})"
+                " GROUP BY task_id HAVING COUNT(*) = ?)"
+            )
+            params.extend(tags)
+            params.append(len(tags))
+        if any_tags:
+            any_tags = list(any_tags)
+            clauses.append(
+                f"id IN (SELECT task_id FROM task_tags WHERE tag IN ({_placeholders(any_tags)}))"
+            )
+            params.extend(any_tags)
+
+        sql = "SELECT record FROM tasks"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY month_key, position"
+        rows = self._connect().execute(sql, params)
+        return [task_from_record(marshal.loads(record)) for (record,) in rows]
+
+    def _index_file(self, connection, path, key, stat):
+        from orgplan.markup import parse_month_notes
+
+        with open(path, "r", encoding="utf-8") as handle:
+            tasks = parse_month_notes(handle.read(), extensions=self.extensions)
+
+        self._drop_file(connection, path, key)
+        for position, task in enumerate(tasks):
+            due_date = task.due_date
+            cursor = connection.execute(
+                "INSERT INTO tasks (month_key, position, state, due, record)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (
+                    key,
+                    position,
+                    task.state,
+                    due_date.toordinal() if isinstance(due_date, datetime.date) else None,
+                    marshal.dumps(task_to_record(task)),
+                ),
+            )
+            task_id = cursor.lastrowid
+            connection.executemany(
+                "INSERT INTO task_tags (tag, task_id) VALUES (?, ?)",
+                [(tag, task_id) for tag in task.tags],
+            )
+        connection.execute(
+            "INSERT INTO files (path, month_key, mtime_ns, size) VALUES (?, ?, ?, ?)",
+            (path, key, stat.st_mtime_ns, stat.st_size),
+        )
+
+    def _drop_file(self, connection, path, key):
+        connection.execute(
+            "DELETE FROM task_tags WHERE task_id IN (SELECT id FROM tasks WHERE month_key = ?)",
+            (key,),
+        )
+        connection.execute("DELETE FROM tasks WHERE month_key = ?", (key,))
+        connection.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def _connect(self):
+        connection = self._connection
+        if connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self._db_path)), exist_ok=True)
+            connection = sqlite3.connect(self._db_path)
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        if self._extensions_version != self.extensions.version:
+            self._check_meta(connection)
+            self._extensions_version = self.extensions.version
+        return connection
+
+    def _check_meta(self, connection):
+        """Clear the index if it was built by another format or parser setup."""
+        expected = {
+            "format": INDEX_FORMAT_VERSION,
+            "marshal": str(marshal.version),
+            "extensions": repr(self.extensions.signature()),
+        }
+        stored = dict(connection.execute("SELECT key, value FROM meta"))
+        if stored != expected:
+            with connection:
+                connection.execute("DELETE FROM task_tags")
+                connection.execute("DELETE FROM tasks")
+                connection.execute("DELETE FROM files")
+                connection.execute("DELETE FROM meta")
+                connection.executemany(
+                    "INSERT INTO meta (key, value) VALUES (?, ?)", expected.items()
+                )
+
+    def _resolve_year_month(self, year, month):
+        if year is None or month is None:
+            if self._date_service is None:
+                raise ValueError("date_service is required to default year/month")
+            year, month = self._date_service.current_year_month()
+        return year, month
+
+
+def _placeholders(values):
+    return ", ".join("?" * len(values))
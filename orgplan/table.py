@@ -0,0 +1,252 @@
+"""Columnar task container for bulk filtering and aggregation."""
+
+import array
+import collections
+import datetime
+
+from orgplan.tags import decode_mask, encode_tags
+from orgplan.tasks import STATES
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - exercised when NumPy is absent
+    numpy = None
+
+# Sentinels for rows without a due date or a month.
+NO_DUE = 0
+NO_MONTH = -1
+
+
+def month_key(year, month):
+    """Encode ``(year, month)`` as a single sortable integer."""
+    return year * 12 + month - 1
+
+
+def month_from_key(key):
+    """Decode a :func:`month_key` value back to ``(year, month)``."""
+    year, index = divmod(key, 12)
+    return year, index + 1
+
+
+class TaskTable:
+    """Tasks stored column-wise in compact arrays.
+
+    Each row keeps a state code, a tag mask, a due-date ordinal
+    (``NO_DUE`` when unset), a month key (``NO_MONTH`` when unknown) and an
+    index into a shared title pool. Notes, timestamps lists and tags outside
+    the ``orgplan.tags`` vocabulary are not kept. Filters and aggregations
+    run over whole columns, using NumPy when it is installed.
+    """
+
+    def __init__(self):
+        self.state_names = list(STATES)
+        self.titles = []
+        self._state_codes = {name: code for code, name in enumerate(self.state_names)}
+        self._title_ids = {}
+        self.states = array.array("B")
+        self.tag_masks = array.array("Q")
+        self.due = array.array("l")
+        self.months = array.array("l")
+        self.title_ids = array.array("L")
+
+    @classmethod
+    def from_tasks(cls, tasks, year=None, month=None):
+        """Build a table from tasks, all tagged with ``(year, month)`` if given."""
+        table = cls()
+        table.extend(tasks, year=year, month=month)
+        return table
+
+    def extend(self, tasks, year=None, month=None):
+        """Append ``tasks`` as rows, tagging them with ``(year, month)`` if given."""
+        key = NO_MONTH if year is None or month is None else month_key(year, month)
+        for task in tasks:
+            due_date = task.due_date
+            self._append(
+                task.title,
+                task.state,
+                task.tag_mask,
+                due_date.toordinal() if isinstance(due_date, datetime.date) else NO_DUE,
+                key,
+            )
+
+    def _append(self, title, state, tag_mask, due, key):
+        code = self._state_codes.get(state)
+        if code is None:
+            code = len(self.state_names)
+            self.state_names.append(state)
+            self._state_codes[state] = code
+        title_id = self._title_ids.get(title)
+        if title_id is None:
+            title_id = len(self.titles)
+            self.titles.append(title)
+            self._title_ids[title] = title_id
+        self.states.append(code)
+        self.tag_masks.append(tag_mask)
+        self.due.append(due)
+        self.months.append(key)
+        self.title_ids.append(title_id)
+
+    def __len__(self):
+        return len(self.states)
+
+    def __iter__(self):
+        return self.rows()
+
+    def rows(self):
+        """Yield ``(title, state, tags, due_date, (year, month))`` per row."""
+        for index in range(len(self)):
+            yield self._row(index)
+
+    def _row(self, index):
+        due = self.due[index]
+        key = self.months[index]
+        return (
+            self.titles[self.title_ids[index]],
+            self.state_names[self.states[index]],
+            list(decode_mask(self.tag_masks[index])),
+            datetime.date.fromordinal(due) if due != NO_DUE else None,
+            month_from_key(key) if key != NO_MONTH else None,
+        )
+
+    def filter(self, state=None, states=None, tags=None, any_tags=None,
+               due_from=None, due_to=None, months=None):
+        """Return a new table with the rows matching every given condition.
+
+        ``due_from``/``due_to`` are inclusive dates and exclude rows without a
+        due date. ``months`` is an inclusive ``((year, month), (year, month))``
+        range. Tags outside the vocabulary never match.
+        """
+        return self._take(self._select(state, states, tags, any_tags, due_from, due_to, months))
+
+    def count(self, **filters):
+        """Return the number of rows matching ``filters`` (see :meth:`filter`)."""
+        if not filters:
+            return len(self)
+        selected = self._select(**filters)
+        if numpy is not None:
+            return int(selected.sum())
+        return sum(selected)
+
+    def count_by(self, column):
+        """Count rows per ``"state"``, ``"month"`` or ``"tag"``.
+
+        Month keys are ``(year, month)`` tuples; rows without a month are
+        counted under None. A row counts once for each of its tags.
+        """
+        if column == "state":
+            counts = self._counts(self.states)
+            return {self.state_names[code]: n for code, n in counts.items()}
+        if column == "month":
+            counts = self._counts(self.months)
+            return {
+                (month_from_key(key) if key != NO_MONTH else None): n
+                for key, n in counts.items()
+            }
+        if column == "tag":
+            counts = {}
+            for bit_mask, n in self._counts(self.tag_masks).items():
+                for tag in decode_mask(bit_mask):
+                    counts[tag] = counts.get(tag, 0) + n
+            return counts
+        raise ValueError(f"Unknown column: {column}")
+
+    def _counts(self, column):
+        if numpy is not None and len(column):
+            values, counts = numpy.unique(_as_numpy(column), return_counts=True)
+            return dict(zip(values.tolist(), counts.tolist()))
+        return dict(collections.Counter(column))
+
+    def _select(self, state=None, states=None, tags=None, any_tags=None,
+                due_from=None, due_to=None, months=None):
+        state_set = set(states or ())
+        if state is not None:
+            state_set.add(state)
+        codes = [self._state_codes[name] for name in state_set if name in self._state_codes]
+        all_mask, all_extra = encode_tags(tags or ())
+        any_mask, _ = encode_tags(any_tags or ())
+        low_due = due_from.toordinal() if due_from is not None else None
+        high_due = due_to.toordinal() if due_to is not None else None
+        low_month = high_month = None
+        if months is not None:
+            low_month, high_month = month_key(*months[0]), month_key(*months[1])
+
+        if all_extra:
+            return self._select_none()
+        if any_tags and not any_mask:
+            return self._select_none()
+        if numpy is not None:
+            return self._select_numpy(
+                state_set, codes, all_mask, any_mask, low_due, high_due, low_month, high_month
+            )
+
+        selected = [True] * len(self)
+        if state_set:
+            wanted = set(codes)
+            selected = [ok and code in wanted for ok, code in zip(selected, self.states)]
+        if all_mask:
+            selected = [ok and mask & all_mask == all_mask
+                        for ok, mask in zip(selected, self.tag_masks)]
+        if any_mask:
+            selected = [ok and bool(mask & any_mask) for ok, mask in zip(selected, self.tag_masks)]
+        if low_due is not None or high_due is not None:
+            low = low_due if low_due is not None else NO_DUE + 1
+            high = high_due if high_due is not None else datetime.date.max.toordinal()
+            selected = [ok and low <= due <= high for ok, due in zip(selected, self.due)]
+        if low_month is not None:
+            selected = [ok and low_month <= key <= high_month
+                        for ok, key in zip(selected, self.months)]
+        return selected
+
+    def _select_numpy(self, state_set, codes, all_mask, any_mask,
+                      low_due, high_due, low_month, high_month):
+        selected = numpy.ones(len(self), dtype=bool)
+        if state_set:
+            selected &= numpy.isin(_as_numpy(self.states), codes)
+        masks = _as_numpy(self.tag_masks)
+        if all_mask:
+            selected &= (masks & numpy.uint64(all_mask)) == numpy.uint64(all_mask)
+        if any_mask:
+            selected &= (masks & numpy.uint64(any_mask)) != 0
+        if low_due is not None or high_due is not None:
+            due = _as_numpy(self.due)
+            selected &= due != NO_DUE
+            if low_due is not None:
+                selected &= due >= low_due
+            if high_due is not None:
+                selected &= due <= high_due
+        if low_month is not None:
+            keys = _as_numpy(self.months)
+            selected &= (keys >= low_month) & (keys <= high_month)
+        return selected
+
+    def _select_none(self):
+        if numpy is not None:
+            return numpy.zeros(len(self), dtype=bool)
+        return [False] * len(self)
+
+    def _take(self, selected):
+        table = TaskTable()
+        table.state_names = list(self.state_names)
+        table._state_codes = dict(self._state_codes)
+        table.titles = list(self.titles)
+        table._title_ids = dict(self._title_ids)
+        if numpy is not None:
+            indices = numpy.flatnonzero(selected)
+            for name in _COLUMNS:
+                getattr(table, name).frombytes(_as_numpy(getattr(self, name))[indices].tobytes())
+            return table
+
+        indices = [index for index, ok in enumerate(selected) if ok]
+        for name in _COLUMNS:
+            column = getattr(self, name)
+            getattr(table, name).extend(column[index] for index in indices)
+        return table
+
+
+_COLUMNS = ("states", "tag_masks", "due", "months", "title_ids")
+
+
+def _as_numpy(column):
+    if not len(column):
+        return numpy.zeros(0, dtype=column.typecode)
+    return numpy.frombuffer(column, dtype=column.typecode)
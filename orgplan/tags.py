@@ -0,0 +1,96 @@
+"""Tag vocabulary and compact bit-mask encoding of task tags."""
+
+# Canonical tag order. Each tag's bit is its position in this tuple, and
+# ``decode_mask`` lists mask tags in this order.
+TAGS = (
+    "p0",
+    "p1",
+    "p2",
+    "1h",
+    "2h",
+    "4h",
+    "1d",
+    "blocked",
+    "weekly",
+    "monthly",
+)
+
+_TAG_BITS = {tag: 1 << index for index, tag in enumerate(TAGS)}
+_MASK_TAGS = {0: ()}
+
+
+def tag_bit(tag):
+    """Return the bit for ``tag``, or 0 if it is not in the vocabulary."""
+    return _TAG_BITS.get(tag, 0)
+
+
+def encode_tags(tags):
+    """Split ``tags`` into ``(mask, extra)``.
+
+    ``extra`` is a tuple of tags outside the vocabulary, in their original
+    order, or None when every tag has a bit.
+    """
+    mask = 0
+    extra = None
+    for tag in tags:
+        bit = _TAG_BITS.get(tag)
+        if bit is not None:
+            mask |= bit
+        elif extra is None:
+            extra = (tag,)
+        elif tag not in extra:
+            extra += (tag,)
+    return mask, extra
+
+
+def decode_mask(mask):
+    """Return the tags set in ``mask`` as a shared tuple in canonical order."""
+    tags = _MASK_TAGS.get(mask)
+    if tags is None:
+        tags = tuple(tag for tag, bit in _TAG_BITS.items() if mask & bit)
+        _MASK_TAGS[mask] = tags
+    return tags
+
+
+def has_tag(task, tag):
+    """Return True if ``task`` carries ``tag``."""
+    bit = _TAG_BITS.get(tag)
+    if bit is not None:
+        return bool(task.tag_mask & bit)
+    return bool(task.extra_tags) and tag in task.extra_tags
+
+
+def has_any_tags(task, tags):
+    """Return True if ``task`` carries at least one of ``tags``."""
+    mask, extra = encode_tags(tags)
+    if task.tag_mask & mask:
+        return True
+    return bool(extra and task.extra_tags) and not set(extra).isdisjoint(task.extra_tags)
+
+
+def tag_filter(tags=None, any_tags=None):
+    """Return a predicate for tasks that carry all ``tags`` and any of ``any_tags``.
+
+    Vocabulary tags are tested with a single mask operation. Returns None if
+    neither argument is given.
+    """
+    if not tags and not any_tags:
+        return None
+    all_mask, all_extra = encode_tags(tags or ())
+    any_mask, any_extra = encode_tags(any_tags or ())
+    all_extra = set(all_extra or ())
+    any_extra = set(any_extra or ())
+
+    def matches(task):
+        mask = task.tag_mask
+        if mask & all_mask != all_mask:
+            return False
+        if all_extra and not all_extra.issubset(task.extra_tags or ()):
+            return False
+        if any_tags:
+            if mask & any_mask:
+                return True
+            return bool(any_extra) and not any_extra.isdisjoint(task.extra_tags or ())
+        return True
+
+    return matches
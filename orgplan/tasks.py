@@ -1,21 +1,112 @@
 """Task storage primitives."""
 
+import bisect
+import collections
+import copy
 import datetime
+import functools
+import mmap
 import os
+import sys
+import threading
+
+from orgplan.cache import DiskCache, content_digest, ParseCache, write_atomic
+from orgplan.dates import iter_months
+from orgplan.indexes import DUE_KINDS, DueIndex, TagIndex
+from orgplan.manifest import Manifest
+from orgplan.tags import decode_mask, encode_tags, tag_filter
+
+# Task states the parser produces, "open" first.
+STATES = ("open", "done", "canceled", "delegated", "pending")
+
+# Field names accepted by the ``fields=`` projection of ``TaskStore.list``.
+TASK_FIELDS = (
+    "title",
+    "state",
+    "tags",
+    "line_number",
+    "notes",
+    "deadline",
+    "scheduled",
+    "timestamp",
+    "due_date",
+    "extras",
+)
+
+# Fields a TaskTable row is built from.
+_TABLE_FIELDS = ("title", "state", "tags", "due_date")
+
+# Fields the due-date index is built from.
+_DUE_FIELDS = DUE_KINDS
+
+# Fields the full-text search index is built from.
+_SEARCH_FIELDS = ("title", "state", "notes", "due_date")
+
+
+# Below this many bytes of month files to parse, a process pool costs more
+# to start than it saves.
+_PROCESS_POOL_MIN_BYTES = 1024 * 1024
+
+# Months whose last parse refresh_month keeps for incremental re-parsing.
+_INCREMENTAL_MONTHS = 8
+
+
+class StaleFileError(RuntimeError):
+    """A month file changed between reading tasks and writing updates to it."""
 
 
 class Task:
+    __slots__ = (
+        "title",
+        "state",
+        "_legacy_due_date",
+        "tag_mask",
+        "extra_tags",
+        "_tag_order",
+        "notes",
+        "line_number",
+        "deadline",
+        "scheduled",
+        "timestamp",
+        "extras",
+    )
+
     def __init__(self, title, state="open", due_date=None, tags=None, notes=None,
-                 line_number=None, deadline=None, scheduled=None, timestamp=None):
+                 line_number=None, deadline=None, scheduled=None, timestamp=None,
+                 extras=None):
         self.title = title
-        self.state = state
+        self.state = sys.intern(state) if isinstance(state, str) else state
         self._legacy_due_date = due_date
-        self.tags = list(tags or [])
+        self.tags = tags or ()
         self.notes = notes
         self.line_number = line_number
         self.deadline = list(deadline or [])
         self.scheduled = list(scheduled or [])
         self.timestamp = list(timestamp or [])
+        self.extras = extras
+
+    @property
+    def tags(self):
+        """Tags as a tuple, in the order they were given.
+
+        Assign a new sequence to change them. The order is only stored
+        when it differs from the mask tags in canonical order followed by
+        the extra tags.
+        """
+        if self._tag_order is not None:
+            return self._tag_order
+        tags = decode_mask(self.tag_mask)
+        if self.extra_tags:
+            tags += self.extra_tags
+        return tags
+
+    @tags.setter
+    def tags(self, tags):
+        tags = tuple(tags)
+        self.tag_mask, self.extra_tags = encode_tags(tags)
+        self._tag_order = None
+        if tags != self.tags:
+            self._tag_order = tags
 
     @property
     def due_date(self):
@@ -37,44 +128,441 @@ class Task:
             f"line_number={self.line_number!r}, "
             f"deadline={self.deadline!r}, "
             f"scheduled={self.scheduled!r}, "
-            f"timestamp={self.timestamp!r}"
+            f"timestamp={self.timestamp!r}, "
+            f"extras={self.extras!r}"
             ")"
         )
 
 
+def copy_task(task):
+    """Return a copy of ``task`` that shares no mutable state with it.
+
+    Slots that are still unset, such as the lazy fields of a
+    ``LazyTask``, stay unset, so copying does not trigger lazy parsing.
+    """
+    if not isinstance(task, Task):
+        return copy.deepcopy(task)
+    clone = object.__new__(type(task))
+    for name in _slot_names(type(task)):
+        try:
+            value = object.__getattribute__(task, name)
+        except AttributeError:
+            continue
+        if isinstance(value, list):
+            value = list(value)
+        elif isinstance(value, dict):
+            value = {key: list(item) if isinstance(item, list) else item
+                     for key, item in value.items()}
+        object.__setattr__(clone, name, value)
+    return clone
+
+
+def task_to_record(task, notes=True):
+    """Return ``task`` as a tuple of plain values for compact serialization.
+
+    Records hold only strings, integers, tuples, dicts and None, so they can
+    be written with ``marshal`` or pickled cheaply. Dates become ordinals and
+    datetimes ``(ordinal, seconds)`` pairs. Tags are kept by name because
+    the bits of registered tags depend on registration order. With
+    ``notes=False`` the notes are left out of the record.
+
+    A ``LazyTask`` whose notes and timestamps were never built is recorded
+    from its task line and raw notes sections instead, without building
+    them, and comes back from :func:`task_from_record` still lazy.
+    """
+    extras = task.extras
+    if extras:
+        extras = {key: tuple(value) if isinstance(value, list) else value
+                  for key, value in extras.items()}
+    unbuilt = getattr(task, "_unbuilt_parts", None)
+    parts = unbuilt() if unbuilt is not None else None
+    if parts is not None:
+        return (task.title, task.state, task.tags, task.line_number, extras) + parts
+    return (
+        task.title,
+        task.state,
+        task.tags,
+        task.notes if notes else None,
+        task.line_number,
+        _encode_dates(task.deadline),
+        _encode_dates(task.scheduled),
+        _encode_dates(task.timestamp),
+        _encode_date(task._legacy_due_date),
+        extras,
+    )
+
+
+def task_from_record(record):
+    """Build a ``Task`` from a :func:`task_to_record` tuple."""
+    if len(record) == _LAZY_RECORD_LENGTH:
+        from orgplan.markup import LazyTask
+
+        return LazyTask._from_record(record)
+    (title, state, tags, notes, line_number, deadline, scheduled, timestamp,
+     due_date, extras) = record
+    if extras:
+        extras = {key: list(value) if isinstance(value, tuple) else value
+                  for key, value in extras.items()}
+    task = Task.__new__(Task)
+    task.title = title
+    task.state = sys.intern(state)
+    task._legacy_due_date = _decode_date(due_date)
+    task.tags = tags
+    task.notes = notes
+    task.line_number = line_number
+    task.deadline = _decode_dates(deadline)
+    task.scheduled = _decode_dates(scheduled)
+    task.timestamp = _decode_dates(timestamp)
+    task.extras = extras
+    return task
+
+
+# Records of unbuilt lazy tasks: title, state, tags, line number, extras,
+# task line content, notes source and section offsets into it.
+_LAZY_RECORD_LENGTH = 8
+
+
+def _encode_date(value):
+    if isinstance(value, datetime.datetime):
+        midnight = datetime.datetime.combine(value.date(), datetime.time())
+        return (value.toordinal(), int((value - midnight).total_seconds()))
+    if isinstance(value, datetime.date):
+        return value.toordinal()
+    return value
+
+
+def _decode_date(value):
+    if isinstance(value, tuple):
+        ordinal, seconds = value
+        start = datetime.datetime.fromordinal(ordinal)
+        return start + datetime.timedelta(seconds=seconds)
+    if isinstance(value, int):
+        return datetime.date.fromordinal(value)
+    return value
+
+
+def _encode_dates(values):
+    return tuple(_encode_date(value) for value in values)
+
+
+def _decode_dates(values):
+    if not values:
+        return []
+    return [_decode_date(value) for value in values]
+
+
+@functools.lru_cache(maxsize=None)
+def _slot_names(cls):
+    names = []
+    for klass in reversed(cls.__mro__):
+        slots = klass.__dict__.get("__slots__", ())
+        names.extend((slots,) if isinstance(slots, str) else slots)
+    return tuple(names)
+
+
 class InMemoryTaskStore:
+    """Task store over a list of tasks kept in memory.
+
+    Every task is stored under an integer key, given in insertion order,
+    and indexed by state, due-date ``(year, month)``, tag and due-date
+    ordinal. Filters in :meth:`list`, :meth:`list_range` and :meth:`query`
+    are answered with dictionary lookups and set intersections. Tasks can
+    be added, removed and replaced with :meth:`add`, :meth:`remove` and
+    :meth:`replace`, which update those indexes in place, so a long-lived
+    store never needs rebuilding. The date index behind :meth:`due_between`
+    and the full-text index are rebuilt on the next call after a change.
+
+    Tasks are returned as stored, not copied. To change a task's indexed
+    fields, modify it and pass it to :meth:`replace`.
+    """
+
     def __init__(self, tasks=None):
-        self._tasks = list(tasks or [])
+        self._tasks = {}
+        self._key_by_id = {}
+        self._entries = {}
+        self._by_state = {}
+        self._by_month = {}
+        self._by_tag = {}
+        self._due_sorted = []
+        self._next_key = 0
+        self._due_index = None
+        self._search_index = None
+        self._search_keys = None
+        for task in tasks or ():
+            self._store(self._next_key, task, keep_sorted=False)
+            self._next_key += 1
+        self._due_sorted.sort()
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def add(self, task):
+        """Add ``task`` after the existing tasks and return its key."""
+        key = self._next_key
+        self._next_key += 1
+        self._store(key, task)
+        self._invalidate()
+        return key
+
+    def remove(self, key):
+        """Remove and return the task stored under ``key``.
+
+        Raises ``KeyError`` if there is none.
+        """
+        task = self._tasks[key]
+        self._unstore(key)
+        self._invalidate()
+        return task
+
+    def replace(self, key, task):
+        """Store ``task`` under ``key``, keeping its place in the store order.
+
+        ``task`` may be the stored task itself after it was modified; its
+        index entries are recomputed. Raises ``KeyError`` for an unknown key.
+        """
+        if key not in self._tasks:
+            raise KeyError(key)
+        # Keep the key's slot in ``_tasks`` so dict order stays store order.
+        self._unstore(key, keep_slot=True)
+        self._store(key, task)
+        self._invalidate()
+
+    def key_of(self, task):
+        """Return the key ``task`` (the object itself) is stored under, or None."""
+        key = self._key_by_id.get(id(task))
+        if key is not None and self._tasks.get(key) is task:
+            return key
+        return None
+
+    def list(self, year=None, month=None, state=None, fields=None, tags=None, any_tags=None):
+        """Return tasks filtered by state, due-date year/month and tags.
+
+        ``tags`` keeps tasks that carry every listed tag and ``any_tags``
+        tasks that carry at least one. ``fields`` is validated for parity
+        with ``FileTaskStore``; in-memory tasks are already fully built, so
+        every field is populated.
+        """
+        if fields is not None:
+            from orgplan.markup import projection_needs
+
+            projection_needs(fields)
+
+        sets = []
+        if year is not None or month is not None:
+            sets.append(self._month_keys(
+                lambda year_month: (year is None or year_month[0] == year)
+                and (month is None or year_month[1] == month)
+            ))
+        self._add_filter_sets(sets, state, tags, any_tags)
+        keys = _intersect(sets)
+        if keys is None:
+            return list(self._tasks.values())
+        return [self._tasks[key] for key in sorted(keys)]
+
+    def list_range(self, start, end, state=None, fields=None, tags=None, any_tags=None,
+                   workers=None):
+        """Return tasks due in the ``start`` through ``end`` months, in month order.
 
-    def list(self, year=None, month=None, state=None):
+        ``start`` and ``end`` are inclusive ``(year, month)`` pairs; ``workers``
+        is accepted for parity with ``FileTaskStore``.
+        """
+        if fields is not None:
+            from orgplan.markup import projection_needs
+
+            projection_needs(fields)
+        sets = [self._month_keys(lambda year_month: start <= year_month <= end)]
+        self._add_filter_sets(sets, state, tags, any_tags)
+        entries = self._entries
+        # Month order, then the store's order within a month.
+        keys = sorted(_intersect(sets), key=lambda key: (entries[key][1], key))
+        return [self._tasks[key] for key in keys]
+
+    def due_between(self, start=None, end=None, state=None, kinds=DUE_KINDS):
+        """Return tasks with a deadline or scheduled date from ``start`` through ``end``.
+
+        See ``FileTaskStore.due_between``.
+        """
+        return _due_tasks(self._get_due_index().between(start, end), state, kinds)
+
+    def next_due(self, n=10, after=None, state="open", kinds=DUE_KINDS):
+        """Return the first ``n`` tasks dated ``after`` (default today) or later.
+
+        See ``FileTaskStore.next_due``.
+        """
+        if after is None:
+            after = datetime.date.today()
+        return _due_tasks(self._get_due_index().iter_from(after), state, kinds, limit=n)
+
+    def search(self, query, state=None, since=None, limit=20):
+        """Return up to ``limit`` tasks whose title or notes contain every word of ``query``.
+
+        Ranked like ``FileTaskStore.search`` without the recency boost,
+        and ``since`` filters on due months the same way.
+        """
+        index, keys = self._get_search_index()
+        hits = index.search(query, state=state, due_from=_month_start(since), limit=limit)
+        return [self._tasks[keys[position]] for _, position, _ in hits]
+
+    def query(self, query):
+        """Yield the tasks matching ``query``, an ``orgplan.query.Query``.
+
+        Works like ``FileTaskStore.query``, except that ``query.months`` is
+        a range of due months. State, month, tag, due-date and text
+        conditions select candidates through the store's indexes; results
+        come in store order unless ``query.sort`` is set.
+        """
+        if query.fields is not None:
+            from orgplan.markup import projection_needs
+
+            projection_needs(query.fields)
+        return query.finish(self._query_tasks(query))
+
+    def _query_tasks(self, query):
+        sets = []
+        if query.months is not None:
+            first, last = query.months
+            sets.append(self._month_keys(lambda year_month: first <= year_month <= last))
+        if query.has_due_range:
+            low = query.due_from.toordinal() if query.due_from is not None else 1
+            high = (query.due_to.toordinal() if query.due_to is not None
+                    else datetime.date.max.toordinal())
+            sets.append(set(self._due_range(low, high)))
+        if query.states is not None:
+            sets.append(set().union(*(self._by_state.get(state, ()) for state in query.states)))
+        self._add_filter_sets(sets, None, query.tags, query.any_tags)
+        if query.words:
+            index, keys = self._get_search_index()
+            sets.append({keys[position] for _, position, _ in index.search(query.text)})
+
+        keys = _intersect(sets)
         tasks = self._tasks
+        selected = list(tasks) if keys is None else sorted(keys)
+        for key in selected:
+            task = tasks[key]
+            if query.matches(task):
+                yield task
+
+    def _store(self, key, task, keep_sorted=True):
+        due_date = task.due_date
+        if isinstance(due_date, datetime.date):
+            year_month = (due_date.year, due_date.month)
+            ordinal = due_date.toordinal()
+        else:
+            year_month = ordinal = None
+        tags = task.tags
+        self._tasks[key] = task
+        self._key_by_id[id(task)] = key
+        self._entries[key] = (task.state, year_month, tags, ordinal)
+        self._by_state.setdefault(task.state, set()).add(key)
+        if year_month is not None:
+            self._by_month.setdefault(year_month, set()).add(key)
+            if keep_sorted:
+                bisect.insort(self._due_sorted, (ordinal, key))
+            else:
+                self._due_sorted.append((ordinal, key))
+        for tag in tags:
+            self._by_tag.setdefault(tag, set()).add(key)
+
+    def _unstore(self, key, keep_slot=False):
+        # Index entries are removed using the values recorded by _store, in
+        # case the task was modified since.
+        task = self._tasks[key] if keep_slot else self._tasks.pop(key)
+        if self._key_by_id.get(id(task)) == key:
+            del self._key_by_id[id(task)]
+        state, year_month, tags, ordinal = self._entries.pop(key)
+        _discard_key(self._by_state, state, key)
+        if year_month is not None:
+            _discard_key(self._by_month, year_month, key)
+            index = bisect.bisect_left(self._due_sorted, (ordinal, key))
+            del self._due_sorted[index]
+        for tag in tags:
+            _discard_key(self._by_tag, tag, key)
+
+    def _invalidate(self):
+        self._due_index = None
+        self._search_index = None
+        self._search_keys = None
+
+    def _month_keys(self, wanted):
+        """Return the keys of tasks whose due ``(year, month)`` satisfies ``wanted``."""
+        return set().union(*(
+            keys for year_month, keys in self._by_month.items() if wanted(year_month)
+        ))
+
+    def _add_filter_sets(self, sets, state, tags, any_tags):
         if state is not None:
-            tasks = [task for task in tasks if task.state == state]
+            sets.append(self._by_state.get(state, set()))
+        for tag in dict.fromkeys(tags or ()):
+            sets.append(self._by_tag.get(tag, set()))
+        if any_tags:
+            sets.append(set().union(*(self._by_tag.get(tag, ()) for tag in any_tags)))
 
-        if year is not None or month is not None:
-            filtered = []
-            for task in tasks:
-                due_date = task.due_date
-                if not isinstance(due_date, datetime.date):
-                    continue
-                if year is not None and due_date.year != year:
-                    continue
-                if month is not None and due_date.month != month:
-                    continue
-                filtered.append(task)
-            tasks = filtered
+    def _due_range(self, low, high):
+        """Return keys of tasks whose ``due_date`` ordinal falls in ``[low, high]``."""
+        start = bisect.bisect_left(self._due_sorted, (low,))
+        end = bisect.bisect_left(self._due_sorted, (high + 1,))
+        return [key for _, key in self._due_sorted[start:end]]
 
-        return list(tasks)
+    def _get_due_index(self):
+        if self._due_index is None:
+            self._due_index = DueIndex()
+            self._due_index.replace(None, self._tasks.values())
+        return self._due_index
+
+    def _get_search_index(self):
+        """Return the full-text index and the key of each indexed position."""
+        if self._search_index is None:
+            from orgplan.search import SearchIndex
+
+            self._search_index = SearchIndex()
+            self._search_index.replace(None, list(self._tasks.values()))
+            self._search_keys = list(self._tasks)
+        return self._search_index, self._search_keys
+
+    def iter_tasks(self, year=None, month=None, state=None, notes=True):
+        """Yield the tasks ``list`` would return; ``notes`` is accepted for parity."""
+        return iter(self.list(year=year, month=month, state=state))
+
+    def table(self, year=None, month=None, state=None):
+        """Return the tasks ``list`` would return as a ``TaskTable``."""
+        from orgplan.table import TaskTable
+
+        return TaskTable.from_tasks(self.list(year=year, month=month, state=state))
 
 
 class FileTaskStore:
-    def __init__(self, data_root, date_service=None, parser=None):
+    def __init__(self, data_root, date_service=None, parser=None, lazy=False, use_mmap=False,
+                 extensions=None, cache_size=64, cache_bytes=64 * 1024 * 1024,
+                 cache_dir=None, max_workers=None):
         self._data_root = data_root
         self._date_service = date_service
+        self._lazy = lazy
+        self._use_mmap = use_mmap
+        self._section_indexes = {}
+        self._incremental = collections.OrderedDict()
+        self._manifest = Manifest(data_root)
+        self._cache = ParseCache(maxsize=cache_size, maxbytes=cache_bytes)
+        self._disk_cache = DiskCache(cache_dir) if cache_dir else None
+        self._max_workers = max_workers
+        self._due_index = DueIndex()
+        self._tag_index = TagIndex()
+        self._search_index = None
+        # Guards the date, tag and search indexes and the incremental parses,
+        # which refresh_month updates from a Watcher thread.
+        self._lock = threading.RLock()
+        self._search_path = os.path.join(cache_dir, "search.index") if cache_dir else None
+        self._custom_parser = parser is not None
+        if extensions is None:
+            from orgplan.markup import ParserExtensions
+
+            extensions = ParserExtensions()
+        # Shared with the plugin registry; tokens plugins register here are
+        # recognized by every parse this store runs.
+        self.extensions = extensions
         if parser is None:
             from orgplan.markup import parse_month_notes
 
-            parser = parse_month_notes
+            parser = functools.partial(parse_month_notes, lazy=lazy, extensions=extensions)
         self._parser = parser
 
     def get_month_path(self, year, month):
@@ -83,22 +571,786 @@ class FileTaskStore:
     def month_exists(self, year, month):
         return os.path.exists(self.get_month_path(year, month))
 
-    def list(self, year=None, month=None, state=None):
-        if year is None or month is None:
-            if self._date_service is None:
-                raise ValueError("date_service is required to default year/month")
-            year, month = self._date_service.current_year_month()
+    def available_months(self):
+        """Return the sorted ``(year, month)`` pairs that have a notes file.
+
+        Answered from a manifest of ``data_root`` that is refreshed with one
+        ``stat`` per year directory and rescans only directories whose
+        mtime changed. Multi-month queries and index refreshes use it
+        instead of probing each month.
+        """
+        self._manifest.refresh()
+        return self._manifest.months()
+
+    def list(self, year=None, month=None, state=None, fields=None, tags=None, any_tags=None):
+        """Return the tasks of a month file, optionally filtered by state and tags.
+
+        ``fields`` names the task fields the caller needs (see
+        ``TASK_FIELDS``). When it excludes notes and timestamps, reading stops
+        at the end of the TODO list and timestamp extraction is skipped; the
+        unrequested fields keep their defaults. A custom ``parser`` always
+        receives the whole file.
 
+        With ``use_mmap=True`` the file is memory-mapped and scanned as bytes,
+        decoding only task lines and the notes that are needed; tasks are then
+        built eagerly and ``lazy`` is ignored.
+
+        Parsed months are kept in an LRU cache keyed by the file's
+        ``(st_mtime_ns, st_size)``, so repeated calls skip reading and parsing
+        until the file changes. Callers always receive copies of the cached
+        tasks and may modify them freely. With ``cache_dir`` set, parse results
+        are also kept on disk for later processes; a custom ``parser`` does
+        not use the disk cache.
+        """
+        year, month = self._resolve_year_month(year, month)
         path = self.get_month_path(year, month)
-        if not os.path.exists(path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._cache.invalidate(path)
             return []
 
+        tasks = self._load_month(path, stat, fields, self._cache_needs(fields))
+        return _select(tasks, state, tags, any_tags)
+
+    def _cache_needs(self, fields):
+        """Return which of ``(notes, timestamps)`` fields a request needs filled."""
+        from orgplan.markup import projection_needs
+
+        if fields is None or self._custom_parser:
+            return True, True
+        _, timestamps = projection_needs(fields)
+        return "notes" in fields, timestamps
+
+    def _cached_month(self, path, stat, needs):
+        """Return a month's cached tasks from memory or disk, or None."""
+        fingerprint = (stat.st_mtime_ns, stat.st_size, self.extensions.version)
+        tasks = self._cache.get(path, fingerprint, needs)
+        if tasks is None and self._disk_cache is not None and not self._custom_parser:
+            records = self._disk_cache.load(path, stat, needs, self.extensions.signature())
+            if records is not None:
+                tasks = [task_from_record(record) for record in records]
+                self._cache.put(path, fingerprint, tasks, needs)
+        return tasks
+
+    def _remember_month(self, path, stat, tasks, needs, records=None):
+        """Store freshly parsed tasks in the caches and the due-date index."""
+        fingerprint = (stat.st_mtime_ns, stat.st_size, self.extensions.version)
+        self._cache.put(path, fingerprint, tasks, needs)
+        with self._lock:
+            if needs[1] and self._due_index.fingerprint(path) is not None:
+                self._due_index.replace(path, tasks, fingerprint)
+            if self._tag_index.fingerprint(path) is not None:
+                self._tag_index.replace(path, tasks, fingerprint)
+        if self._disk_cache is not None and not self._custom_parser:
+            if records is None:
+                records = [task_to_record(task, notes=needs[0]) for task in tasks]
+            self._disk_cache.store(path, stat, records, needs, self.extensions.signature())
+
+    def _parse_month(self, path, fields):
+        if self._use_mmap and not self._custom_parser:
+            return self._parse_mapped(path, fields)
+        if fields is not None and not self._custom_parser:
+            return self._parse_projected(path, fields)
         with open(path, "r", encoding="utf-8") as handle:
             text = handle.read()
+        return list(self._parser(text))
 
-        tasks = self._parser(text)
+    def due_between(self, start=None, end=None, state=None, kinds=DUE_KINDS):
+        """Return tasks with a deadline or scheduled date from ``start`` through ``end``.
+
+        Covers every month file, whatever month the task is filed under. Both
+        bounds are inclusive and optional; a plain date as ``end`` includes
+        that whole day. Tasks come in order of their earliest matching date,
+        each once. ``kinds`` limits the dates considered, e.g.
+        ``("deadline",)``.
+
+        Lookups bisect a sorted index of all deadline and scheduled dates
+        that is refreshed from the parse cache for month files whose
+        fingerprint changed.
+        """
+        with self._lock:
+            self._refresh_due_index()
+            return _due_tasks(self._due_index.between(start, end), state, kinds, copies=True)
+
+    def next_due(self, n=10, after=None, state="open", kinds=DUE_KINDS):
+        """Return the first ``n`` tasks dated ``after`` (default today) or later.
+
+        Works like :meth:`due_between`; ``state`` defaults to open tasks, and
+        None includes every state.
+        """
+        if after is None:
+            after = datetime.date.today()
+        with self._lock:
+            self._refresh_due_index()
+            return _due_tasks(
+                self._due_index.iter_from(after), state, kinds, limit=n, copies=True
+            )
+
+    def search(self, query, state=None, since=None, limit=20):
+        """Return up to ``limit`` tasks whose title or notes contain every word of ``query``.
+
+        Matching is case-insensitive on whole words. Results are ranked by
+        term frequency, with title words weighing more than notes, and
+        boosted for recent months. ``since`` is a ``(year, month)`` pair or a
+        date; tasks due before that month, or without a due date, are skipped.
+
+        The inverted index behind it is kept in memory, and also in
+        ``search.index`` in the ``cache_dir`` when one is set. Only month
+        files whose mtime or size changed are re-indexed.
+        """
+        with self._lock:
+            index = self._refresh_search_index()
+            hits = index.search(query, state=state, due_from=_month_start(since), limit=limit)
+
+        needs = self._cache_needs(None)
+        loaded = {}
+        results = []
+        for path, position, _ in hits:
+            tasks = loaded.get(path)
+            if tasks is None:
+                tasks = loaded[path] = self._month_tasks(path, needs)
+            if position < len(tasks):
+                results.append(copy_task(tasks[position]))
+        return results
+
+    def _month_tasks(self, path, needs):
+        """Like :meth:`_load_month`, but an empty list if the file is gone."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return []
+        return self._load_month(path, stat, None, needs)
+
+    def _refresh_search_index(self):
+        from orgplan.search import SearchIndex
+        from orgplan.table import month_key
+
+        signature = self.extensions.signature()
+        index = self._search_index
+        if index is None or index.signature != signature:
+            if self._search_path is not None:
+                index = SearchIndex.load(self._search_path, signature)
+            else:
+                index = SearchIndex(signature)
+            self._search_index = index
+
+        needs = self._cache_needs(_SEARCH_FIELDS)
+        seen = set()
+        for year, month in self.available_months():
+            path = self.get_month_path(year, month)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            seen.add(path)
+            fingerprint = (stat.st_mtime_ns, stat.st_size)
+            if index.fingerprint(path) == fingerprint:
+                continue
+            tasks = self._load_month(path, stat, _SEARCH_FIELDS, needs)
+            index.replace(path, tasks, month_key(year, month), fingerprint)
+        for source in index.sources():
+            if source not in seen:
+                index.discard(source)
+        if index.dirty and self._search_path is not None:
+            index.save(self._search_path)
+        return index
+
+    def _refresh_due_index(self):
+        needs = self._cache_needs(_DUE_FIELDS)
+        seen = set()
+        for year, month in self.available_months():
+            path = self.get_month_path(year, month)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            seen.add(path)
+            fingerprint = (stat.st_mtime_ns, stat.st_size, self.extensions.version)
+            if self._due_index.fingerprint(path) == fingerprint:
+                continue
+            tasks = self._load_month(path, stat, _DUE_FIELDS, needs)
+            self._due_index.replace(path, tasks, fingerprint)
+        for source in self._due_index.sources():
+            if source not in seen:
+                self._due_index.discard(source)
+
+    def refresh_month(self, year, month):
+        """Re-read a month file now so later reads are served from memory.
+
+        Drops the month's cached parse and section index, then parses the
+        file with every field and updates the caches and the date, tag and
+        search indexes that track it. Returns the number of tasks, or 0 if
+        the file no longer exists. ``orgplan.watch.Watcher`` calls this for
+        each changed month.
+
+        The parse is kept for the last few months refreshed, so refreshing
+        one again after an edit re-tokenizes only the changed lines and
+        reuses the other tasks (see ``IncrementalMonthParser``). A custom
+        ``parser`` always parses the whole file.
+
+        The refresh holds the store's index lock, which the methods reading
+        the indexes (``due_between``, ``next_due``, ``search``, ``query``
+        and tag-filtered ``list``/``list_range``) also take, so it can run
+        on a watcher thread while other threads read from the store.
+        """
+        from orgplan.table import month_key
+
+        path = self.get_month_path(year, month)
+        with self._lock:
+            self._cache.invalidate(path)
+            self._section_indexes.pop(path, None)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                return self._forget_month(path)
+            try:
+                tasks = self._reparse_month(path, stat)
+            except FileNotFoundError:
+                # Removed between the stat and the read.
+                return self._forget_month(path)
+            index = self._search_index
+            if index is not None and index.fingerprint(path) is not None:
+                index.replace(
+                    path, tasks, month_key(year, month), (stat.st_mtime_ns, stat.st_size)
+                )
+            return len(tasks)
+
+    def _forget_month(self, path):
+        """Drop a removed month file from the incremental parses and indexes; returns 0."""
+        self._incremental.pop(path, None)
+        self._due_index.discard(path)
+        self._tag_index.discard(path)
+        return 0
+
+    def _reparse_month(self, path, stat):
+        needs = self._cache_needs(None)
+        if self._custom_parser:
+            return self._load_month(path, stat, None, needs)
+        from orgplan.markup import IncrementalMonthParser
+
+        parser = self._incremental.pop(path, None)
+        if parser is None:
+            parser = IncrementalMonthParser(self.extensions)
+        with open(path, "r", encoding="utf-8") as handle:
+            text = handle.read()
+        tasks = parser.parse(text)
+        self._incremental[path] = parser
+        while len(self._incremental) > _INCREMENTAL_MONTHS:
+            self._incremental.popitem(last=False)
+        self._remember_month(path, stat, tasks, needs)
+        return tasks
+
+    def month_fingerprint(self, year, month):
+        """Return ``(mtime_ns, size, digest)`` for a month file as it is now.
+
+        Take it before the ``list`` call whose tasks are passed to
+        :meth:`update_many`, so any later change to the file is caught.
+        """
+        return _read_fingerprinted(self.get_month_path(year, month))[2]
+
+    def update_many(self, year, month, updates, fingerprint=None):
+        """Change the state and tags of several tasks in one month file at once.
+
+        ``updates`` is an iterable of ``(task, state, add_tags, remove_tags)``
+        tuples, where ``task`` came from this month's ``list`` and ``state``
+        is a new state or None to keep it. Only the lines recorded in each
+        task's ``line_number`` are rewritten (see
+        ``orgplan.markup.patch_task_line``); the rest of the file is kept
+        byte for byte. The file is read once and written once, through a
+        temporary file renamed over it.
+
+        ``fingerprint`` is the :meth:`month_fingerprint` taken when the tasks
+        were read. Without it, only changes after this call reads the file
+        are detected, besides the per-line checks below.
+
+        Raises :class:`StaleFileError`, leaving the file untouched, if the
+        file's mtime, size or content differ from ``fingerprint``, if a
+        task's line no longer holds a task with its title and state, or if
+        the file changed before the write. Returns the number of lines
+        rewritten.
+        """
+        from orgplan.markup import parse_title_parts, patch_task_line
+
+        path = self.get_month_path(year, month)
+        data, stat, read_fingerprint = _read_fingerprinted(path)
+        if fingerprint is not None and tuple(fingerprint) != read_fingerprint:
+            raise StaleFileError(f"{path} changed since its tasks were read")
+        lines = data.decode("utf-8").splitlines(keepends=True)
+
+        patched = {}
+        for task, state, add_tags, remove_tags in updates:
+            index = (task.line_number or 0) - 1
+            if not 0 <= index < len(lines):
+                raise StaleFileError(f"{path} has no line {task.line_number}")
+            content = lines[index].splitlines()[0]
+            found_state, _, found_title = parse_title_parts(
+                content.strip().lstrip("- ").strip(), self.extensions
+            )
+            if (found_title, found_state) != (task.title, task.state):
+                raise StaleFileError(
+                    f"{path}:{task.line_number} no longer holds task {task.title!r}"
+                )
+            content = patched.get(index, content)
+            patched[index] = patch_task_line(
+                content, state, add_tags or (), remove_tags or (), self.extensions
+            )
+
+        changed = 0
+        for index, content in patched.items():
+            line = lines[index]
+            ending = line[len(line.splitlines()[0]):]
+            if content + ending != line:
+                lines[index] = content + ending
+                changed += 1
+        if not changed:
+            return 0
+
+        def unchanged_since_read():
+            if _read_fingerprinted(path)[2] != read_fingerprint:
+                raise StaleFileError(f"{path} changed while updating tasks")
+
+        write_atomic(
+            path, "".join(lines).encode("utf-8"), mode=stat.st_mode & 0o7777,
+            check=unchanged_since_read,
+        )
+        self._cache.invalidate(path)
+        self._section_indexes.pop(path, None)
+        return changed
+
+    def cache_info(self):
+        """Return the parse cache's hit/miss counters and usage."""
+        return self._cache.info()
+
+    def clear_cache(self):
+        """Drop every cached parse result, section index and the date and tag indexes."""
+        self._cache.clear()
+        with self._lock:
+            self._section_indexes.clear()
+            self._incremental.clear()
+            self._due_index = DueIndex()
+            self._tag_index = TagIndex()
+
+    def list_range(self, start, end, state=None, fields=None, tags=None, any_tags=None,
+                   workers=None):
+        """Return the tasks of every month file from ``start`` through ``end``.
+
+        ``start`` and ``end`` are inclusive ``(year, month)`` pairs and may
+        span years. Existing month files are read and parsed concurrently on
+        a thread pool of ``workers`` threads (default: the store's
+        ``max_workers``, else up to 8); ``workers=1`` loads them serially.
+        Tasks come back in month order, each month in file order, whatever
+        order the loads finish in. Filters apply as in :meth:`list`.
+
+        With ``tags`` or ``any_tags`` the months are answered from a tag
+        postings index instead: months without a matching task are skipped
+        without touching their tasks, and only the matches are copied. The
+        index is refreshed from the parse cache for months whose file
+        changed.
+        """
+        if tags or any_tags:
+            return self._list_tagged(start, end, state, fields, tags, any_tags)
+        available = set(self.available_months())
+        months = [year_month for year_month in iter_months(start, end) if year_month in available]
+        if workers is None:
+            workers = self._max_workers or min(8, len(months))
+
+        def load(year_month):
+            year, month = year_month
+            return self.list(year, month, state=state, fields=fields, tags=tags,
+                             any_tags=any_tags)
+
+        if workers <= 1 or len(months) <= 1:
+            results = map(load, months)
+        else:
+            import concurrent.futures
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(load, months))
+
+        tasks = []
+        for month_tasks in results:
+            tasks.extend(month_tasks)
+        return tasks
+
+    def _list_tagged(self, start, end, state, fields, tags, any_tags):
+        needs = self._cache_needs(fields)
+        available = set(self.available_months())
+        tasks = []
+        for year, month in iter_months(start, end):
+            if (year, month) not in available:
+                continue
+            path = self.get_month_path(year, month)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                with self._lock:
+                    self._tag_index.discard(path)
+                continue
+            positions, month_tasks = self._tag_positions(path, stat, fields, needs, tags, any_tags)
+            if not positions:
+                continue
+            if month_tasks is None:
+                month_tasks = self._load_month(path, stat, fields, needs)
+            selected = [month_tasks[position] for position in positions]
+            tasks.extend(_select(selected, state, None, None))
+        return tasks
+
+    def _tag_positions(self, path, stat, fields, needs, tags, any_tags):
+        """Return a month's positions matching the tag filters, and its tasks if loaded."""
+        fingerprint = (stat.st_mtime_ns, stat.st_size, self.extensions.version)
+        month_tasks = None
+        with self._lock:
+            if self._tag_index.fingerprint(path) != fingerprint:
+                month_tasks = self._load_month(path, stat, fields, needs)
+                self._tag_index.replace(path, month_tasks, fingerprint)
+            return self._tag_index.match(path, tags, any_tags), month_tasks
+
+    def query(self, query):
+        """Yield copies of the tasks matching ``query``, an ``orgplan.query.Query``.
+
+        Months come from the manifest, limited to ``query.months``. Tag
+        conditions are answered per month from the tag index; for queries
+        over the whole history, due-date ranges and text also narrow the
+        months and tasks through the due-date and search indexes. Only the
+        remaining candidates are loaded and checked with ``query.matches``.
+        Without sort keys, results stream in month order, then file order,
+        and loading stops once ``limit`` tasks were yielded.
+        """
+        return query.finish(self._query_tasks(query))
+
+    def _query_tasks(self, query):
+        months = self.available_months()
+        if query.months is not None:
+            first, last = query.months
+            months = [year_month for year_month in months if first <= year_month <= last]
+        fields = query.load_fields()
+        needs = self._cache_needs(fields)
+
+        # The due-date and search indexes cover every month, so refreshing
+        # them only pays off when the query does too.
+        due_sources = text_hits = None
+        if query.months is None and not self._custom_parser:
+            with self._lock:
+                if query.has_due_range:
+                    self._refresh_due_index()
+                    due_sources = set(
+                        self._due_index.sources_between(query.due_from, query.due_to)
+                    )
+                if query.words:
+                    text_hits = {}
+                    for path, position, _ in self._refresh_search_index().search(query.text):
+                        text_hits.setdefault(path, set()).add(position)
+
+        for year, month in months:
+            path = self.get_month_path(year, month)
+            if due_sources is not None and path not in due_sources:
+                continue
+            if text_hits is not None and path not in text_hits:
+                continue
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            positions = month_tasks = None
+            if query.tags or query.any_tags:
+                positions, month_tasks = self._tag_positions(
+                    path, stat, fields, needs, query.tags, query.any_tags
+                )
+                if not positions:
+                    continue
+            if text_hits is not None:
+                hits = text_hits[path]
+                if positions is None:
+                    positions = sorted(hits)
+                else:
+                    positions = [position for position in positions if position in hits]
+            if month_tasks is None:
+                month_tasks = self._load_month(path, stat, fields, needs)
+            if positions is not None:
+                month_tasks = [month_tasks[position] for position in positions
+                               if position < len(month_tasks)]
+            for task in month_tasks:
+                if query.matches(task):
+                    yield copy_task(task)
+
+    def _load_month(self, path, stat, fields, needs):
+        """Return a month's cached or freshly parsed tasks (not copies)."""
+        tasks = self._cached_month(path, stat, needs)
+        if tasks is None:
+            tasks = self._parse_month(path, fields)
+            self._remember_month(path, stat, tasks, needs)
+        return tasks
+
+    def load_all(self, state=None, fields=None, tags=None, any_tags=None, workers=None):
+        """Return ``{(year, month): tasks}`` for every month file, oldest first.
+
+        See :meth:`iter_all`.
+        """
+        return dict(self.iter_all(state=state, fields=fields, tags=tags, any_tags=any_tags,
+                                  workers=workers))
+
+    def iter_all(self, state=None, fields=None, tags=None, any_tags=None, workers=None):
+        """Yield ``((year, month), tasks)`` for every month file under ``data_root``.
+
+        Months come oldest first. Months not already cached are parsed on a
+        ``ProcessPoolExecutor`` of ``workers`` processes (default: the
+        store's ``max_workers``, else the CPU count); workers send back
+        compact task records (see :func:`task_to_record`) rather than pickled
+        tasks. Small workloads, ``workers=1`` and stores with a custom
+        ``parser`` are parsed serially in this process. Filters apply as in
+        :meth:`list`.
+        """
+        needs = self._cache_needs(fields)
+        months = []
+        pending = []
+        for year, month in self.available_months():
+            path = self.get_month_path(year, month)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            tasks = self._cached_month(path, stat, needs)
+            months.append(((year, month), path, stat, tasks))
+            if tasks is None:
+                pending.append(path)
+
+        if workers is None:
+            workers = self._max_workers or os.cpu_count() or 1
+        parallel = (
+            workers > 1
+            and len(pending) > 1
+            and not self._custom_parser
+            and sum(stat.st_size for _, _, stat, tasks in months if tasks is None)
+            >= _PROCESS_POOL_MIN_BYTES
+        )
+        if not parallel:
+            for year_month, path, stat, tasks in months:
+                if tasks is None:
+                    tasks = self._parse_month(path, fields)
+                    self._remember_month(path, stat, tasks, needs)
+                yield year_month, _select(tasks, state, tags, any_tags)
+            return
+
+        import concurrent.futures
+
+        extensions = self.extensions if self.extensions else None
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(workers, len(pending))
+        )
+        try:
+            futures = {
+                path: executor.submit(_parse_month_records, path, fields, extensions, needs[0])
+                for path in pending
+            }
+            for year_month, path, stat, tasks in months:
+                if tasks is None:
+                    records = futures.pop(path).result()
+                    tasks = [task_from_record(record) for record in records]
+                    self._remember_month(path, stat, tasks, needs, records)
+                yield year_month, _select(tasks, state, tags, any_tags)
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def iter_tasks(self, year=None, month=None, state=None, notes=True):
+        """Stream tasks from the month file instead of reading it whole.
+
+        With ``notes=False`` reading stops at the end of the TODO list, which
+        is all that commands working on titles, states and tags need.
+        """
+        from orgplan.markup import iter_month_notes
+
+        year, month = self._resolve_year_month(year, month)
+        path = self.get_month_path(year, month)
+        if not os.path.exists(path):
+            return
+
+        with open(path, "r", encoding="utf-8") as handle:
+            for task in iter_month_notes(handle, notes=notes, extensions=self.extensions):
+                if state is None or task.state == state:
+                    yield task
+
+    def table(self, year=None, month=None, state=None):
+        """Return a month's tasks as a ``TaskTable`` for bulk analytics."""
+        from orgplan.table import TaskTable
+
+        year, month = self._resolve_year_month(year, month)
+        tasks = self.list(year, month, state=state, fields=_TABLE_FIELDS)
+        return TaskTable.from_tasks(tasks, year=year, month=month)
+
+    def section_index(self, year, month):
+        """Return ``{title: [(start, end), ...]}`` notes byte ranges for a month.
+
+        The index is built once per file version and cached against the
+        file's ``(st_mtime_ns, st_size)``. Returns None if the file is missing
+        or cannot be indexed by byte offsets.
+        """
+        from orgplan.markup import build_section_index
+
+        path = self.get_month_path(year, month)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._section_indexes.pop(path, None)
+            return None
+
+        fingerprint = (stat.st_mtime_ns, stat.st_size, self.extensions.version)
+        cached = self._section_indexes.get(path)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+
+        with open(path, "rb") as handle:
+            index = build_section_index(handle.read(), extensions=self.extensions)
+        self._section_indexes[path] = (fingerprint, index)
+        return index
+
+    def get_notes(self, year, month, title, all_sections=False):
+        """Return the notes for ``title`` by reading only its section.
+
+        Like the parser, the last section with a matching header wins; with
+        ``all_sections=True`` every matching section's notes are returned as a
+        list. Returns None (or ``[]``) when there is no such section.
+        """
+        from orgplan.markup import decode_notes, find_section_notes
+
+        index = self.section_index(year, month)
+        path = self.get_month_path(year, month)
+        if index is not None:
+            ranges = index.get(title, [])
+            if not all_sections:
+                ranges = ranges[-1:]
+            notes = []
+            with open(path, "rb") as handle:
+                for start, end in ranges:
+                    handle.seek(start)
+                    notes.append(decode_notes(handle.read(end - start)))
+        elif os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as handle:
+                notes = find_section_notes(handle.read(), title, extensions=self.extensions)
+        else:
+            notes = []
+
+        if all_sections:
+            return notes
+        return notes[-1] if notes else None
+
+    def _parse_projected(self, path, fields):
+        from orgplan.markup import iter_month_notes, parse_month_notes, projection_needs
+
+        notes, _ = projection_needs(fields)
+        with open(path, "r", encoding="utf-8") as handle:
+            if not notes:
+                return list(
+                    iter_month_notes(handle, notes=False, fields=fields, extensions=self.extensions)
+                )
+            text = handle.read()
+        return parse_month_notes(
+            text, lazy=self._lazy, fields=fields, extensions=self.extensions
+        )
+
+    def _parse_mapped(self, path, fields):
+        from orgplan.markup import parse_month_buffer
+
+        with open(path, "rb") as handle:
+            if os.fstat(handle.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                return parse_month_buffer(buffer, fields=fields, extensions=self.extensions)
+
+    def _resolve_year_month(self, year, month):
+        if year is None or month is None:
+            if self._date_service is None:
+                raise ValueError("date_service is required to default year/month")
+            year, month = self._date_service.current_year_month()
+        return year, month
+
+
+def scan_months(data_root):
+    """Return the sorted ``(year, month)`` pairs with a ``YYYY/MM-notes.md`` file.
+
+    Stores that list months repeatedly keep a ``Manifest`` instead.
+    """
+    manifest = Manifest(data_root)
+    manifest.refresh()
+    return manifest.months()
+
+
+def _select(tasks, state, tags, any_tags):
+    """Return copies of the ``tasks`` that match ``state`` and the tag filters."""
+    if state is not None:
+        tasks = [task for task in tasks if task.state == state]
+
+    matches = tag_filter(tags, any_tags)
+    if matches is not None:
+        tasks = [task for task in tasks if matches(task)]
+
+    return [copy_task(task) for task in tasks]
+
+
+def _parse_month_records(path, fields, extensions, notes):
+    """Parse a month file into task records; runs in ``iter_all`` worker processes."""
+    from orgplan.markup import parse_month_notes
+
+    with open(path, "r", encoding="utf-8") as handle:
+        text = handle.read()
+    tasks = parse_month_notes(text, fields=fields, extensions=extensions)
+    return tuple(task_to_record(task, notes=notes) for task in tasks)
+
+
+def _intersect(sets):
+    """Return the intersection of ``sets`` as a new set, or None if there are none."""
+    if not sets:
+        return None
+    sets = sorted(sets, key=len)
+    result = set(sets[0])
+    for keys in sets[1:]:
+        if not result:
+            break
+        result &= keys
+    return result
+
+
+def _discard_key(buckets, bucket, key):
+    keys = buckets[bucket]
+    keys.discard(key)
+    if not keys:
+        del buckets[bucket]
+
+
+def _due_tasks(entries, state, kinds, limit=None, copies=False):
+    """Return each task from due-index ``entries`` once, in entry order."""
+    tasks = []
+    seen = set()
+    for _, kind, task in entries:
+        if kind not in kinds or id(task) in seen:
+            continue
+        if state is not None and task.state != state:
+            continue
+        seen.add(id(task))
+        tasks.append(copy_task(task) if copies else task)
+        if limit is not None and len(tasks) >= limit:
+            break
+    return tasks
+
+
+def _read_fingerprinted(path):
+    """Return a file's bytes, its stat and its ``(mtime_ns, size, digest)``."""
+    with open(path, "rb") as handle:
+        stat = os.fstat(handle.fileno())
+        data = handle.read()
+    return data, stat, (stat.st_mtime_ns, stat.st_size, content_digest(data))
+
+
+def _year_month(value):
+    """Return ``(year, month)`` for a ``(year, month)`` pair or a date."""
+    if isinstance(value, datetime.date):
+        return value.year, value.month
+    year, month = value
+    return year, month
 
-        if state is not None:
-            tasks = [task for task in tasks if task.state == state]
 
-        return list(tasks)
+def _month_start(value):
+    """Return the first day of ``_year_month(value)``, or None for None."""
+    if value is None:
+        return None
+    return datetime.date(*_year_month(value), 1)
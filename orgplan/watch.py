@@ -0,0 +1,304 @@
+"""Watch a data root and keep a task store's caches current as files change."""
+
+import collections
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+import traceback
+
+from orgplan.manifest import Manifest, _YEAR_DIR_PATTERN, split_month_path
+
+# ``path`` changed; ``kind`` is "notes" or "meta", and ``deleted`` is True
+# when the file no longer exists.
+ChangeEvent = collections.namedtuple(
+    "ChangeEvent", ["path", "year", "month", "kind", "deleted"]
+)
+
+# inotify(7) constants.
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = getattr(os, "O_NONBLOCK", 0o4000)
+_IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+_WATCH_MASK = (
+    _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class Watcher:
+    """Background thread reporting changes to the month files under ``data_root``.
+
+    Uses inotify through ``ctypes`` on Linux and otherwise polls the
+    ``(st_mtime_ns, st_size)`` of every month file each ``poll_interval``
+    seconds. Changes to a file are held back until it has been quiet for
+    ``debounce`` seconds, so a burst of editor writes produces one update.
+
+    For each settled change the watcher calls ``store.refresh_month`` for
+    notes files, when a ``store`` is given, so the next read is served from
+    memory, and then passes a ``ChangeEvent`` to every subscriber on the
+    watcher thread. Exceptions raised by ``refresh_month`` or by subscribers
+    are printed and do not stop the watcher.
+
+    While a watcher refreshes a ``FileTaskStore``, other threads may keep
+    calling its read methods (``list``, ``list_range``, ``query``,
+    ``due_between``, ``next_due``, ``search``, ``get_notes``) and
+    ``update_many``: the parse cache and the store's indexes are updated
+    under locks. ``clear_cache`` is safe too. Other attributes of the store
+    are not meant to be used concurrently.
+    """
+
+    def __init__(self, data_root, store=None, debounce=0.25, poll_interval=1.0,
+                 use_inotify=True):
+        self.data_root = data_root
+        self.store = store
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.backend = None
+        self._subscribers = []
+        self._source = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def subscribe(self, callback):
+        """Call ``callback(event)`` for every change; returns ``callback``."""
+        with self._lock:
+            self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def start(self):
+        """Start watching; ``backend`` then names the mechanism in use."""
+        if self._thread is not None:
+            return
+        source = None
+        if self.use_inotify:
+            source = _InotifySource.create(self.data_root)
+        if source is None:
+            source = _PollingSource(self.data_root, self.poll_interval, self._stop)
+        self._source = source
+        self.backend = source.name
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="orgplan-watch", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the watcher thread and release the backend."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._source.close()
+        self._thread = self._source = None
+
+    def _run(self):
+        pending = {}
+        while not self._stop.is_set():
+            timeout = self.poll_interval
+            if pending:
+                oldest = min(pending.values())
+                timeout = max(0.0, min(timeout, oldest + self.debounce - time.monotonic()))
+            changed = self._source.wait(timeout)
+            now = time.monotonic()
+            for path in changed:
+                pending[path] = now
+            settled = [path for path, seen in pending.items() if now - seen >= self.debounce]
+            for path in sorted(settled):
+                del pending[path]
+                self._publish(path)
+
+    def _publish(self, path):
+        parts = split_month_path(self.data_root, path)
+        if parts is None:
+            return
+        year, month, kind = parts
+        if kind == "notes" and self.store is not None:
+            try:
+                self.store.refresh_month(year, month)
+            except Exception:
+                # A half-written or undecodable file must not end the
+                # watcher; its next change is refreshed again.
+                traceback.print_exc()
+        event = ChangeEvent(path, year, month, kind, not os.path.exists(path))
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception:
+                traceback.print_exc()
+
+
+class _PollingSource:
+    """Reports month files whose fingerprint changed between scans."""
+
+    name = "polling"
+
+    def __init__(self, data_root, interval, stop):
+        self._manifest = Manifest(data_root)
+        self._interval = interval
+        self._stop = stop
+        self._snapshot = self._scan()
+
+    def wait(self, timeout):
+        self._stop.wait(min(timeout, self._interval))
+        snapshot = self._scan()
+        previous = self._snapshot
+        self._snapshot = snapshot
+        return [
+            path for path in snapshot.keys() | previous.keys()
+            if snapshot.get(path) != previous.get(path)
+        ]
+
+    def close(self):
+        pass
+
+    def _scan(self):
+        self._manifest.refresh()
+        root = self._manifest.data_root
+        snapshot = {}
+        for (year, month), files in self._manifest.entries():
+            for kind in ("notes", "meta"):
+                if getattr(files, kind) is None:
+                    continue
+                path = os.path.join(root, f"{year:04d}", f"{month:02d}-{kind}.md")
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+
+class _InotifySource:
+    """Reports paths named by inotify events on ``data_root`` and its year directories."""
+
+    name = "inotify"
+
+    def __init__(self, data_root, libc, fd):
+        self._data_root = data_root
+        self._libc = libc
+        self._fd = fd
+        self._dirs = {}
+        self._add_watch(data_root)
+        for name in os.listdir(data_root):
+            path = os.path.join(data_root, name)
+            if _YEAR_DIR_PATTERN.match(name) and os.path.isdir(path):
+                self._add_watch(path)
+
+    @classmethod
+    def create(cls, data_root):
+        """Return a source for ``data_root``, or None if inotify is unavailable."""
+        libc = _load_inotify()
+        if libc is None:
+            return None
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            return None
+        try:
+            return cls(data_root, libc, fd)
+        except OSError:
+            os.close(fd)
+            return None
+
+    def wait(self, timeout):
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        changed = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].split(b"\0", 1)[0]
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                # Events were lost; report every file so nothing stays stale.
+                changed.extend(self._all_files())
+                continue
+            if mask & _IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & _IN_ISDIR:
+                if directory == self._data_root and mask & (_IN_CREATE | _IN_MOVED_TO):
+                    if _YEAR_DIR_PATTERN.match(os.path.basename(path)):
+                        self._add_watch(path)
+                        changed.extend(self._files_in(path))
+                continue
+            changed.append(path)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+    def _add_watch(self, path):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error != errno.ENOENT:
+                raise OSError(error, os.strerror(error), path)
+            return
+        self._dirs[wd] = path
+
+    def _files_in(self, directory):
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+        return [os.path.join(directory, name) for name in names]
+
+    def _all_files(self):
+        paths = []
+        for directory in list(self._dirs.values()):
+            if directory != self._data_root:
+                paths.extend(self._files_in(directory))
+        return paths
+
+
+def _load_inotify():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        init = libc.inotify_init1
+        add_watch = libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    init.argtypes = [ctypes.c_int]
+    init.restype = ctypes.c_int
+    add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    add_watch.restype = ctypes.c_int
+    return libc
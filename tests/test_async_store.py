@@ -0,0 +1,85 @@
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from orgplan.async_store import AsyncFileTaskStore
+from orgplan.query import Query
+from orgplan.tasks import FileTaskStore
+
+
+def write_month(data_root, year, month, text):
+    path = os.path.join(data_root, f"{year:04d}", f"{month:02d}-notes.md")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(text)
+
+
+class AsyncFileTaskStoreTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.data_root = self._tmpdir.name
+        write_month(self.data_root, 2024, 12, "# TODO List\n- #p0 Plan\n- [DONE] Ship\n")
+        write_month(self.data_root, 2025, 1, "# TODO List\n- Review\n- #p0 Fix\n")
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    async def test_matches_synchronous_results(self):
+        sync = FileTaskStore(self.data_root)
+        async with AsyncFileTaskStore(self.data_root) as store:
+            self.assertEqual(repr(await store.alist(2024, 12, state="open")),
+                             repr(sync.list(2024, 12, state="open")))
+            self.assertEqual(
+                repr(await store.alist_range((2024, 11), (2025, 2), tags=["p0"])),
+                repr(sync.list_range((2024, 11), (2025, 2), tags=["p0"])),
+            )
+            self.assertEqual(
+                [task.title for task in await store.alist_range((2025, 1), (2025, 12))],
+                ["Review", "Fix"],
+            )
+            self.assertEqual(await store.alist(2025, 6), [])
+            found = await store.aquery(Query(states="open", sort="title"))
+            self.assertEqual([task.title for task in found], ["Fix", "Plan", "Review"])
+
+    async def test_concurrent_requests_share_one_load(self):
+        store = AsyncFileTaskStore(self.data_root)
+        with mock.patch.object(store, "_parse_month", wraps=store._parse_month) as parse:
+            results = await asyncio.gather(*(store.alist(2025, 1) for _ in range(5)))
+        self.assertEqual(parse.call_count, 1)
+        self.assertEqual([[task.title for task in tasks] for tasks in results],
+                         [["Review", "Fix"]] * 5)
+        results[0][0].title = "changed"
+        self.assertEqual(results[1][0].title, "Review")
+        self.assertEqual(store._inflight, {})
+        store.close()
+
+    async def test_parses_on_process_pool(self):
+        async with AsyncFileTaskStore(self.data_root, process_workers=1) as store:
+            tasks = await store.alist_range((2024, 12), (2025, 1), fields=("title", "state"))
+            self.assertEqual([task.title for task in tasks], ["Plan", "Ship", "Review", "Fix"])
+            self.assertEqual(store.cache_info().currsize, 2)
+
+
+
+class PackageImportTests(unittest.TestCase):
+    def test_cli_import_does_not_load_optional_front_ends(self):
+        code = (
+            "import sys, orgplan.cli; "
+            "print(sorted({'asyncio', 'sqlite3', 'orgplan.watch'} & set(sys.modules)))"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True
+        ).stdout
+        self.assertEqual(output.strip(), "[]")
+
+        import orgplan
+
+        self.assertIs(orgplan.AsyncFileTaskStore, AsyncFileTaskStore)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+from orgplan.cache import TASK_OVERHEAD, ParseCache
+
+
+class ParseCacheTests(unittest.TestCase):
+    def test_hit_requires_matching_fingerprint(self):
+        cache = ParseCache()
+        cache.put("a", (1, 10), ["task"])
+        self.assertEqual(cache.get("a", (1, 10)), ["task"])
+        self.assertIsNone(cache.get("a", (2, 10)))
+        self.assertEqual(len(cache), 0)
+        info = cache.info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+    def test_partial_entries_only_serve_smaller_requests(self):
+        cache = ParseCache()
+        cache.put("a", (1, 10), [], parsed=(False, False))
+        self.assertEqual(cache.get("a", (1, 10), needs=(False, False)), [])
+        self.assertIsNone(cache.get("a", (1, 10), needs=(True, True)))
+
+    def test_evicts_least_recently_used_by_count(self):
+        cache = ParseCache(maxsize=2)
+        cache.put("a", (1, 1), [])
+        cache.put("b", (1, 1), [])
+        cache.get("a", (1, 1))
+        cache.put("c", (1, 1), [])
+        self.assertIsNone(cache.get("b", (1, 1)))
+        self.assertIsNotNone(cache.get("a", (1, 1)))
+        self.assertIsNotNone(cache.get("c", (1, 1)))
+
+    def test_evicts_by_approximate_bytes(self):
+        cache = ParseCache(maxbytes=1000 + TASK_OVERHEAD)
+        cache.put("a", (1, 500), ["t"])
+        cache.put("b", (1, 500), ["t"])
+        self.assertEqual(len(cache), 1)
+        self.assertIsNotNone(cache.get("b", (1, 500)))
+        cache.put("huge", (1, 10 ** 6), [])
+        self.assertIsNone(cache.get("huge", (1, 10 ** 6)))
+        self.assertLessEqual(cache.info().currbytes, cache.maxbytes)
+
+
+if __name__ == "__main__":
+    unittest.main()
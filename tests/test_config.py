@@ -66,5 +66,20 @@ class ConfigTests(unittest.TestCase):
             os.unlink(path)
 
 
+    def test_cache_dir_true_uses_data_root(self):
+        with tempfile.TemporaryDirectory() as data_root:
+            payload = {"data_root": data_root, "cache_dir": True}
+            with tempfile.NamedTemporaryFile("w", delete=False) as handle:
+                json.dump(payload, handle)
+                path = handle.name
+
+            try:
+                config = load_config(path)
+                self.assertEqual(
+                    config.cache_dir, os.path.join(os.path.abspath(data_root), ".orgplan-cache")
+                )
+            finally:
+                os.unlink(path)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,22 @@
+import unittest
+
+from orgplan.dates import iter_months
+
+
+class IterMonthsTests(unittest.TestCase):
+    def test_spans_year_boundary(self):
+        self.assertEqual(
+            list(iter_months((2024, 11), (2025, 2))),
+            [(2024, 11), (2024, 12), (2025, 1), (2025, 2)],
+        )
+
+    def test_empty_when_end_precedes_start(self):
+        self.assertEqual(list(iter_months((2025, 2), (2025, 1))), [])
+
+    def test_rejects_invalid_month(self):
+        with self.assertRaises(ValueError):
+            list(iter_months((2025, 0), (2025, 3)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,17 @@
+import bisect
+import datetime
 import os
 import tempfile
+import threading
 import unittest
+from unittest import mock
 
+from orgplan.api import OrgplanAPI
 from orgplan.dates import DateService
-from orgplan.tasks import FileTaskStore
+from orgplan.query import Query
+from orgplan.registry import Registry
+from orgplan import tasks as tasks_module
+from orgplan.tasks import FileTaskStore, StaleFileError
 
 
 class FixedDateService(DateService):
@@ -39,6 +47,7 @@ class FileTaskStoreTests(unittest.TestCase):
                 handle.write("# TODO List\n- Task one\n")
 
             self.assertTrue(store.month_exists(2024, 1))
+            self.assertEqual(store.available_months(), [(2024, 1)])
 
     def test_parses_tasks_from_file(self):
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -52,7 +61,7 @@ class FileTaskStoreTests(unittest.TestCase):
             self.assertEqual(len(tasks), 1)
             self.assertEqual(tasks[0].title, "Ship it")
             self.assertEqual(tasks[0].state, "done")
-            self.assertEqual(tasks[0].tags, ["p1"])
+            self.assertEqual(tasks[0].tags, ("p1",))
 
     def test_filters_by_state(self):
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -65,6 +74,654 @@ class FileTaskStoreTests(unittest.TestCase):
             tasks = store.list(2024, 1, state="done")
             self.assertEqual([task.title for task in tasks], ["Done task"])
 
+    def test_iter_tasks_streams_without_notes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileTaskStore(tmpdir, date_service=FixedDateService(2024, 1))
+            path = store.get_month_path(2024, 1)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write("# TODO List\n- [DONE] Done task\n- Open task\n\n# Open task\nNotes\n")
+
+            tasks = list(store.iter_tasks(state="open", notes=False))
+            self.assertEqual([task.title for task in tasks], ["Open task"])
+            self.assertIsNone(tasks[0].notes)
+
+            tasks = list(store.iter_tasks(2024, 1, state="open"))
+            self.assertEqual(tasks[0].notes, "Notes")
+
+    def test_iter_tasks_missing_file_yields_nothing(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileTaskStore(tmpdir, date_service=FixedDateService(2024, 1))
+            self.assertEqual(list(store.iter_tasks()), [])
+
+    def test_list_with_field_projection(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileTaskStore(tmpdir, date_service=FixedDateService(2024, 1))
+            path = store.get_month_path(2024, 1)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write(
+                    "# TODO List\n- #p0 Ship it DEADLINE: <2024-01-20>\n- Plan\n\n"
+                    "# Plan\nSCHEDULED: <2024-01-05>\n"
+                )
+
+            tasks = store.list(2024, 1, fields=("title", "state", "tags"))
+            self.assertEqual([task.title for task in tasks], ["Ship it DEADLINE: <2024-01-20>", "Plan"])
+            self.assertEqual(tasks[0].tags, ("p0",))
+            self.assertEqual(tasks[0].deadline, [])
+            self.assertIsNone(tasks[1].notes)
+
+            tasks = store.list(2024, 1, fields=("due_date",))
+            self.assertEqual(tasks[0].due_date, datetime.date(2024, 1, 20))
+            self.assertEqual(tasks[1].due_date, datetime.date(2024, 1, 5))
+
+    def test_notes_projection_leaves_timestamps_unparsed(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = FileTaskStore(tmpdir).get_month_path(2025, 1)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write(
+                    "# TODO List\n- Ship #p0 DEADLINE: <2025-01-05>\n\n"
+                    "# Ship DEADLINE: <2025-01-05>\nsee <2025-02-01>\n"
+                )
+
+            for store in (FileTaskStore(tmpdir), FileTaskStore(tmpdir, use_mmap=True)):
+                task = store.list(2025, 1, fields=("title", "notes"))[0]
+                self.assertEqual(task.notes, "see <2025-02-01>")
+                self.assertEqual((task.deadline, task.timestamp), ([], []))
+                task = store.list(2025, 1)[0]
+                self.assertEqual(task.deadline, [datetime.date(2025, 1, 5)])
+                self.assertEqual(task.timestamp, [])
+            task = next(FileTaskStore(tmpdir).iter_tasks(2025, 1))
+            self.assertEqual(task.deadline, [datetime.date(2025, 1, 5)])
+
+    def test_list_rejects_unknown_fields(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileTaskStore(tmpdir, date_service=FixedDateService(2024, 1))
+            path = store.get_month_path(2024, 1)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write("# TODO List\n- Task one\n")
+
+            with self.assertRaises(ValueError):
+                store.list(2024, 1, fields=("title", "owner"))
+
+    def test_mmap_mode_matches_text_mode(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileTaskStore(tmpdir, date_service=FixedDateService(2024, 1))
+            mapped = FileTaskStore(tmpdir, date_service=FixedDateService(2024, 1), use_mmap=True)
+            path = store.get_month_path(2024, 1)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as handle:
+                handle.write(
+                    "# TODO List\r\n- [DONE] #p1 Café DEADLINE: <2024-01-20>\r\n- Plan\r\n\r\n"
+                    "# Plan\r\n\r\nSCHEDULED: <2024-01-05>\r\nNotes\r\n".encode("utf-8")
+                )
+
+            def fields(tasks):
+                return [(t.title, t.state, t.tags, t.notes, t.line_number, t.due_date) for t in tasks]
+
+            self.assertEqual(fields(mapped.list()), fields(store.list()))
+            self.assertEqual(mapped.list()[1].notes, "SCHEDULED: <2024-01-05>\nNotes")
+            self.assertEqual(
+                fields(mapped.list(state="open", fields=("title",))),
+                fields(store.list(state="open", fields=("title",))),
+            )
+
+    def test_mmap_mode_empty_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileTaskStore(tmpdir, date_service=FixedDateService(2024, 1), use_mmap=True)
+            path = store.get_month_path(2024, 1)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, "wb").close()
+            self.assertEqual(store.list(), [])
+
+    def test_filters_by_tags(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileTaskStore(tmpdir, date_service=FixedDateService(2024, 1))
+            path = store.get_month_path(2024, 1)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write("# TODO List\n- #p0 #blocked One\n- #p0 Two\n- #p1 Three\n")
+
+            tasks = store.list(2024, 1, tags=["p0", "blocked"])
+            self.assertEqual([task.title for task in tasks], ["One"])
+            tasks = store.list(2024, 1, any_tags=["blocked", "p1"])
+            self.assertEqual([task.title for task in tasks], ["One", "Three"])
+
+    def test_tag_queries_span_a_year_and_follow_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileTaskStore(tmpdir, date_service=FixedDateService(2025, 1))
+            for month, body in ((1, "- #p0 #blocked Jan\n- #p0 Jan two\n"),
+                                (3, "- #p1 Mar\n- [DONE] #p0 #blocked Mar done\n")):
+                path = store.get_month_path(2024, month)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w", encoding="utf-8") as handle:
+                    handle.write("# TODO List\n" + body)
+
+            titles = lambda tasks: [task.title for task in tasks]
+            # A year without a month still means the current month.
+            self.assertEqual(store.list(2024), [])
+            year = ((2024, 1), (2024, 12))
+            self.assertEqual(titles(store.list_range(*year, tags=["p0", "blocked"])),
+                             ["Jan", "Mar done"])
+            self.assertEqual(
+                titles(store.list_range(*year, tags=["p0", "blocked"], state="open")), ["Jan"]
+            )
+            self.assertEqual(
+                titles(store.list_range((2024, 1), (2024, 3), any_tags=["p1", "blocked"])),
+                ["Jan", "Mar", "Mar done"],
+            )
+            self.assertEqual(titles(store.list_range(*year)), ["Jan", "Jan two", "Mar", "Mar done"])
+
+            with open(store.get_month_path(2024, 3), "w", encoding="utf-8") as handle:
+                handle.write("# TODO List\n- #p1 #blocked Mar again\n")
+            self.assertEqual(titles(store.list_range(*year, tags=["blocked"])), ["Jan", "Mar again"])
+            os.remove(store.get_month_path(2024, 1))
+            self.assertEqual(titles(store.list_range(*year, tags=["blocked"])), ["Mar again"])
+
+    def test_get_notes_reads_single_section(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileTaskStore(tmpdir, date_service=FixedDateService(2024, 1))
+            path = store.get_month_path(2024, 1)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as handle:
+                handle.write(
+                    "# TODO List\r\n- Ship it\r\n- Plan\r\n\r\n# Ship it\r\n\r\nFirst\r\n"
+                    "# [DONE] Plan\r\nPlan notes é\r\n# Ship it\r\nSecond\r\nmore\r\n".encode("utf-8")
+                )
+
+            self.assertEqual(store.get_notes(2024, 1, "Ship it"), "Second\nmore")
+            self.assertEqual(store.get_notes(2024, 1, "Ship it", all_sections=True), ["First", "Second\nmore"])
+            self.assertEqual(store.get_notes(2024, 1, "Plan"), "Plan notes é")
+            self.assertIsNone(store.get_notes(2024, 1, "Missing"))
+            self.assertEqual(store.get_notes(2024, 1, "Plan"), store.list(2024, 1)[1].notes)
+            self.assertEqual(len(store.section_index(2024, 1)["Ship it"]), 2)
+
+    def test_section_index_tracks_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileTaskStore(tmpdir, date_service=FixedDateService(2024, 1))
+            path = store.get_month_path(2024, 1)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write("# TODO List\n- Ship it\n# Ship it\nOld\n")
+            self.assertEqual(store.get_notes(2024, 1, "Ship it"), "Old")
+
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write("# TODO List\n- Ship it\n# Ship it\nNewer notes\n")
+            self.assertEqual(store.get_notes(2024, 1, "Ship it"), "Newer notes")
+
+            os.remove(path)
+            self.assertIsNone(store.get_notes(2024, 1, "Ship it"))
+
+    def test_get_notes_with_lone_carriage_returns(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileTaskStore(tmpdir, date_service=FixedDateService(2024, 1))
+            path = store.get_month_path(2024, 1)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as handle:
+                handle.write(b"# TODO List\r- Ship it\r# Ship it\rNotes\r")
+            self.assertIsNone(store.section_index(2024, 1))
+            self.assertEqual(store.get_notes(2024, 1, "Ship it"), "Notes")
+
+    def test_registry_extensions_apply_to_store_parsing(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileTaskStore(tmpdir, date_service=FixedDateService(2024, 1))
+            registry = Registry(OrgplanAPI(task_store=store))
+            registry.add_tags("errands")
+            registry.add_key("owner")
+            path = store.get_month_path(2024, 1)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write(
+                    "# TODO List\n- Buy milk #errands owner:ann\n- Other\n"
+                    "\n# Buy milk owner:ann\nOat milk\n"
+                )
+
+            self.assertIs(registry.extensions, store.extensions)
+            tasks = store.list(2024, 1, tags=["errands"])
+            self.assertEqual([task.title for task in tasks], ["Buy milk"])
+            self.assertEqual(tasks[0].extras, {"owner": "ann"})
+            self.assertEqual(tasks[0].notes, "Oat milk")
+            self.assertEqual(store.get_notes(2024, 1, "Buy milk"), "Oat milk")
+            streamed = list(store.iter_tasks(2024, 1, notes=False))
+            self.assertEqual(streamed[0].extras, {"owner": "ann"})
+
+    def test_list_uses_parse_cache_until_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileTaskStore(tmpdir, date_service=FixedDateService(2024, 1))
+            path = store.get_month_path(2024, 1)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write("# TODO List\n- Ship it DEADLINE: <2024-01-10>\n- [DONE] Old\n")
+
+            self.assertEqual(len(store.list(2024, 1, state="open")), 1)
+            self.assertEqual(len(store.list(2024, 1, state="done")), 1)
+            self.assertEqual(len(store.list(2024, 1, fields=("title",))), 2)
+            info = store.cache_info()
+            self.assertEqual((info.hits, info.misses, info.currsize), (2, 1, 1))
+
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write("# TODO List\n- Ship it\n")
+            self.assertEqual([task.title for task in store.list(2024, 1)], ["Ship it"])
+            self.assertEqual(store.cache_info().misses, 2)
+
+    def test_cached_tasks_are_copied(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for lazy in (False, True):
+                store = FileTaskStore(tmpdir, date_service=FixedDateService(2024, 1), lazy=lazy)
+                path = store.get_month_path(2024, 1)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w", encoding="utf-8") as handle:
+                    handle.write("# TODO List\n- Ship it #p0\n\n# Ship it\nDEADLINE: <2024-01-10>\n")
+
+                task = store.list(2024, 1)[0]
+                task.title = "Changed"
+                task.tags = []
+                task.deadline.append(datetime.date(2030, 1, 1))
+
+                again = store.list(2024, 1)[0]
+                self.assertEqual(again.title, "Ship it")
+                self.assertEqual(again.tags, ("p0",))
+                self.assertEqual(again.deadline, [datetime.date(2024, 1, 10)])
+                self.assertEqual(store.cache_info().hits, 1)
+
+    def test_cache_can_be_disabled(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileTaskStore(tmpdir, date_service=FixedDateService(2024, 1), cache_size=0)
+            path = store.get_month_path(2024, 1)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write("# TODO List\n- Ship it\n")
+            store.list(2024, 1)
+            store.list(2024, 1)
+            info = store.cache_info()
+            self.assertEqual((info.hits, info.misses, info.currsize), (0, 2, 0))
+
+    def test_disk_cache_is_reused_by_new_stores(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir = os.path.join(tmpdir, ".orgplan-cache")
+            store = FileTaskStore(tmpdir, cache_dir=cache_dir)
+            path = store.get_month_path(2024, 1)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write("# TODO List\n- Ship it #p0\n\n# Ship it\nDEADLINE: <2024-01-10>\n")
+            expected = repr(store.list(2024, 1))
+            self.assertEqual(store._disk_cache.misses, 1)
+
+            fresh = FileTaskStore(tmpdir, cache_dir=cache_dir, lazy=True)
+            self.assertEqual(repr(fresh.list(2024, 1)), expected)
+            self.assertEqual((fresh._disk_cache.hits, fresh._disk_cache.misses), (1, 0))
+
+            stat = os.stat(path)
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write("# TODO List\n- Ship it #p1\n\n# Ship it\nDEADLINE: <2024-01-10>\n")
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            fresh = FileTaskStore(tmpdir, cache_dir=cache_dir)
+            self.assertEqual(fresh.list(2024, 1)[0].tags, ("p1",))
+            self.assertEqual(fresh._disk_cache.misses, 1)
+
+    def test_disk_cache_keeps_lazy_tasks_unbuilt(self):
+        from orgplan.markup import LazyTask
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir = os.path.join(tmpdir, "cache")
+            store = FileTaskStore(tmpdir, cache_dir=cache_dir, lazy=True)
+            path = store.get_month_path(2024, 1)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write(
+                    "# TODO List\n- Ship it #p0\n- Plan\n\n# Other\nx\n"
+                    "# Ship it\n\nDEADLINE: <2024-01-10>\n"
+                )
+            with mock.patch.object(LazyTask, "_materialize") as materialize:
+                store.list(2024, 1)
+                materialize.assert_not_called()
+
+            fresh = FileTaskStore(tmpdir, cache_dir=cache_dir, lazy=True)
+            with mock.patch.object(LazyTask, "_materialize") as materialize:
+                tasks = fresh.list(2024, 1)
+                materialize.assert_not_called()
+            self.assertEqual(fresh._disk_cache.hits, 1)
+            self.assertIsInstance(tasks[0], LazyTask)
+            self.assertEqual(tasks[0].notes, "DEADLINE: <2024-01-10>")
+            self.assertEqual(tasks[0].deadline, [datetime.date(2024, 1, 10)])
+            self.assertEqual(tasks[0].tags, ("p0",))
+            self.assertIsNone(tasks[1].notes)
+            self.assertEqual(repr(tasks), repr(FileTaskStore(tmpdir).list(2024, 1)))
+
+    def test_list_range_spans_years_in_month_order(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileTaskStore(tmpdir)
+            for year, month in ((2024, 11), (2025, 1), (2025, 3)):
+                path = store.get_month_path(year, month)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w", encoding="utf-8") as handle:
+                    handle.write(
+                        f"# TODO List\n- Task {year}-{month} a\n- [DONE] Task {year}-{month} b\n"
+                    )
+
+            expected = ["Task 2024-11 a", "Task 2025-1 a"]
+            for workers in (1, 4):
+                tasks = store.list_range((2024, 10), (2025, 2), state="open", workers=workers)
+                self.assertEqual([task.title for task in tasks], expected)
+            self.assertEqual(len(FileTaskStore(tmpdir, max_workers=2).list_range(
+                (2024, 1), (2025, 12))), 6)
+
+    def test_load_all_in_processes_matches_serial(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileTaskStore(tmpdir)
+            for year, month in ((2023, 12), (2024, 2), (2024, 10)):
+                path = store.get_month_path(year, month)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w", encoding="utf-8") as handle:
+                    handle.write(
+                        f"# TODO List\n- Plan {month} #p0 owner:ann\n- [DONE] Old {month}\n"
+                        f"\n# Plan {month} owner:ann\nSCHEDULED: <{year}-{month:02d}-03>\n"
+                    )
+            with open(os.path.join(tmpdir, "2024", "notes.md"), "w", encoding="utf-8") as handle:
+                handle.write("# TODO List\n- Not a month\n")
+
+            serial = FileTaskStore(tmpdir)
+            serial.extensions.add_key("owner")
+            expected = serial.load_all(workers=1)
+            self.assertEqual(list(expected), [(2023, 12), (2024, 2), (2024, 10)])
+
+            parallel = FileTaskStore(tmpdir)
+            parallel.extensions.add_key("owner")
+            with mock.patch.object(tasks_module, "_PROCESS_POOL_MIN_BYTES", 0):
+                loaded = parallel.load_all(workers=2)
+            self.assertEqual(
+                {key: repr(value) for key, value in loaded.items()},
+                {key: repr(value) for key, value in expected.items()},
+            )
+            self.assertEqual(loaded[(2024, 2)][0].extras, {"owner": "ann"})
+
+            open_p0 = [
+                (key, [task.title for task in value])
+                for key, value in parallel.iter_all(state="open", tags=["p0"])
+            ]
+            self.assertEqual(
+                open_p0, [((2023, 12), ["Plan 12"]), ((2024, 2), ["Plan 2"]), ((2024, 10), ["Plan 10"])]
+            )
+            self.assertEqual(parallel.cache_info().hits, 3)
+
+    def test_due_queries_span_months_and_follow_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileTaskStore(tmpdir)
+            jan = store.get_month_path(2025, 1)
+            feb = store.get_month_path(2025, 2)
+            os.makedirs(os.path.dirname(jan), exist_ok=True)
+            with open(jan, "w", encoding="utf-8") as handle:
+                handle.write(
+                    "# TODO List\n- Report DEADLINE: <2025-03-05>\n- [DONE] Filed DEADLINE: <2025-01-20>\n"
+                    "- Prep\n\n# Prep\nSCHEDULED: <2025-02-10>\n"
+                )
+            with open(feb, "w", encoding="utf-8") as handle:
+                handle.write("# TODO List\n- Review DEADLINE: <2025-02-14>\n")
+
+            titles = lambda tasks: [task.title.split(" DEADLINE")[0] for task in tasks]
+            self.assertEqual(
+                titles(store.due_between(datetime.date(2025, 2, 1), datetime.date(2025, 3, 31))),
+                ["Prep", "Review", "Report"],
+            )
+            self.assertEqual(
+                titles(store.due_between(datetime.date(2025, 2, 1), kinds=("deadline",))),
+                ["Review", "Report"],
+            )
+            self.assertEqual(titles(store.next_due(2, after=datetime.date(2025, 1, 1))),
+                             ["Prep", "Review"])
+            self.assertEqual(titles(store.next_due(1, after=datetime.date(2025, 1, 1), state=None)),
+                             ["Filed"])
+
+            with open(feb, "w", encoding="utf-8") as handle:
+                handle.write("# TODO List\n- Review later DEADLINE: <2025-04-01>\n")
+            self.assertEqual(titles(store.next_due(5, after=datetime.date(2025, 3, 1))),
+                             ["Report", "Review later"])
+            os.remove(jan)
+            self.assertEqual(titles(store.due_between()), ["Review later"])
+
+    def test_query_uses_indexes_and_streams_results(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileTaskStore(tmpdir, cache_dir=os.path.join(tmpdir, "cache"))
+            months = {
+                (2024, 11): "- #p0 Audit logs\n- [DONE] #p1 Rotate keys DEADLINE: <2024-11-20>\n",
+                (2024, 12): "- #p0 #blocked Migrate DB\n- Write report\n\n# Write report\n"
+                            "Summarize the audit.\nDEADLINE: <2025-01-05>\n",
+                (2025, 1): "- #p1 Audit access DEADLINE: <2025-01-03>\n",
+            }
+            for (year, month), body in months.items():
+                path = store.get_month_path(year, month)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w", encoding="utf-8") as handle:
+                    handle.write("# TODO List\n" + body)
+
+            titles = lambda query: [task.title.split(" DEADLINE")[0] for task in store.query(query)]
+            self.assertEqual(titles(Query(tags=["p0"])), ["Audit logs", "Migrate DB"])
+            self.assertEqual(titles(Query(text="audit")),
+                             ["Audit logs", "Write report", "Audit access"])
+            self.assertEqual(titles(Query(text="audit", any_tags=["p1", "blocked"])),
+                             ["Audit access"])
+            self.assertEqual(
+                titles(Query(due_from=datetime.date(2025, 1, 1), sort="due")),
+                ["Audit access", "Write report"],
+            )
+            self.assertEqual(titles(Query(states="done", months=((2024, 11), (2024, 12)))),
+                             ["Rotate keys"])
+            self.assertEqual(titles(Query(months=((2024, 12), (2025, 1)), limit=2)),
+                             ["Migrate DB", "Write report"])
+
+            results = store.query(Query(tags=["p0"], fields=("title",)))
+            first = next(results)
+            first.title = "changed"
+            self.assertEqual(next(results).title, "Migrate DB")
+            self.assertEqual(titles(Query(tags=["p0"]))[0], "Audit logs")
+
+    def test_search_ranks_matches_and_reindexes_changed_files(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir = os.path.join(tmpdir, "cache")
+            store = FileTaskStore(tmpdir, cache_dir=cache_dir)
+            jan = store.get_month_path(2024, 1)
+            jun = store.get_month_path(2024, 6)
+            os.makedirs(os.path.dirname(jan), exist_ok=True)
+            with open(jan, "w", encoding="utf-8") as handle:
+                handle.write(
+                    "# TODO List\n- Renew passport\n- [DONE] Book flights\n\n"
+                    "# Book flights\nNeed the passport number.\n"
+                )
+            with open(jun, "w", encoding="utf-8") as handle:
+                handle.write(
+                    "# TODO List\n- Passport photos\n- Water plants\n\n"
+                    "# Passport photos\nDEADLINE: <2024-06-20>\n"
+                )
+
+            titles = lambda tasks: [task.title for task in tasks]
+            self.assertEqual(
+                titles(store.search("passport")),
+                ["Passport photos", "Renew passport", "Book flights"],
+            )
+            self.assertEqual(titles(store.search("Passport NUMBER")), ["Book flights"])
+            self.assertEqual(titles(store.search("passport", state="done")), ["Book flights"])
+            self.assertEqual(titles(store.search("passport", since=(2024, 3))), ["Passport photos"])
+            self.assertEqual(titles(store.search("passport", limit=1)), ["Passport photos"])
+            self.assertTrue(os.path.exists(os.path.join(cache_dir, "search.index")))
+
+            with open(jun, "w", encoding="utf-8") as handle:
+                handle.write("# TODO List\n- Water the plants\n")
+            reopened = FileTaskStore(tmpdir, cache_dir=cache_dir)
+            self.assertEqual(
+                titles(reopened.search("passport")), ["Renew passport", "Book flights"]
+            )
+            self.assertEqual(titles(reopened.search("plants")), ["Water the plants"])
+            os.remove(jan)
+            self.assertEqual(reopened.search("passport"), [])
+
+    def test_search_index_stays_in_memory_without_cache_dir(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileTaskStore(tmpdir)
+            path = store.get_month_path(2024, 1)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write("# TODO List\n- Renew passport\n")
+            self.assertEqual([task.title for task in store.search("passport")], ["Renew passport"])
+            self.assertEqual(store.search("passport", since=(2024, 1)), [])
+            self.assertFalse(os.path.exists(os.path.join(tmpdir, ".orgplan-cache")))
+
+    def test_refresh_month_waits_for_index_readers(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileTaskStore(tmpdir)
+            for month in (5, 6, 7):
+                path = store.get_month_path(2024, month)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w", encoding="utf-8") as handle:
+                    handle.write(f"# TODO List\n- Task DEADLINE: <2024-{month:02d}-10>\n")
+            jun = store.get_month_path(2024, 6)
+            # A watcher thread handles the removal of June while the query
+            # below walks the due-date index.
+            refresher = threading.Thread(target=store.refresh_month, args=(2024, 6))
+            real_bisect_left = bisect.bisect_left
+
+            def bisect_left(*args):
+                if not refresher.ident:
+                    os.remove(jun)
+                    refresher.start()
+                    refresher.join(0.2)
+                return real_bisect_left(*args)
+
+            with mock.patch("bisect.bisect_left", side_effect=bisect_left):
+                tasks = list(store.query(Query(due_from=datetime.date(2024, 1, 1))))
+            refresher.join()
+            self.assertEqual(len(tasks), 2)
+            self.assertEqual(store._due_index.sources(), [
+                store.get_month_path(2024, 5), store.get_month_path(2024, 7),
+            ])
+
+    def test_refresh_month_reparses_only_edited_lines(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileTaskStore(tmpdir)
+            path = store.get_month_path(2024, 5)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            text = "# TODO List\n- Renew passport\n- Book flights\n\n# Book flights\nWindow seat.\n"
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write(text)
+            self.assertEqual(store.refresh_month(2024, 5), 2)
+
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write(text.replace("- Renew", "- Visa #p0\n- Renew"))
+            with mock.patch.object(store, "_parser", side_effect=AssertionError):
+                self.assertEqual(store.refresh_month(2024, 5), 3)
+            self.assertEqual(store._incremental[path].last_mode, "incremental")
+            tasks = store.list(2024, 5)
+            self.assertEqual([task.line_number for task in tasks], [2, 3, 4])
+            self.assertEqual(tasks[2].notes, "Window seat.")
+            self.assertEqual([task.title for task in store.list(2024, 5, tags=["p0"])], ["Visa"])
+
+            os.remove(path)
+            self.assertEqual(store.refresh_month(2024, 5), 0)
+            self.assertNotIn(path, store._incremental)
+
+    def test_update_many_patches_task_lines_in_one_write(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileTaskStore(tmpdir)
+            path = store.get_month_path(2024, 1)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            original = (
+                "# TODO List\r\n- #p1 Renew passport <2024-01-20>\r\n"
+                "- [PENDING] Book   flights\r\n- Pack #blocked\r\n\r\n"
+                "# Pack\r\nAdapters.\r\n"
+            )
+            with open(path, "wb") as handle:
+                handle.write(original.encode("utf-8"))
+            os.chmod(path, 0o640)
+            fingerprint = store.month_fingerprint(2024, 1)
+            renew, flights, pack = store.list(2024, 1)
+
+            with mock.patch.object(
+                tasks_module, "write_atomic", wraps=tasks_module.write_atomic
+            ) as write:
+                changed = store.update_many(2024, 1, [
+                    (renew, "done", ["blocked"], None),
+                    (flights, "open", None, None),
+                    (pack, None, None, ["blocked"]),
+                    (pack, "canceled", ["p0"], None),
+                ], fingerprint=fingerprint)
+            self.assertEqual(changed, 3)
+            self.assertEqual(write.call_count, 1)
+            with open(path, "rb") as handle:
+                self.assertEqual(handle.read().decode("utf-8"), (
+                    "# TODO List\r\n- [DONE] #p1 #blocked Renew passport <2024-01-20>\r\n"
+                    "- Book   flights\r\n- [CANCELED] #p0 Pack\r\n\r\n"
+                    "# Pack\r\nAdapters.\r\n"
+                ))
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o640)
+            tasks = store.list(2024, 1)
+            self.assertEqual([task.state for task in tasks], ["done", "open", "canceled"])
+            self.assertEqual([task.tags for task in tasks], [("p1", "blocked"), (), ("p0",)])
+            self.assertEqual(tasks[2].notes, "Adapters.")
+            self.assertEqual(store.update_many(2024, 1, [(tasks[1], "open", None, None)]), 0)
+
+    def test_update_many_rejects_stale_tasks(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileTaskStore(tmpdir)
+            path = store.get_month_path(2024, 1)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write("# TODO List\n- Renew passport\n- Book flights\n")
+            renew, flights = store.list(2024, 1)
+
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write("# TODO List\n- Visa\n- Renew passport\n- Book flights\n")
+            with self.assertRaises(StaleFileError):
+                store.update_many(2024, 1, [(renew, "done", None, None)])
+
+            renew, flights = store.list(2024, 1)[1:]
+            real_write = tasks_module.write_atomic
+
+            def write_after_edit(*args, **kwargs):
+                with open(path, "a", encoding="utf-8") as handle:
+                    handle.write("- Added meanwhile\n")
+                return real_write(*args, **kwargs)
+
+            with mock.patch.object(tasks_module, "write_atomic", side_effect=write_after_edit):
+                with self.assertRaises(StaleFileError):
+                    store.update_many(2024, 1, [(flights, "done", None, None)])
+            self.assertEqual(
+                [task.title for task in store.list(2024, 1)],
+                ["Visa", "Renew passport", "Book flights", "Added meanwhile"],
+            )
+            self.assertEqual(os.listdir(os.path.dirname(path)), ["01-notes.md"])
+
+    def test_update_many_detects_same_size_rewrites(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileTaskStore(tmpdir)
+            path = store.get_month_path(2024, 1)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write("# TODO List\n- Renew passport\n- Book flights\n")
+
+            def rewrite_keeping_stat(text):
+                stat = os.stat(path)
+                with open(path, "w", encoding="utf-8") as handle:
+                    handle.write(text)
+                os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+            fingerprint = store.month_fingerprint(2024, 1)
+            renew, _ = store.list(2024, 1)
+            rewrite_keeping_stat("# TODO List\n- Renew passport\n- Cook flights\n")
+            with self.assertRaises(StaleFileError):
+                store.update_many(2024, 1, [(renew, "done", None, None)], fingerprint=fingerprint)
+
+            real_write = tasks_module.write_atomic
+
+            def write_after_rewrite(*args, **kwargs):
+                rewrite_keeping_stat("# TODO List\n- Renew passport\n- Book flights\n")
+                return real_write(*args, **kwargs)
+
+            with mock.patch.object(tasks_module, "write_atomic", side_effect=write_after_rewrite):
+                with self.assertRaises(StaleFileError):
+                    store.update_many(2024, 1, [(renew, "done", None, None)])
+            with open(path, encoding="utf-8") as handle:
+                self.assertEqual(handle.read(), "# TODO List\n- Renew passport\n- Book flights\n")
 
 if __name__ == "__main__":
     unittest.main()
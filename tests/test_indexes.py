@@ -0,0 +1,60 @@
+import datetime
+import unittest
+
+from orgplan.indexes import DueIndex, TagIndex, date_key
+from orgplan.tasks import Task
+
+
+class DueIndexTests(unittest.TestCase):
+    def test_range_lookup_across_groups(self):
+        index = DueIndex()
+        a = Task("a", deadline=[datetime.date(2025, 1, 10)])
+        b = Task("b", scheduled=[datetime.datetime(2025, 1, 12, 9, 0)])
+        c = Task("c", deadline=[datetime.date(2025, 2, 1)], scheduled=[datetime.date(2024, 12, 30)])
+        index.replace("2025/01", [a, b], fingerprint=1)
+        index.replace("2024/12", [c], fingerprint=2)
+
+        found = index.between(datetime.date(2025, 1, 1), datetime.date(2025, 1, 12))
+        self.assertEqual([(task.title, kind) for _, kind, task in found],
+                         [("a", "deadline"), ("b", "scheduled")])
+        self.assertEqual([task.title for _, _, task in index.iter_from(datetime.date(2025, 1, 11))],
+                         ["b", "c"])
+        self.assertEqual(len(index), 4)
+        self.assertEqual(index.fingerprint("2024/12"), 2)
+
+        index.replace("2025/01", [], fingerprint=3)
+        self.assertEqual([task.title for _, _, task in index.between()], ["c", "c"])
+        index.discard("2024/12")
+        self.assertEqual(index.between(), [])
+
+    def test_date_key_orders_datetimes_within_day(self):
+        day = datetime.date(2025, 1, 1)
+        self.assertLess(date_key(day), date_key(datetime.datetime(2025, 1, 1, 0, 1)))
+        self.assertLess(date_key(datetime.datetime(2025, 1, 1, 23, 59)),
+                        date_key(datetime.date(2025, 1, 2)))
+
+
+class TagIndexTests(unittest.TestCase):
+    def test_intersection_and_union_per_source(self):
+        index = TagIndex()
+        index.replace("jan", [
+            Task("a", tags=["p0", "blocked"]),
+            Task("b", tags=["p0"]),
+            Task("c", tags=["p1", "errands"]),
+            Task("d"),
+        ], fingerprint=1)
+
+        self.assertEqual(index.match("jan", tags=["p0", "blocked"]), [0])
+        self.assertEqual(index.match("jan", any_tags=["blocked", "errands"]), [0, 2])
+        self.assertEqual(index.match("jan", tags=["p0"], any_tags=["blocked", "p1"]), [0])
+        self.assertEqual(index.match("jan", tags=["p2"]), [])
+        self.assertEqual(index.match("jan"), [0, 1, 2, 3])
+        self.assertEqual(index.match("feb", tags=["p0"]), [])
+        self.assertEqual(index.fingerprint("jan"), 1)
+
+        index.discard("jan")
+        self.assertEqual(index.sources(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
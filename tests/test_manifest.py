@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from orgplan import manifest as manifest_module
+from orgplan.manifest import Manifest
+
+
+def _touch(path, text="x"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(text)
+
+
+def _age(path):
+    # Move the mtime out of the racy window so the manifest trusts it.
+    os.utime(path, ns=(10**18, 10**18))
+
+
+class ManifestTests(unittest.TestCase):
+    def test_discovers_notes_and_meta_files(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            _touch(os.path.join(tmpdir, "2024", "01-notes.md"), "abc")
+            _touch(os.path.join(tmpdir, "2024", "01-meta.md"))
+            _touch(os.path.join(tmpdir, "2024", "02-meta.md"))
+            _touch(os.path.join(tmpdir, "2023", "12-notes.md"))
+            _touch(os.path.join(tmpdir, "2023", "13-notes.md"))
+            _touch(os.path.join(tmpdir, "2023", "readme.md"))
+            _touch(os.path.join(tmpdir, "misc", "01-notes.md"))
+
+            manifest = Manifest(tmpdir)
+            manifest.refresh()
+            self.assertEqual(manifest.months(), [(2023, 12), (2024, 1)])
+            files = manifest.files(2024, 1)
+            self.assertEqual(files.notes[1], 3)
+            self.assertIsNotNone(files.meta)
+            self.assertEqual(manifest.files(2024, 2).notes, None)
+            self.assertIsNone(manifest.files(2022, 1))
+
+    def test_rescans_only_changed_directories(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for year in ("2023", "2024"):
+                _touch(os.path.join(tmpdir, year, "01-notes.md"))
+                _age(os.path.join(tmpdir, year))
+            _age(tmpdir)
+
+            manifest = Manifest(tmpdir)
+            manifest.refresh()
+            with mock.patch.object(
+                manifest_module, "_scan_month_files", wraps=manifest_module._scan_month_files
+            ) as scan:
+                manifest.refresh()
+                self.assertEqual(scan.call_count, 0)
+
+                _touch(os.path.join(tmpdir, "2024", "05-notes.md"))
+                manifest.refresh()
+                self.assertEqual(scan.call_count, 1)
+                self.assertEqual(manifest.months(), [(2023, 1), (2024, 1), (2024, 5)])
+
+            _touch(os.path.join(tmpdir, "2025", "03-notes.md"))
+            os.remove(os.path.join(tmpdir, "2023", "01-notes.md"))
+            manifest.refresh()
+            self.assertEqual(manifest.months(), [(2024, 1), (2024, 5), (2025, 3)])
+            self.assertIsNone(manifest.files(2025, 3).meta)
+
+    def test_missing_data_root(self):
+        manifest = Manifest(os.path.join(tempfile.gettempdir(), "orgplan-missing-root"))
+        manifest.refresh()
+        self.assertEqual(manifest.months(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,20 @@
+import copy
 import datetime
+import io
 import unittest
 
-from orgplan.markup import parse_month_notes, parse_todo_list
+from orgplan.markup import (
+    IncrementalMonthParser,
+    LazyTask,
+    ParserExtensions,
+    iter_month_notes,
+    parse_month_buffer,
+    parse_month_notes,
+    parse_todo_list,
+    patch_task_line,
+)
+from orgplan.tags import tag_bit
+from orgplan.tasks import task_to_record
 
 
 class MarkupTests(unittest.TestCase):
@@ -11,14 +24,14 @@ class MarkupTests(unittest.TestCase):
         self.assertEqual(len(tasks), 1)
         self.assertEqual(tasks[0].title, "Learn LLMs")
         self.assertEqual(tasks[0].state, "done")
-        self.assertEqual(tasks[0].tags, ["p1", "4h"])
+        self.assertEqual(tasks[0].tags, ("p1", "4h"))
 
     def test_parses_todo_list_no_space_header(self):
         text = """#TODO List\n- #blocked #monthly Fix backlog\n"""
         tasks = parse_todo_list(text)
         self.assertEqual(len(tasks), 1)
         self.assertEqual(tasks[0].title, "Fix backlog")
-        self.assertEqual(tasks[0].tags, ["blocked", "monthly"])
+        self.assertEqual(tasks[0].tags, ("blocked", "monthly"))
 
     def test_ignores_unknown_status(self):
         text = """# TODO List\n- [SOMEDAY] #p2 Someday task\n"""
@@ -52,6 +65,138 @@ class MarkupTests(unittest.TestCase):
         self.assertEqual(len(tasks), 1)
         self.assertEqual(tasks[0].notes, "Notes line 1")
 
+    def test_notes_with_windows_line_endings(self):
+        text = "# TODO List\r\n- Ship it\r\n\r\n# Ship it\r\nNotes line 1\r\nNotes line 2\r\n"
+        tasks = parse_month_notes(text)
+        self.assertEqual(len(tasks), 1)
+        self.assertEqual(tasks[0].line_number, 2)
+        self.assertEqual(tasks[0].notes, "Notes line 1\nNotes line 2")
+
+    def test_notes_section_before_todo_list(self):
+        text = """# Ship it\nEarly notes\n\n# TODO List\n- Ship it\n"""
+        tasks = parse_month_notes(text)
+        self.assertEqual(len(tasks), 1)
+        self.assertEqual(tasks[0].line_number, 5)
+        self.assertEqual(tasks[0].notes, "Early notes")
+
+    def test_notes_keep_indentation_and_inner_blank_lines(self):
+        text = """# TODO List\n- Ship it\n# Ship it\n   \n  indented\n\n## Sub\n- item  \n\n"""
+        tasks = parse_month_notes(text)
+        self.assertEqual(tasks[0].notes, "  indented\n\n## Sub\n- item  ")
+
+    def test_task_without_notes_section_has_no_notes(self):
+        text = """# TODO List\n- Ship it\n- Other\n\n# Other\nNotes\n"""
+        tasks = parse_month_notes(text)
+        self.assertIsNone(tasks[0].notes)
+        self.assertEqual(tasks[1].notes, "Notes")
+
+
+class StreamingParserTests(unittest.TestCase):
+    def test_matches_parse_month_notes(self):
+        text = (
+            "# TODO List\n- [DONE] #p1 Ship it\n- Other DEADLINE: <2025-06-15>\n\n"
+            "# Ship it\n\nNotes line 1\nSCHEDULED: <2025-06-10>\n\n# Unrelated\nSkip me\n"
+        )
+        streamed = list(iter_month_notes(io.StringIO(text)))
+        parsed = parse_month_notes(text)
+        self.assertEqual(
+            [(t.title, t.state, t.tags, t.notes, t.line_number, t.scheduled) for t in streamed],
+            [(t.title, t.state, t.tags, t.notes, t.line_number, t.scheduled) for t in parsed],
+        )
+
+    def test_stops_after_todo_list_without_notes(self):
+        consumed = []
+
+        def lines():
+            for line in ["# TODO List\n", "- One\n", "- Two\n", "# One\n", "Notes\n"]:
+                consumed.append(line)
+                yield line
+
+        tasks = list(iter_month_notes(lines(), notes=False))
+        self.assertEqual([task.title for task in tasks], ["One", "Two"])
+        self.assertIsNone(tasks[0].notes)
+        self.assertEqual(len(consumed), 4)
+
+    def test_yields_tasks_before_reading_further_without_notes(self):
+        stream = iter_month_notes(io.StringIO("# TODO List\n- One\n- Two\n"), notes=False)
+        self.assertEqual(next(stream).title, "One")
+
+
+class BufferParserTests(unittest.TestCase):
+    def _fields(self, tasks):
+        return [(t.title, t.state, t.tags, t.notes, t.line_number, t.deadline) for t in tasks]
+
+    def test_matches_text_parser(self):
+        text = "# TODO List\n- [DONE] #p1 Ship it\n- Über DEADLINE: <2025-06-15>\n\n# Über\n\nÄ notes\n"
+        self.assertEqual(
+            self._fields(parse_month_buffer(text.encode("utf-8"))),
+            self._fields(parse_month_notes(text)),
+        )
+
+    def test_lone_carriage_returns_are_line_breaks(self):
+        data = b"# TODO List\r- Ship it\r\r# Ship it\rNotes\r"
+        tasks = parse_month_buffer(data)
+        self.assertEqual(tasks[0].line_number, 2)
+        self.assertEqual(tasks[0].notes, "Notes")
+
+    def test_projection_skips_notes(self):
+        data = b"# TODO List\n- Ship it\n# Ship it\nNotes\n"
+        tasks = parse_month_buffer(data, fields=("title", "state"))
+        self.assertIsNone(tasks[0].notes)
+
+    def test_projection_checks_line_breaks_only_in_the_todo_list(self):
+        searched = []
+
+        class Buffer(bytes):
+            def find(self, sub, start=0, end=None):
+                searched.append(len(self) if end is None else end)
+                return bytes.find(self, sub, start, len(self) if end is None else end)
+
+        head = b"# TODO List\n- Ship it\n- Plan\n"
+        data = Buffer(head + b"# Ship it\nNotes\x0cmore\r\n" * 1000)
+        tasks = parse_month_buffer(data, fields=("title",))
+        self.assertEqual([task.title for task in tasks], ["Ship it", "Plan"])
+        self.assertTrue(searched)
+        self.assertLessEqual(max(searched), len(head))
+
+        text = "# TODO List\n- Ship it\x0c- Plan\n# Ship it\nNotes\n"
+        self.assertEqual(
+            self._fields(parse_month_buffer(text.encode("utf-8"), fields=("title",))),
+            self._fields(parse_month_notes(text, fields=("title",))),
+        )
+
+
+class LazyTaskTests(unittest.TestCase):
+    TEXT = (
+        "# TODO List\n- [DONE] #p1 Ship it\n- Plan DEADLINE: <2025-06-20>\n- Bare\n\n"
+        "# Ship it\n\nNotes line 1\nSCHEDULED: <2025-06-10>\n\n# Plan\nDEADLINE: <2025-07-01>\n"
+    )
+
+    def _fields(self, task):
+        return (
+            task.title, task.state, task.tags, task.line_number, task.notes,
+            task.deadline, task.scheduled, task.timestamp, task.due_date,
+        )
+
+    def test_lazy_tasks_match_eager_tasks(self):
+        lazy = parse_month_notes(self.TEXT, lazy=True)
+        eager = parse_month_notes(self.TEXT)
+        self.assertTrue(all(isinstance(task, LazyTask) for task in lazy))
+        self.assertEqual([self._fields(t) for t in lazy], [self._fields(t) for t in eager])
+
+    def test_assigned_fields_survive_materialization(self):
+        task = parse_month_notes(self.TEXT, lazy=True)[0]
+        task.notes = "Replaced"
+        self.assertEqual(task.scheduled, [datetime.date(2025, 6, 10)])
+        self.assertEqual(task.notes, "Replaced")
+
+    def test_copy_and_unknown_attributes(self):
+        task = parse_month_notes(self.TEXT, lazy=True)[1]
+        clone = copy.copy(task)
+        self.assertEqual(clone.deadline, [datetime.date(2025, 6, 20)])
+        with self.assertRaises(AttributeError):
+            task.missing
+
 
 class TimestampParsingTests(unittest.TestCase):
     def test_parses_deadline_from_task_line(self):
@@ -146,7 +291,7 @@ class TimestampParsingTests(unittest.TestCase):
         self.assertEqual(len(tasks), 1)
         self.assertEqual(tasks[0].title, "Ship it DEADLINE: <2025-06-15>")
         self.assertEqual(tasks[0].state, "done")
-        self.assertEqual(tasks[0].tags, ["p1"])
+        self.assertEqual(tasks[0].tags, ("p1",))
         self.assertEqual(tasks[0].deadline[0], datetime.date(2025, 6, 15))
 
     def test_plain_timestamp_not_confused_with_deadline(self):
@@ -177,6 +322,171 @@ class TimestampParsingTests(unittest.TestCase):
         self.assertEqual(len(tasks[0].timestamp), 1)
         self.assertEqual(tasks[0].timestamp[0], datetime.date(2025, 6, 20))
 
+    def test_invalid_dates_are_skipped(self):
+        text = "# TODO List\n- Task DEADLINE: <2025-02-30> <2025-13-01> <2025-02-28 25:00>\n"
+        tasks = parse_todo_list(text)
+        self.assertEqual(tasks[0].deadline, [])
+        self.assertEqual(tasks[0].timestamp, [])
+
+    def test_prefix_allows_no_space_and_line_breaks(self):
+        text = "# TODO List\n- Ship it\n\n# Ship it\nDEADLINE:<2025-06-15> SCHEDULED:\n  <2025-06-10>\n"
+        tasks = parse_month_notes(text)
+        self.assertEqual(tasks[0].deadline, [datetime.date(2025, 6, 15)])
+        self.assertEqual(tasks[0].scheduled, [datetime.date(2025, 6, 10)])
+        self.assertEqual(tasks[0].timestamp, [])
+
+    def test_timestamp_after_deadline_timestamp_is_plain(self):
+        text = "# TODO List\n- Task DEADLINE: <2025-06-15> <2025-06-20>\n"
+        tasks = parse_todo_list(text)
+        self.assertEqual(tasks[0].deadline, [datetime.date(2025, 6, 15)])
+        self.assertEqual(tasks[0].timestamp, [datetime.date(2025, 6, 20)])
+
+
+class ParserExtensionsTests(unittest.TestCase):
+    def test_extension_tags_are_taken_out_of_titles(self):
+        extensions = ParserExtensions()
+        extensions.add_tags("gardening")
+        extensions.add_tag_prefix("project-")
+        text = "# TODO List\n- Paint #gardening #project-garden #p1 #other\n"
+        task = parse_todo_list(text, extensions=extensions)[0]
+        self.assertEqual(task.title, "Paint #other")
+        self.assertEqual(task.tags, ("gardening", "project-garden", "p1"))
+        self.assertEqual(task.tag_mask, tag_bit("p1"))
+        self.assertEqual(task.extra_tags, ("gardening", "project-garden"))
+        self.assertEqual(tag_bit("gardening"), 0)
+        with self.assertRaises(ValueError):
+            extensions.add_tags("#gardening")
+
+    def test_key_values_and_line_patterns_fill_extras(self):
+        extensions = ParserExtensions()
+        extensions.add_key("owner")
+        extensions.add_line_pattern("mentions", r"@(\w+)")
+        extensions.add_line_pattern("tickets", r"(?i)\bOPS-\d+")
+        text = (
+            "# TODO List\n- Ship it owner:bob ping @ann and @joe ops-12 owner:\n"
+            "- Plain task\n"
+        )
+        tasks = parse_month_notes(text, extensions=extensions)
+        self.assertEqual(tasks[0].title, "Ship it ping @ann and @joe ops-12 owner:")
+        self.assertEqual(
+            tasks[0].extras,
+            {"owner": "bob", "mentions": ["ann", "joe"], "tickets": ["ops-12"]},
+        )
+        self.assertIsNone(tasks[1].extras)
+
+    def test_all_parsers_apply_extensions(self):
+        extensions = ParserExtensions()
+        extensions.add_key("area")
+        text = "# TODO List\n- Fix roof area:home\n\n# Fix roof area:home\nCall Bob\n"
+        parsed = [
+            parse_month_notes(text, extensions=extensions),
+            parse_month_notes(text, lazy=True, extensions=extensions),
+            list(iter_month_notes(io.StringIO(text), extensions=extensions)),
+            parse_month_buffer(text.encode("utf-8"), extensions=extensions),
+        ]
+        for tasks in parsed:
+            self.assertEqual(tasks[0].title, "Fix roof")
+            self.assertEqual(tasks[0].extras, {"area": "home"})
+            self.assertEqual(tasks[0].notes, "Call Bob")
+
+    def test_rejects_conflicting_registrations(self):
+        extensions = ParserExtensions()
+        extensions.add_key("owner")
+        with self.assertRaises(ValueError):
+            extensions.add_line_pattern("owner", r"x")
+        with self.assertRaises(ValueError):
+            extensions.add_line_pattern("pair", r"(a)(b)")
+        with self.assertRaises(ValueError):
+            extensions.add_key("bad key")
+
+
+    def test_patch_task_line_changes_status_and_tags_only(self):
+        self.assertEqual(
+            patch_task_line("  - #p1 Learn  LLMs <2025-01-02>", state="done", add_tags=["4h"]),
+            "  - [DONE] #p1 #4h Learn  LLMs <2025-01-02>",
+        )
+        self.assertEqual(
+            patch_task_line("- [PENDING] Fix #blocked roof #p0", state="open",
+                            remove_tags=["blocked", "p0"]),
+            "- Fix roof",
+        )
+        extensions = ParserExtensions()
+        extensions.add_tag_prefix("project-")
+        self.assertEqual(
+            patch_task_line("- Ship", add_tags=["project-x"], extensions=extensions),
+            "- #project-x Ship",
+        )
+        with self.assertRaises(ValueError):
+            patch_task_line("- Ship", add_tags=["project-x"])
+        with self.assertRaises(ValueError):
+            patch_task_line("- Ship", state="finished")
+
+
+class IncrementalParserTests(unittest.TestCase):
+    def test_incremental_parser_matches_full_parse_after_edits(self):
+        extensions = ParserExtensions()
+        extensions.add_key("owner")
+        lines = [
+            "# TODO List",
+            "- [DONE] Ship #work <2025-01-03>",
+            "- Write docs owner:ann",
+            "- Plan",
+            "# Ship",
+            "body <2025-01-05>",
+            "# Plan",
+            "plan notes",
+            "# Ship",
+            "second ship DEADLINE: <2025-02-01>",
+        ]
+        edits = [
+            lambda lines: lines.__setitem__(5, "body changed"),
+            lambda lines: lines.insert(2, "- Ship #home"),
+            lambda lines: lines.insert(1, "  not a task"),
+            lambda lines: lines.__delitem__(3),
+            lambda lines: lines.__setitem__(0, "# Backlog"),
+            lambda lines: lines.__setitem__(0, "# TODO List"),
+            lambda lines: lines.append("more plan <2025-03-01>"),
+        ]
+        parser = IncrementalMonthParser(extensions)
+        parser.parse("\n".join(lines))
+        for edit in edits:
+            edit(lines)
+            text = "\n".join(lines) + "\n"
+            self.assertEqual(
+                [task_to_record(task) for task in parser.parse(text)],
+                [task_to_record(task) for task in parse_month_notes(text, extensions=extensions)],
+            )
+
+    def test_incremental_parser_reuses_unchanged_tasks(self):
+        text = (
+            "# TODO List\n- Renew passport\n- Book flights\n- Pack\n\n"
+            "# Book flights\nWindow seat.\n# Pack\nAdapters.\n"
+        )
+        parser = IncrementalMonthParser()
+        renew, flights, pack = parser.parse(text)
+        self.assertEqual(parser.last_mode, "full")
+
+        text = text.replace("Window seat.", "Aisle seat.\n<2025-05-02>")
+        tasks = parser.parse(text)
+        self.assertEqual(parser.last_mode, "incremental")
+        self.assertIs(tasks[0], renew)
+        self.assertIsNot(tasks[1], flights)
+        self.assertIs(tasks[2], pack)
+        self.assertEqual(tasks[1].notes, "Aisle seat.\n<2025-05-02>")
+        self.assertEqual(tasks[1].timestamp, [datetime.date(2025, 5, 2)])
+
+        text = text.replace("- Renew", "- Visa\n- Renew")
+        tasks = parser.parse(text)
+        self.assertEqual(parser.last_mode, "incremental")
+        self.assertEqual(
+            [task.title for task in tasks], ["Visa", "Renew passport", "Book flights", "Pack"]
+        )
+        self.assertIs(tasks[3], pack)
+        self.assertEqual([task.line_number for task in tasks], [2, 3, 4, 5])
+
+        parser.parse(text.replace("# Pack", "# Packing"))
+        self.assertEqual(parser.last_mode, "full")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,55 @@
+import datetime
+import unittest
+
+from orgplan.query import Query
+from orgplan.tasks import Task
+
+
+class QueryTests(unittest.TestCase):
+    def test_matches_every_condition(self):
+        task = Task(
+            "Fix the Build",
+            state="open",
+            tags=["p0", "blocked"],
+            notes="CI fails on main",
+            deadline=[datetime.datetime(2025, 3, 4, 17, 30)],
+        )
+        self.assertTrue(Query().matches(task))
+        self.assertTrue(Query(states="open", tags=["p0"], any_tags=["p1", "blocked"]).matches(task))
+        self.assertFalse(Query(states=["done", "canceled"]).matches(task))
+        self.assertFalse(Query(tags=["p0", "p1"]).matches(task))
+        self.assertTrue(Query(due_from=datetime.date(2025, 3, 4),
+                              due_to=datetime.date(2025, 3, 4)).matches(task))
+        self.assertFalse(Query(due_to=datetime.datetime(2025, 3, 4, 9, 0)).matches(task))
+        self.assertFalse(Query(due_from=datetime.date(2025, 1, 1)).matches(Task("undated")))
+        self.assertTrue(Query(text="build ci").matches(task))
+        self.assertFalse(Query(text="build deploy").matches(task))
+
+    def test_sort_and_limit(self):
+        tasks = [
+            Task("b", due_date=datetime.date(2025, 1, 3)),
+            Task("a"),
+            Task("c", due_date=datetime.date(2025, 1, 1)),
+            Task("d", state="done", due_date=datetime.date(2025, 1, 3)),
+        ]
+        titles = lambda query: [task.title for task in query.finish(iter(tasks))]
+        self.assertEqual(titles(Query()), ["b", "a", "c", "d"])
+        self.assertEqual(titles(Query(sort="due")), ["c", "b", "d", "a"])
+        self.assertEqual(titles(Query(sort="-due")), ["b", "d", "c", "a"])
+        self.assertEqual(titles(Query(sort=("state", "-title"))), ["d", "c", "b", "a"])
+        self.assertEqual(titles(Query(sort="title", limit=2)), ["a", "b"])
+        self.assertEqual(titles(Query(limit=0)), [])
+        with self.assertRaises(ValueError):
+            Query(sort="owner")
+
+    def test_load_fields_adds_what_conditions_read(self):
+        self.assertIsNone(Query(text="x").load_fields())
+        self.assertEqual(Query(fields=("title",)).load_fields(), ("state", "tags", "title"))
+        self.assertEqual(
+            Query(fields=("title",), text="x", due_to=datetime.date(2025, 1, 1)).load_fields(),
+            ("due_date", "notes", "state", "tags", "title"),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@ import datetime
 import importlib
 import io
 import os
+import subprocess
 import sys
 import tempfile
 import unittest
@@ -30,6 +31,18 @@ class ReferencePluginTests(unittest.TestCase):
         sys.modules.pop("orgplan_plugin", None)
         return importlib.import_module("orgplan_plugin"), plugin_dir
 
+    def test_import_does_not_load_the_table_module(self):
+        _, plugin_dir = self._load_plugin()
+        code = (
+            "import sys, orgplan_plugin; "
+            "print(sorted({'numpy', 'orgplan.table'} & set(sys.modules)))"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=plugin_dir, capture_output=True, text=True,
+            check=True, env=dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(plugin_dir))),
+        ).stdout
+        self.assertEqual(output.strip(), "[]")
+
     def _build_registry(self, tasks, data_root=None):
         api = OrgplanAPI(
             task_store=InMemoryTaskStore(tasks),
@@ -45,6 +58,7 @@ class ReferencePluginTests(unittest.TestCase):
         commands = registry.list_commands()
         expected = [
             "healthcheck",
+            "search",
             "tasks-canceled",
             "tasks-count",
             "tasks-done",
@@ -95,6 +109,23 @@ class ReferencePluginTests(unittest.TestCase):
         self.assertIn("done: 1", output)
         self.assertIn("open: 1", output)
 
+    def test_year_without_month_means_current_month(self):
+        tasks = [
+            Task("alpha", state="open", due_date=datetime.date(2024, 1, 2)),
+            Task("beta", state="open", due_date=datetime.date(2024, 3, 3)),
+        ]
+        plugin, _ = self._load_plugin()
+        registry = self._build_registry(tasks)
+        plugin.register(registry)
+
+        for name in ("tasks-open", "tasks-count"):
+            buffer = io.StringIO()
+            with redirect_stdout(buffer):
+                exit_code = registry.get_command(name)(["--year", "2024"])
+            self.assertEqual(exit_code, 0)
+            self.assertNotIn("beta", buffer.getvalue())
+        self.assertIn("open: 1", buffer.getvalue())
+
     def test_healthcheck_command(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             plugin, _ = self._load_plugin()
@@ -325,6 +356,38 @@ class ReferencePluginTests(unittest.TestCase):
         self.assertEqual(exit_code, 0)
         self.assertIn("No P0/P1 tasks found", output)
 
+    def test_search_command(self):
+        tasks = [
+            Task("Renew passport", state="open", due_date=datetime.date(2024, 1, 2)),
+            Task("Book flights", state="done", notes="passport number needed"),
+            Task("Water plants", state="open"),
+        ]
+        plugin, _ = self._load_plugin()
+        registry = self._build_registry(tasks)
+        plugin.register(registry)
+
+        command = registry.get_command("search")
+        buffer = io.StringIO()
+        with redirect_stdout(buffer):
+            exit_code = command(["passport"])
+
+        output = buffer.getvalue()
+        self.assertEqual(exit_code, 0)
+        self.assertIn("Tasks matching 'passport' (2)", output)
+        self.assertIn("- Renew passport (2024-01-02)", output)
+        self.assertIn("- [DONE] Book flights (no-date)", output)
+        self.assertNotIn("Water plants", output)
+
+        buffer = io.StringIO()
+        with redirect_stdout(buffer):
+            command(["passport", "--state", "open", "--limit", "5"])
+        self.assertNotIn("Book flights", buffer.getvalue())
+
+        buffer = io.StringIO()
+        with redirect_stdout(buffer):
+            command(["visa"])
+        self.assertIn("No tasks matching 'visa'.", buffer.getvalue())
+
     def test_all_commands_registered(self):
         plugin, _ = self._load_plugin()
         registry = self._build_registry([])
@@ -332,6 +395,7 @@ class ReferencePluginTests(unittest.TestCase):
         commands = registry.list_commands()
         expected = [
             "healthcheck",
+            "search",
             "tasks-canceled",
             "tasks-count",
             "tasks-done",
@@ -0,0 +1,51 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+from orgplan.search import SearchIndex, tokenize
+from orgplan.tasks import Task
+
+
+class SearchIndexTests(unittest.TestCase):
+    def test_tokenize_lowercases_words(self):
+        self.assertEqual(tokenize("Fix the API-v2 bug!"), ["fix", "the", "api", "v2", "bug"])
+
+    def test_requires_every_word_and_ranks_by_frequency_and_recency(self):
+        index = SearchIndex()
+        index.replace("old", [
+            Task("Budget review", notes="budget budget budget"),
+            Task("Budget", notes="draft", due_date=datetime.date(2024, 1, 31)),
+        ], month_key=120)
+        index.replace("new", [
+            Task("Review budget", state="done", due_date=datetime.date(2024, 3, 1)),
+        ], month_key=124)
+
+        hits = index.search("budget review")
+        self.assertEqual([(source, position) for source, position, _ in hits],
+                         [("old", 0), ("new", 0)])
+        self.assertEqual([hit[:2] for hit in index.search("BUDGET", state="done")], [("new", 0)])
+        self.assertEqual([hit[:2] for hit in index.search("budget", due_from=datetime.date(2024, 2, 1))],
+                         [("new", 0)])
+        self.assertEqual(index.search("budget missing"), [])
+        self.assertEqual(len(index.search("budget", limit=1)), 1)
+
+        index.replace("old", [Task("Nothing here")], month_key=120)
+        self.assertEqual([hit[:2] for hit in index.search("budget")], [("new", 0)])
+
+    def test_save_and_load(self):
+        index = SearchIndex(signature=("sig",))
+        index.replace("a", [Task("Call the plumber")], month_key=1, fingerprint=(1, 2))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "cache", "search.index")
+            index.save(path)
+            self.assertFalse(index.dirty)
+
+            loaded = SearchIndex.load(path, signature=("sig",))
+            self.assertEqual(loaded.fingerprint("a"), (1, 2))
+            self.assertEqual(len(loaded.search("plumber")), 1)
+            self.assertEqual(SearchIndex.load(path, signature=("other",)).sources(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+from orgplan.query import Query
+from orgplan.sqlite_store import SqliteTaskStore
+from orgplan.tasks import FileTaskStore
+
+
+def write_month(data_root, year, month, text):
+    path = os.path.join(data_root, f"{year:04d}", f"{month:02d}-notes.md")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(text)
+    return path
+
+
+class SqliteTaskStoreTests(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.data_root = self._tmpdir.name
+        write_month(
+            self.data_root, 2024, 12,
+            "# TODO List\n- Plan #p0 #blocked\n- [DONE] Ship #p1\n\n# Plan\nDEADLINE: <2024-12-20>\n",
+        )
+        write_month(
+            self.data_root, 2025, 1,
+            "# TODO List\n- Review #p0\n- [CANCELED] Drop #blocked\n\n# Review\n"
+            "SCHEDULED: <2025-01-07>\n",
+        )
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_list_matches_file_store(self):
+        store = SqliteTaskStore(self.data_root)
+        files = FileTaskStore(self.data_root)
+        for year, month in ((2024, 12), (2025, 1), (2025, 2)):
+            for state in (None, "open", "done"):
+                self.assertEqual(
+                    repr(store.list(year, month, state=state)),
+                    repr(files.list(year, month, state=state)),
+                )
+        store.close()
+
+    def test_reindex_only_parses_changed_files(self):
+        store = SqliteTaskStore(self.data_root)
+        self.assertEqual(store.reindex(), 2)
+        self.assertEqual(store.reindex(), 0)
+        store.close()
+
+        path = write_month(self.data_root, 2025, 1, "# TODO List\n- Replaced\n- Second\n")
+        reopened = SqliteTaskStore(self.data_root)
+        self.assertEqual(reopened.reindex(), 1)
+        self.assertEqual([task.title for task in reopened.list(2025, 1)], ["Replaced", "Second"])
+
+        os.remove(path)
+        self.assertEqual(reopened.reindex(), 0)
+        self.assertEqual(
+            repr(reopened.find()), repr(reopened.list_range((2024, 1), (2024, 12)))
+        )
+        self.assertEqual(len(reopened.find()), 2)
+        reopened.close()
+
+    def test_find_by_tags_state_due_and_months(self):
+        store = SqliteTaskStore(self.data_root)
+        titles = lambda tasks: [task.title for task in tasks]
+        self.assertEqual(titles(store.find(tags=["p0", "blocked"])), ["Plan"])
+        self.assertEqual(titles(store.find(any_tags=["p1", "blocked"])), ["Plan", "Ship", "Drop"])
+        self.assertEqual(titles(store.find(states=["done", "canceled"])), ["Ship", "Drop"])
+        self.assertEqual(
+            titles(store.find(due_from=datetime.date(2025, 1, 1), due_to=datetime.date(2025, 1, 31))),
+            ["Review"],
+        )
+        self.assertEqual(titles(store.find(state="open", months=((2025, 1), (2025, 12)))),
+                         ["Review"])
+        self.assertEqual(titles(store.list_range((2024, 12), (2025, 1), tags=["p0"])),
+                         ["Plan", "Review"])
+        store.close()
+
+    def test_query_matches_file_store(self):
+        store = SqliteTaskStore(self.data_root)
+        files = FileTaskStore(self.data_root)
+        queries = [
+            Query(),
+            Query(tags=["p0"], sort="-due"),
+            Query(states=["open", "done"], months=((2024, 12), (2024, 12))),
+            Query(due_from=datetime.date(2024, 12, 1), due_to=datetime.date(2025, 1, 7)),
+            Query(text="review", limit=1),
+        ]
+        for query in queries:
+            self.assertEqual(repr(list(store.query(query))), repr(list(files.query(query))))
+        store.close()
+
+    def test_extension_changes_rebuild_the_index(self):
+        store = SqliteTaskStore(self.data_root)
+        store.reindex()
+        store.extensions.add_tag_prefix("proj-")
+        write_month(self.data_root, 2025, 2, "# TODO List\n- Paint #proj-house\n")
+        self.assertEqual(store.reindex(), 3)
+        self.assertEqual([task.tags for task in store.find(tags=["proj-house"])], [("proj-house",)])
+        store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+from orgplan.table import TaskTable, month_from_key, month_key
+from orgplan.tasks import FileTaskStore, InMemoryTaskStore, Task
+
+
+def _tasks():
+    return [
+        Task("alpha", state="open", tags=["p0", "blocked"], deadline=[datetime.date(2024, 1, 5)]),
+        Task("beta", state="done", tags=["p1"], scheduled=[datetime.date(2024, 1, 20)]),
+        Task("gamma", state="open", tags=["p1"]),
+        Task("alpha", state="someday", tags=["p0"], deadline=[datetime.date(2024, 2, 1)]),
+    ]
+
+
+class TaskTableTests(unittest.TestCase):
+    def test_rows_round_trip(self):
+        table = TaskTable.from_tasks(_tasks(), year=2024, month=1)
+        self.assertEqual(len(table), 4)
+        self.assertEqual(len(table.titles), 3)
+        rows = list(table.rows())
+        self.assertEqual(rows[0], ("alpha", "open", ["p0", "blocked"], datetime.date(2024, 1, 5), (2024, 1)))
+        self.assertEqual(rows[2][3], None)
+        self.assertEqual(rows[3][1], "someday")
+
+    def test_filter_and_count(self):
+        table = TaskTable.from_tasks(_tasks())
+        self.assertEqual([row[0] for row in table.filter(state="open")], ["alpha", "gamma"])
+        self.assertEqual(table.count(tags=["p0"]), 2)
+        self.assertEqual(table.count(any_tags=["blocked", "p1"]), 3)
+        self.assertEqual(table.count(tags=["hobby"]), 0)
+        self.assertEqual(table.count(states=["done", "someday"]), 2)
+        self.assertEqual(table.count(state="missing"), 0)
+        jan = table.filter(due_from=datetime.date(2024, 1, 1), due_to=datetime.date(2024, 1, 31))
+        self.assertEqual([row[0] for row in jan], ["alpha", "beta"])
+        self.assertEqual(table.filter(state="open").count(tags=["p0"]), 1)
+
+    def test_extending_a_filtered_table_leaves_the_parent_alone(self):
+        table = TaskTable.from_tasks(_tasks())
+        subset = table.filter(state="open")
+        subset.extend([Task("delta", state="new")])
+        self.assertEqual(table.titles, ["alpha", "beta", "gamma"])
+        self.assertNotIn("new", table.state_names)
+        self.assertEqual([row[0] for row in subset], ["alpha", "gamma", "delta"])
+
+    def test_count_by(self):
+        table = TaskTable.from_tasks(_tasks()[:2], year=2024, month=1)
+        table.extend(_tasks()[2:], year=2024, month=2)
+        self.assertEqual(table.count_by("state"), {"open": 2, "done": 1, "someday": 1})
+        self.assertEqual(table.count_by("month"), {(2024, 1): 2, (2024, 2): 2})
+        self.assertEqual(table.count_by("tag"), {"p0": 2, "blocked": 1, "p1": 2})
+        self.assertEqual(table.count(months=((2024, 2), (2024, 12))), 2)
+        with self.assertRaises(ValueError):
+            table.count_by("title")
+
+    def test_month_keys(self):
+        self.assertEqual(month_from_key(month_key(2024, 12)), (2024, 12))
+        self.assertLess(month_key(2023, 12), month_key(2024, 1))
+
+    def test_empty_table(self):
+        table = TaskTable()
+        self.assertEqual(table.count(state="open"), 0)
+        self.assertEqual(len(table.filter(tags=["p0"])), 0)
+        self.assertEqual(table.count_by("state"), {})
+
+
+class StoreTableTests(unittest.TestCase):
+    def test_in_memory_store_table(self):
+        table = InMemoryTaskStore(_tasks()).table(state="open")
+        self.assertEqual(len(table), 2)
+
+    def test_file_store_table(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileTaskStore(tmpdir)
+            path = store.get_month_path(2024, 3)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write("# TODO List\n- #p0 One DEADLINE: <2024-03-09>\n- [DONE] Two\n")
+
+            table = store.table(2024, 3)
+            self.assertEqual(table.count_by("state"), {"open": 1, "done": 1})
+            self.assertEqual(table.count_by("month"), {(2024, 3): 2})
+            self.assertEqual(next(iter(table))[3], datetime.date(2024, 3, 9))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+from orgplan.tags import (
+    TAGS,
+    decode_mask,
+    encode_tags,
+    has_any_tags,
+    has_tag,
+    tag_bit,
+    tag_filter,
+)
+from orgplan.tasks import Task
+
+
+class TagMaskTests(unittest.TestCase):
+    def test_round_trip_in_canonical_order(self):
+        mask, extra = encode_tags(["weekly", "p1", "p1"])
+        self.assertIsNone(extra)
+        self.assertEqual(mask, tag_bit("p1") | tag_bit("weekly"))
+        self.assertEqual(decode_mask(mask), ("p1", "weekly"))
+
+    def test_every_vocabulary_tag_has_its_own_bit(self):
+        bits = [tag_bit(tag) for tag in TAGS]
+        self.assertEqual(len(set(bits)), len(TAGS))
+        self.assertEqual(tag_bit("hobby"), 0)
+
+    def test_unknown_tags_are_kept_as_extra(self):
+        task = Task("t", tags=["hobby", "p0", "hobby"])
+        self.assertEqual(task.tag_mask, tag_bit("p0"))
+        self.assertEqual(task.extra_tags, ("hobby",))
+        self.assertEqual(task.tags, ("hobby", "p0", "hobby"))
+
+    def test_has_tag_helpers(self):
+        task = Task("t", tags=["p1", "blocked", "hobby"])
+        self.assertTrue(has_tag(task, "p1"))
+        self.assertFalse(has_tag(task, "p0"))
+        self.assertTrue(has_tag(task, "hobby"))
+        self.assertTrue(has_any_tags(task, ["p0", "blocked"]))
+        self.assertTrue(has_any_tags(task, ["other", "hobby"]))
+        self.assertFalse(has_any_tags(task, ["p0", "other"]))
+
+    def test_tag_filter(self):
+        tasks = [
+            Task("a", tags=["p0", "blocked"]),
+            Task("b", tags=["p0"]),
+            Task("c", tags=["p1", "hobby"]),
+        ]
+        self.assertIsNone(tag_filter())
+        both = tag_filter(tags=["p0", "blocked"])
+        self.assertEqual([t.title for t in tasks if both(t)], ["a"])
+        either = tag_filter(any_tags=["blocked", "hobby"])
+        self.assertEqual([t.title for t in tasks if either(t)], ["a", "c"])
+        mixed = tag_filter(tags=["p0"], any_tags=["blocked", "p1"])
+        self.assertEqual([t.title for t in tasks if mixed(t)], ["a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,9 @@
 import datetime
 import unittest
 
-from orgplan.tasks import InMemoryTaskStore, Task
+from orgplan.query import Query
+from orgplan.tags import encode_tags
+from orgplan.tasks import InMemoryTaskStore, Task, task_from_record, task_to_record
 
 
 class TaskStoreTests(unittest.TestCase):
@@ -24,6 +26,24 @@ class TaskStoreTests(unittest.TestCase):
         results = store.list(state="done")
         self.assertEqual([task.title for task in results], ["done"])
 
+    def test_list_accepts_field_projection(self):
+        tasks = [Task("open", state="open", notes="Notes")]
+        store = InMemoryTaskStore(tasks)
+        results = store.list(fields=("title", "state"))
+        self.assertEqual(results[0].notes, "Notes")
+        with self.assertRaises(ValueError):
+            store.list(fields=("owner",))
+
+    def test_filters_by_tags(self):
+        tasks = [
+            Task("p0", tags=["p0", "blocked"]),
+            Task("p1", tags=["p1"]),
+            Task("none"),
+        ]
+        store = InMemoryTaskStore(tasks)
+        self.assertEqual([t.title for t in store.list(tags=["p0", "blocked"])], ["p0"])
+        self.assertEqual([t.title for t in store.list(any_tags=["p0", "p1"])], ["p0", "p1"])
+
 
 class TaskTests(unittest.TestCase):
     def test_due_date_property_returns_first_deadline(self):
@@ -52,6 +72,18 @@ class TaskTests(unittest.TestCase):
         task = Task("test", due_date=datetime.date(2025, 6, 30))
         self.assertEqual(task.due_date, datetime.date(2025, 6, 30))
 
+    def test_state_is_interned(self):
+        state = "".join(["dele", "gated"])
+        self.assertIs(Task("a", state=state).state, Task("b", state="delegated").state)
+
+    def test_tags_assignment_updates_mask(self):
+        task = Task("test", tags=["p2"])
+        task.tags = ["1d", "p0"]
+        self.assertEqual(task.tags, ("1d", "p0"))
+        self.assertEqual(task.tag_mask, encode_tags(["p0", "1d"])[0])
+        with self.assertRaises(AttributeError):
+            task.tags.append("p1")
+
     def test_due_date_property_returns_none_if_nothing(self):
         task = Task("test")
         self.assertIsNone(task.due_date)
@@ -69,5 +101,117 @@ class TaskTests(unittest.TestCase):
         self.assertEqual(task.due_date, datetime.date(2025, 6, 20))
 
 
+    def test_record_round_trip(self):
+        task = Task(
+            "Ship it",
+            state="done",
+            due_date=datetime.date(2024, 1, 1),
+            tags=["p1", "someday"],
+            notes="Notes",
+            line_number=3,
+            deadline=[datetime.datetime(2024, 1, 5, 9, 30)],
+            scheduled=[datetime.date(2024, 1, 4)],
+            extras={"owner": "ann", "mentions": ["bob"]},
+        )
+        clone = task_from_record(task_to_record(task))
+        self.assertEqual(repr(clone), repr(task))
+
+    def test_list_range_filters_by_due_month_span(self):
+        tasks = [
+            Task("dec", due_date=datetime.date(2024, 12, 5)),
+            Task("nov", due_date=datetime.date(2024, 11, 10)),
+            Task("feb", due_date=datetime.date(2025, 2, 1)),
+            Task("later", due_date=datetime.date(2025, 3, 1)),
+        ]
+        store = InMemoryTaskStore(tasks)
+        results = store.list_range((2024, 11), (2025, 2))
+        self.assertEqual([task.title for task in results], ["nov", "dec", "feb"])
+
+    def test_due_queries(self):
+        tasks = [
+            Task("late", deadline=[datetime.date(2025, 3, 1)]),
+            Task("soon", scheduled=[datetime.date(2025, 1, 5)], deadline=[datetime.date(2025, 2, 1)]),
+            Task("done", state="done", deadline=[datetime.date(2025, 1, 2)]),
+            Task("none"),
+        ]
+        store = InMemoryTaskStore(tasks)
+        found = store.due_between(datetime.date(2025, 1, 1), datetime.date(2025, 2, 28))
+        self.assertEqual([task.title for task in found], ["done", "soon"])
+        upcoming = store.next_due(5, after=datetime.date(2025, 1, 1))
+        self.assertEqual([task.title for task in upcoming], ["soon", "late"])
+        self.assertEqual([task.title for task in store.list(year=2025)], ["late", "soon", "done"])
+
+    def test_query(self):
+        tasks = [
+            Task("Call dentist", tags=["p1"], due_date=datetime.date(2024, 2, 1)),
+            Task("Pay bills", tags=["p0"], notes="call the bank", due_date=datetime.date(2024, 1, 5)),
+            Task("Call mom", state="done", tags=["p0"]),
+            Task("File taxes", tags=["p0"], due_date=datetime.date(2024, 3, 1)),
+        ]
+        store = InMemoryTaskStore(tasks)
+        titles = lambda query: [task.title for task in store.query(query)]
+        self.assertEqual(titles(Query(tags=["p0"], states="open")), ["Pay bills", "File taxes"])
+        self.assertEqual(titles(Query(text="call")), ["Call dentist", "Pay bills", "Call mom"])
+        self.assertEqual(titles(Query(months=((2024, 1), (2024, 2)), sort="-due")),
+                         ["Call dentist", "Pay bills"])
+        self.assertEqual(titles(Query(due_to=datetime.date(2024, 2, 1), text="call", tags=["p0"])),
+                         ["Pay bills"])
+        self.assertEqual(titles(Query(any_tags=["p0", "p1"], limit=2)),
+                         ["Call dentist", "Pay bills"])
+        self.assertEqual(titles(Query(months=((2024, 3), (2024, 1)))), [])
+
+    def test_add_remove_and_replace_keep_indexes_current(self):
+        store = InMemoryTaskStore([
+            Task("jan", tags=["p0"], due_date=datetime.date(2024, 1, 5)),
+            Task("feb", due_date=datetime.date(2024, 2, 10)),
+        ])
+        titles = lambda tasks: [task.title for task in tasks]
+        key = store.add(Task("late jan", tags=["p0"], due_date=datetime.date(2024, 1, 30)))
+        self.assertEqual(len(store), 3)
+        self.assertEqual(titles(store.list(2024, 1, tags=["p0"])), ["jan", "late jan"])
+        self.assertEqual(titles(store.search("late")), ["late jan"])
+
+        jan = store.list(2024, 1)[0]
+        jan_key = store.key_of(jan)
+        jan.state = "done"
+        jan.deadline = [datetime.date(2024, 2, 1)]
+        store.replace(jan_key, jan)
+        self.assertEqual(titles(store.list(2024, 2)), ["jan", "feb"])
+        self.assertEqual(titles(store.list(state="done")), ["jan"])
+        self.assertEqual(titles(store.list_range((2024, 1), (2024, 2))), ["late jan", "jan", "feb"])
+        self.assertEqual(titles(store.due_between(datetime.date(2024, 2, 1))), ["jan"])
+
+        self.assertEqual(store.remove(key).title, "late jan")
+        self.assertIsNone(store.key_of(Task("late jan")))
+        self.assertEqual(titles(store.list(tags=["p0"])), ["jan"])
+        self.assertEqual(store.search("late"), [])
+        self.assertEqual(titles(store.query(Query(due_to=datetime.date(2024, 1, 31)))), [])
+        with self.assertRaises(KeyError):
+            store.remove(key)
+        with self.assertRaises(KeyError):
+            store.replace(key, Task("x"))
+
+    def test_replace_keeps_store_order(self):
+        store = InMemoryTaskStore([Task("a"), Task("b"), Task("c")])
+        store.replace(0, Task("a2"))
+        titles = lambda tasks: [task.title for task in tasks]
+        self.assertEqual(titles(store.list()), ["a2", "b", "c"])
+        self.assertEqual(titles(store.list(state="open")), ["a2", "b", "c"])
+        self.assertEqual(titles(store.query(Query())), ["a2", "b", "c"])
+
+    def test_search(self):
+        tasks = [
+            Task("Call dentist", due_date=datetime.date(2024, 2, 1)),
+            Task("Pay bills", notes="dentist invoice, call later", due_date=datetime.date(2024, 5, 1)),
+            Task("Call mom", state="done"),
+        ]
+        store = InMemoryTaskStore(tasks)
+        self.assertEqual([task.title for task in store.search("call dentist")],
+                         ["Call dentist", "Pay bills"])
+        self.assertEqual([task.title for task in store.search("call", state="done")], ["Call mom"])
+        self.assertEqual([task.title for task in store.search("dentist", since=(2024, 3))],
+                         ["Pay bills"])
+        self.assertEqual(store.search("plumber"), [])
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,103 @@
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from orgplan.tasks import FileTaskStore
+from orgplan.watch import ChangeEvent, Watcher
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(text)
+
+
+class WatcherTests(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.data_root = self._tmpdir.name
+        self.store = FileTaskStore(self.data_root)
+        self.jan = self.store.get_month_path(2024, 1)
+        write(self.jan, "# TODO List\n- First\n")
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _watch(self, **options):
+        events = queue.Queue()
+        watcher = Watcher(self.data_root, store=self.store, **options)
+        watcher.subscribe(events.put)
+        watcher.start()
+        self.addCleanup(watcher.stop)
+        return watcher, events
+
+    def _check_changes_are_published_and_cached(self, watcher, events):
+        # A burst of writes settles into one event.
+        for count in range(3):
+            write(self.jan, "# TODO List\n- First\n" + "- More\n" * count)
+        self.assertEqual(events.get(timeout=5), ChangeEvent(self.jan, 2024, 1, "notes", False))
+        with mock.patch.object(self.store, "_parse_month") as parse:
+            self.assertEqual(len(self.store.list(2024, 1)), 3)
+            parse.assert_not_called()
+
+        feb_meta = os.path.join(self.data_root, "2025", "02-meta.md")
+        write(feb_meta, "Goals\n")
+        self.assertEqual(events.get(timeout=5), ChangeEvent(feb_meta, 2025, 2, "meta", False))
+        os.remove(self.jan)
+        self.assertEqual(events.get(timeout=5), ChangeEvent(self.jan, 2024, 1, "notes", True))
+        time.sleep(0.2)
+        self.assertTrue(events.empty())
+
+    def test_polling_backend(self):
+        watcher, events = self._watch(use_inotify=False, debounce=0.1, poll_interval=0.02)
+        self.assertEqual(watcher.backend, "polling")
+        self._check_changes_are_published_and_cached(watcher, events)
+
+    def test_inotify_backend(self):
+        watcher, events = self._watch(debounce=0.1)
+        if watcher.backend != "inotify":
+            self.skipTest("inotify is not available")
+        self._check_changes_are_published_and_cached(watcher, events)
+
+    def test_imports_without_unix_only_constants(self):
+        code = (
+            "import os; del os.O_NONBLOCK; "
+            "from orgplan.watch import Watcher; "
+            "print(Watcher.__name__)"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True
+        ).stdout
+        self.assertEqual(output.strip(), "Watcher")
+
+    def test_subscriber_errors_do_not_stop_the_watcher(self):
+        watcher, events = self._watch(use_inotify=False, debounce=0.05, poll_interval=0.02)
+        watcher.subscribe(mock.Mock(side_effect=RuntimeError("boom")))
+        watcher.subscribe(events.put)
+        with mock.patch("traceback.print_exc") as print_exc:
+            write(self.jan, "# TODO List\n- Changed\n")
+            events.get(timeout=5)
+            events.get(timeout=5)
+        print_exc.assert_called_once()
+
+
+    def test_refresh_errors_do_not_stop_the_watcher(self):
+        watcher, events = self._watch(use_inotify=False, debounce=0.05, poll_interval=0.02)
+        with mock.patch("traceback.print_exc") as print_exc:
+            with open(self.jan, "wb") as handle:
+                handle.write(b"\xff")
+            events.get(timeout=5)
+            print_exc.assert_called_once()
+            write(self.jan, "# TODO List\n- Fixed\n- Again\n")
+            self.assertEqual(events.get(timeout=5).path, self.jan)
+        self.assertTrue(watcher._thread.is_alive())
+        self.assertEqual(len(self.store.list(2024, 1)), 2)
+
+if __name__ == "__main__":
+    unittest.main()